@@ -1,5 +1,6 @@
 import streamlit as st
 from utils import fazer_login
+from pre_carregamento import iniciar_pre_carregamento
 
 st.set_page_config(page_title="Sistema SCMCE 📝", layout="wide")
 
@@ -7,6 +8,9 @@ st.set_page_config(page_title="Sistema SCMCE 📝", layout="wide")
 if not fazer_login():
     st.stop()
 
+# Logado: aquece em paralelo o cache de todas as abas antes da primeira navegação
+iniciar_pre_carregamento()
+
 pages = {
     "Home": [
         st.Page("home.py", title="Página Inicial", icon=":material/home:"),
@@ -1,7 +1,13 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px 
-from utils import carregar_df, my_metric
+from utils import carregar_preparado, carregar_varios, aviso_valores_invalidos, my_metric
+from filtros import Selecao, opcoes_filtro, selecionar
+from cache_visoes import chave_visao, lembrar
+from cubo import consultar, obter_cubo
+from estilos import VERDE, VERMELHO, destacar_linhas, formatar_reais
+from tabela import chaves_controles, tabela_paginada
+from secoes import escolher_secao
 #from mitosheet.streamlit.v1 import spreadsheet
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
@@ -9,84 +15,106 @@ st.set_page_config(page_title="Empenhos", layout="wide")
 
 # --- CARREGAMENTO DE DADOS (GLOBAL) ---
 # Isso acontece antes das abas para os dados estarem disponíveis em ambas
+# VALOR e DIREC já vêm tratados de preparo.preparar_empenhos
 planilha = st.secrets["planilha"] 
 aba = st.secrets["aba_empenho"] 
+aba_analise = st.secrets["aba_analise"]
+aba_saldo = st.secrets["aba_saldo"]
 
-data = carregar_df(planilha, aba)
+# As três abas da página estão na mesma planilha: uma única leitura em lote aquece o cache
+# (depois da primeira carga é só uma consulta ao cache compartilhado)
+carregar_varios(planilha, [aba, aba_analise, aba_saldo])
 
-# --- TRATAMENTO DE DADOS (LIMPEZA) ---
-def limpar_moeda_empenho(valor):
-    if isinstance(valor, str):
-        limpo = valor.replace('R$', '').replace(' ', '').replace('.', '')
-        limpo = limpo.replace(',', '.')
-        try:
-            return float(limpo)
-        except ValueError:
-            return 0.0
-    return valor if isinstance(valor, (int, float)) else 0.0
+data = carregar_preparado(planilha, aba, "empenhos")
 
-if "VALOR" in data.columns:
-    data["VALOR"] = data["VALOR"].apply(limpar_moeda_empenho)
-    data = data.dropna(subset=['VALOR'])
-
-if "DIREC" in data.columns:
-    data["DIREC"] = pd.to_numeric(data["DIREC"], errors='coerce').fillna(0).astype(int)
+# Colunas com índice de bitmaps (filtros.py), montado uma vez por versão da planilha
+COLUNAS_FILTRO = ["ANO", "EMPRESA", "DIREC", "TIPO DE NE"]
+# Dimensões do cubo do KPI e dos gráficos por DIREC e por fonte (cubo.py)
+DIMENSOES_CUBO = COLUNAS_FILTRO + ["FONTE"]
 
 st.title("📑 Banco de Dados - Empenhos")
+aviso_valores_invalidos(data)
 
 # --- CRIAÇÃO DAS ABAS ---
-tab1, tab2 = st.tabs(["Dashboard & Filtros", "Análise Avançada"]) 
+# Só a aba escolhida roda (ver secoes.py); os filtros de cada uma ficam guardados
+ABA_DASHBOARD = "Dashboard & Filtros"
+ABA_ANALISE = "Análise Avançada"
+aba_ativa = escolher_secao([ABA_DASHBOARD, ABA_ANALISE], "empenhos_aba", manter={
+    ABA_DASHBOARD: ["empenhos_ano", "empenhos_empresa", "empenhos_direc", "empenhos_ne", "empenhos_tipo"]
+                   + chaves_controles("empenhos"),
+    ABA_ANALISE: ["ano_analise_combinado"] + chaves_controles("empenhos_analise") + chaves_controles("empenhos_saldo"),
+})
 
 # ==============================================================================
 # ABA 1: DASHBOARD COM FILTROS LOCAIS
 # ==============================================================================
-with tab1:
+if aba_ativa == ABA_DASHBOARD:
     # --- ÁREA DE FILTROS (DENTRO DA ABA) ---
     with st.expander("🔍 Filtros da Visualização", expanded=True):
         # Mudei para st.columns(5) para caber o Tipo de NE
         col_f1, col_f2, col_f3, col_f4, col_f5 = st.columns(5)
         
-        # Cria uma cópia local para filtrar nesta aba
-        df_filtrado = data.copy()
-        
         with col_f1:
             # Filtro de Ano
-            anos_lista = sorted(data["ANO"].unique().tolist())
+            anos_lista = opcoes_filtro(data, "ANO", dropna=True)
             idx_padrao = anos_lista.index(anos_lista[-1]) if anos_lista else 0
-            sel_ano = st.selectbox("Ano:", options=anos_lista, index=idx_padrao)
+            sel_ano = st.selectbox("Ano:", options=anos_lista, index=idx_padrao, key="empenhos_ano")
         
         with col_f2:
             # Busca por Empresa
-            opcoes_empresas = sorted(data["EMPRESA"].dropna().unique().tolist())
-            sel_empresa = st.selectbox("Empresa:", options=opcoes_empresas, index=None, placeholder="Todas")
+            opcoes_empresas = opcoes_filtro(data, "EMPRESA", dropna=True)
+            sel_empresa = st.selectbox("Empresa:", options=opcoes_empresas, index=None, placeholder="Todas", key="empenhos_empresa")
 
         with col_f3:
              # Filtro de DIREC
-            direc_opcoes = sorted(data["DIREC"].unique().tolist())
+            direc_opcoes = opcoes_filtro(data, "DIREC")
             direc_opcoes = [d for d in direc_opcoes if d != 0]
-            sel_direc = st.multiselect("DIREC:", options=direc_opcoes, placeholder="Todas")
+            sel_direc = st.multiselect("DIREC:", options=direc_opcoes, placeholder="Todas", key="empenhos_direc")
             
         with col_f4:
             # Busca por Empenho
-            opcoes_empenhos = sorted(data["NE"].dropna().astype(str).unique().tolist())
-            sel_empenho = st.selectbox("Empenho (NE):", options=opcoes_empenhos, index=None, placeholder="Todos")
+            opcoes_empenhos = opcoes_filtro(data, "NE", dropna=True, tipo="str")
+            sel_empenho = st.selectbox("Empenho (NE):", options=opcoes_empenhos, index=None, placeholder="Todos", key="empenhos_ne")
 
         with col_f5:
             # Busca por Tipo (Adicionado aqui)
-            opcoes_tipo = sorted(data["TIPO DE NE"].dropna().unique().tolist())
-            sel_tipo = st.selectbox("Tipo de NE:", options=opcoes_tipo, index=None, placeholder="Todos")
+            opcoes_tipo = opcoes_filtro(data, "TIPO DE NE", dropna=True)
+            sel_tipo = st.selectbox("Tipo de NE:", options=opcoes_tipo, index=None, placeholder="Todos", key="empenhos_tipo")
 
     # --- APLICAÇÃO DOS FILTROS ---
-    if sel_ano:
-        df_filtrado = df_filtrado[df_filtrado["ANO"] == sel_ano]
-    if sel_empresa:
-        df_filtrado = df_filtrado[df_filtrado["EMPRESA"] == sel_empresa]
-    if sel_direc:
-        df_filtrado = df_filtrado[df_filtrado["DIREC"].isin(sel_direc)]
-    if sel_empenho:
-        df_filtrado = df_filtrado[df_filtrado["NE"].astype(str) == sel_empenho]
-    if sel_tipo:
-        df_filtrado = df_filtrado[df_filtrado["TIPO DE NE"].astype(str) == sel_tipo]
+    def calcular_visao():
+        """Linhas filtradas, KPI e tabelas dos gráficos para a combinação de filtros atual."""
+        # Filtros de lista pelo índice de bitmaps; o NE (quase um valor por linha) entra como máscara extra
+        mascaras = []
+        if sel_empenho:
+            mascaras.append(data["NE"].astype(str) == sel_empenho)
+
+        condicoes = {
+            "ANO": sel_ano,
+            "EMPRESA": sel_empresa,
+            "DIREC": sel_direc,
+            "TIPO DE NE": sel_tipo,
+        }
+        df_filtrado = selecionar(data, COLUNAS_FILTRO, condicoes, mascaras)
+
+        # KPI e gráficos: somas das células do cubo (das linhas, se houver filtro por NE)
+        celulas = consultar(obter_cubo(data, DIMENSOES_CUBO, ["VALOR"]), condicoes, df_filtrado,
+                            fora_do_cubo=bool(mascaras))
+        por_direc = celulas["VALOR"].groupby(celulas["DIREC"]).sum().reset_index()
+        por_fonte = celulas["VALOR"].groupby(celulas["FONTE"]).sum().reset_index()
+        return {
+            "posicoes": df_filtrado.posicoes,
+            "valor_total": celulas["VALOR"].sum(),
+            "df_direc": por_direc.sort_values("DIREC"),
+            "df_fonte": por_fonte.sort_values("VALOR", ascending=True),
+        }
+
+    # Mesma versão da aba + mesmos filtros = mesma visão: vem pronta do cache
+    # compartilhado entre as sessões (ver cache_visoes.py)
+    visao = lembrar(chave_visao(
+        data, "empenhos", ano=sel_ano, empresa=sel_empresa, direc=sel_direc, empenho=sel_empenho, tipo=sel_tipo,
+    ), calcular_visao)
+    df_filtrado = Selecao(data, visao["posicoes"])
 
 
     # --- O RESTO DO SEU DASHBOARD (MÉTRICAS E GRÁFICOS) ---
@@ -106,15 +134,14 @@ with tab1:
     with col1:
         my_metric("Quantidade de Empenhos", len(df_filtrado), t_red, "fas fa-file-signature")
     with col2:
-        valor_total = df_filtrado["VALOR"].sum()
-        my_metric("Valor Total Empenhado", formatar_moeda_visual(valor_total), t_green, "fas fa-coins")
+        my_metric("Valor Total Empenhado", formatar_moeda_visual(visao["valor_total"]), t_green, "fas fa-coins")
 
     # Gráficos
     if not df_filtrado.empty:
         col3, col4 = st.columns(2)
         
         with col3:
-            df_direc = df_filtrado.groupby("DIREC")["VALOR"].sum().reset_index().sort_values("DIREC")
+            df_direc = visao["df_direc"]
     
             fig_line = px.bar(
                 df_direc, x="DIREC", y="VALOR",
@@ -140,7 +167,7 @@ with tab1:
             st.plotly_chart(fig_line, use_container_width=True)
 
         with col4:
-            df_fonte = df_filtrado.groupby("FONTE")["VALOR"].sum().reset_index().sort_values("VALOR", ascending=True)
+            df_fonte = visao["df_fonte"]
             max_valor = df_fonte["VALOR"].max()
             fig_bar = px.bar(
                 df_fonte, x="VALOR", y="FONTE", orientation='h', 
@@ -161,57 +188,43 @@ with tab1:
     with st.expander("Visualizar Tabela Completa", expanded=True):
         colunas = ["DATA", "ANO", "NE", "TIPO DE NE", "DIREC", "EMPRESA", "FONTE", "VALOR"]
         cols_to_show = [c for c in colunas if c in df_filtrado.columns]
-        df_display = df_filtrado[cols_to_show].copy()
-        
-        if "VALOR" in df_display.columns:
-            df_display["VALOR"] = df_display["VALOR"].apply(formatar_moeda_visual)
 
-        def colorir_linhas(row):
-            verde = 'background-color: #ace796; color: black'
-            vermelho = 'background-color: #edb0bc; color: black'
-            padrao = ''
-            valor = row.get("TIPO DE NE", "")
-            if valor == "Emissão": return [verde] * len(row)
-            elif valor == "Anulação": return [vermelho] * len(row)
-            else: return [padrao] * len(row)
+        # Emissões em verde e anulações em vermelho (uma máscara por regra, ver estilos.py)
+        regras = [("TIPO DE NE", "Emissão", VERDE), ("TIPO DE NE", "Anulação", VERMELHO)]
 
-        st.dataframe(df_display.style.apply(colorir_linhas, axis=1), hide_index=True, use_container_width=True)
+        def formatar_pagina(df_display):
+            # VALOR continua numérico (ordenável); o "R$ 1.234,56" é só formato de exibição
+            return formatar_reais(destacar_linhas(df_display, regras))
+
+        tabela_paginada(df_filtrado, cols_to_show, chave="empenhos", preparar=formatar_pagina)
 
 # ==============================================================================
 # ABA 2: ANÁLISE AVANÇADA (CORRIGIDA)
 # ==============================================================================
-with tab2:
+elif aba_ativa == ABA_ANALISE:
     st.header("Análise - Fonte por Empresa")
 
     msg = '''OBS: **com OB** são medições com ordem bancária. Já **Ano Fiscal** são medições **com OB** e **sem OB**.'''
     st.markdown(msg)
 
-    # 1. Carregamento de dados específicos desta aba
-    aba_analise = st.secrets["aba_analise"]
-    aba_saldo = st.secrets["aba_saldo"]
-
-    data_analise = carregar_df(planilha, aba_analise)
-    data_saldo = carregar_df(planilha, aba_saldo)
-
-    # 2. TRATAMENTO DE DADOS (CRUCIAL PARA O FILTRO FUNCIONAR)
-    # Convertemos a coluna 'ANO' das DUAS tabelas para número inteiro.
+    # 1. Carregamento de dados específicos desta aba (já lidos no lote do topo da página)
+    # ANO já vem como inteiro nas duas tabelas (preparo.preparar_ano_inteiro).
     # Isso evita erros se numa planilha estiver "2026" (texto) e na outra 2026 (número).
-    for df in [data_analise, data_saldo]:
-        if "ANO" in df.columns:
-            # Converte para numérico, erros viram NaN, depois preenche com 0 e vira Inteiro
-            df["ANO"] = pd.to_numeric(df["ANO"], errors='coerce').fillna(0).astype(int)
+    data_analise = carregar_preparado(planilha, aba_analise, "ano_inteiro")
+    data_saldo = carregar_preparado(planilha, aba_saldo, "ano_inteiro")
 
     # --- ÁREA DE FILTROS ---
     with st.expander("🔍 Filtros da Visualização", expanded=True):
         
-        # Cria cópias locais para não alterar o original
-        df_filtrado_analise = data_analise.copy()
-        df_filtrado_saldo = data_saldo.copy()
+        # Sem cópia: o filtro por ano abaixo já gera tabelas novas, e sem ano
+        # selecionado as tabelas compartilhadas são só exibidas (nunca alteradas)
+        df_filtrado_analise = data_analise
+        df_filtrado_saldo = data_saldo
         
         # 3. CRIAÇÃO INTELIGENTE DA LISTA DE ANOS
         # Pegamos os anos únicos da tabela de Análise E da tabela de Saldo
-        anos1 = data_analise["ANO"].unique().tolist() if "ANO" in data_analise.columns else []
-        anos2 = data_saldo["ANO"].unique().tolist() if "ANO" in data_saldo.columns else []
+        anos1 = opcoes_filtro(data_analise, "ANO", dropna=True) if "ANO" in data_analise.columns else []
+        anos2 = opcoes_filtro(data_saldo, "ANO", dropna=True) if "ANO" in data_saldo.columns else []
         
         # Juntamos as duas listas, usamos set() para remover duplicados e sorted() para ordenar
         # reverse=True garante que 2026 apareça antes de 2025
@@ -243,7 +256,7 @@ with tab2:
     # --- TABELA 1: FONTE POR EMPRESA ---
     st.write("") 
     with st.expander("Visualizar Tabela Completa (Fonte por Empresa)", expanded=True):
-        st.dataframe(df_filtrado_analise, hide_index=True, use_container_width=True)
+        tabela_paginada(df_filtrado_analise, chave="empenhos_analise")
 
     st.markdown("---")
 
@@ -252,4 +265,4 @@ with tab2:
 
     st.write("")
     with st.expander("Visualizar Tabela Completa (Totais e Saldos)", expanded=True):
-        st.dataframe(df_filtrado_saldo, hide_index=True, use_container_width=True)
\ No newline at end of file
+        tabela_paginada(df_filtrado_saldo, chave="empenhos_saldo")
\ No newline at end of file
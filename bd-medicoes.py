@@ -1,98 +1,100 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px # Importação necessária para os gráficos
-from utils import carregar_df, my_metric
+from utils import carregar_preparado, aviso_valores_invalidos, my_metric
+from filtros import Selecao, opcoes_cascata, opcoes_filtro, selecionar
+from busca import buscar, normalizar
+from cache_visoes import chave_visao, lembrar
+from cubo import consultar, obter_cubo
+from tabela import tabela_paginada
+from estilos import formatar_reais
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(page_title="Medições", layout="wide")
 
 # --- CARREGAMENTO DE DADOS ---
+# VALOR, DATA CADASTRO e ANO FISCAL já vêm tratados de preparo.preparar_medicoes
 planilha = st.secrets["planilha"]
 aba = st.secrets["aba_medicoes"]
 
-data = carregar_df(planilha, aba)
-
-# --- TRATAMENTO DE DADOS (LIMPEZA) ---
-def limpar_moeda(valor):
-    if isinstance(valor, str):
-        limpo = valor.replace('R$', '').replace(' ', '').replace('.', '').replace(',', '.')
-        try:
-            return float(limpo)
-        except ValueError:
-            return 0.0
-    return valor if isinstance(valor, (int, float)) else 0.0
-
-# 1. Limpeza de Valor
-if "VALOR" in data.columns:
-    data["VALOR"] = data["VALOR"].apply(limpar_moeda)
-
-# 2. Limpeza de Data
-if "DATA CADASTRO" in data.columns:
-    data["DATA CADASTRO"] = pd.to_datetime(data["DATA CADASTRO"], dayfirst=True, errors='coerce')
-    data["DATA CADASTRO"] = data["DATA CADASTRO"].dt.date
-
-# 3. Limpeza do Ano Fiscal (AGORA COMO TEXTO)
-if "ANO FISCAL" in data.columns:
-    # Garante que qualquer vazio residual vire "-"
-    data["ANO FISCAL"] = data["ANO FISCAL"].fillna("-")
-    # Converte tudo para texto
-    data["ANO FISCAL"] = data["ANO FISCAL"].astype(str)
-    # Remove o ".0" de anos que o pandas possa ter lido como "2024.0"
-    data["ANO FISCAL"] = data["ANO FISCAL"].str.replace(".0", "", regex=False)
-    # Caso sobre algum "nan" ou "0" como texto, força a virar "-"
-    data["ANO FISCAL"] = data["ANO FISCAL"].replace(["nan", "0", "<NA>"], "-")
-
-# Cria cópia para filtrar
-df_filtrado = data.copy()
+data = carregar_preparado(planilha, aba, "medicoes")
+
+# Colunas com índice de bitmaps (filtros.py), montado uma vez por versão da planilha
+COLUNAS_FILTRO = ["PROGRAMA", "DIREC", "MUNICÍPIO", "ANO FISCAL"]
+# Dimensões do cubo do KPI e do gráfico por fonte (cubo.py)
+DIMENSOES_CUBO = COLUNAS_FILTRO + ["FONTE"]
 
 st.title("💵 Banco de Dados - Medições")
+aviso_valores_invalidos(data)
 
 # --- SIDEBAR (FILTROS) ---
 st.sidebar.title("Filtros")
 
 # 1. Filtro de Programa
-opcoes = ["Todos"] + sorted(data["PROGRAMA"].unique().tolist())
+opcoes = ["Todos"] + opcoes_filtro(data, "PROGRAMA")
 sel_programa = st.sidebar.selectbox("Selecione o programa:", options=opcoes)
 
-if sel_programa != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["PROGRAMA"] == sel_programa]
-
 st.sidebar.markdown("---")
 
 # 2. Filtros de Localização e Escola (COM A LÓGICA ANINHADA)
 busca_escola = st.sidebar.text_input("Buscar Escola (Nome):")
 
 # Primeiro escolhemos a DIREC
-direc_opcoes = sorted(data["DIREC"].unique().tolist())
+direc_opcoes = opcoes_filtro(data, "DIREC")
 sel_direc = st.sidebar.multiselect("Selecione a DIREC:", options=direc_opcoes, placeholder="Todas") 
 
 # Filtro em cascata para Municípios
-if sel_direc:
-    # Se tiver DIREC selecionada, mostramos apenas os municípios daquela DIREC
-    municipios_disponiveis = data[data['DIREC'].isin(sel_direc)]["MUNICÍPIO"].unique().tolist()
-else:
-    # Se não tiver DIREC selecionada, mostra todos os municípios
-    municipios_disponiveis = data["MUNICÍPIO"].unique().tolist()
-
-# Monta a lista e cria o selectbox
-municipios_opcoes = ["Todos"] + sorted(municipios_disponiveis)
+# Com DIREC selecionada, só os municípios daquela DIREC (mapa pré-calculado por versão);
+# sem DIREC selecionada, todos os municípios
+municipios_opcoes = ["Todos"] + opcoes_cascata(data, "DIREC", "MUNICÍPIO", sel_direc)
 sel_municipio = st.sidebar.selectbox("Selecione o município:", options=municipios_opcoes)
 
 # --- 3. Filtro de Ano (SIMPLIFICADO) ---
-ano_opcoes = sorted(data["ANO FISCAL"].unique().tolist())
+ano_opcoes = opcoes_filtro(data, "ANO FISCAL")
 sel_ano = st.sidebar.multiselect("Selecione o ano:", options=ano_opcoes, placeholder="Todos")
 
 # --- APLICAÇÃO DOS FILTROS ---
-if busca_escola:
-    df_filtrado = df_filtrado[df_filtrado["ESCOLA"].str.contains(busca_escola, case=False, na=False)]
-if sel_direc:
-    df_filtrado = df_filtrado[df_filtrado["DIREC"].isin(sel_direc)]
-if sel_municipio != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["MUNICÍPIO"] == sel_municipio]
-    
-# Aplicação do filtro de Ano simplificada
-if sel_ano:
-    df_filtrado = df_filtrado[df_filtrado["ANO FISCAL"].isin(sel_ano)]
+# Busca normalizada uma vez: decide a busca e compõe a chave da visão (só pontuação = sem busca)
+termo = normalizar(busca_escola)
+
+def calcular_visao():
+    """Linhas filtradas, KPI e tabelas dos gráficos para a combinação de filtros atual."""
+    # Filtros de lista pelo índice de bitmaps
+    condicoes = {
+        "PROGRAMA": None if sel_programa == "Todos" else sel_programa,
+        "DIREC": sel_direc,
+        "MUNICÍPIO": None if sel_municipio == "Todos" else sel_municipio,
+        "ANO FISCAL": sel_ano,
+    }
+    df_filtrado = selecionar(data, COLUNAS_FILTRO, condicoes)
+
+    # Busca por escola (índice sem acentos, ver busca.py): as melhores correspondências primeiro
+    if termo:
+        df_filtrado = df_filtrado.na_ordem(buscar(data, "ESCOLA", termo))
+
+    # A série diária tem quase um valor por linha: fica fora do cubo e vem das linhas
+    df_line = df_filtrado["DATA CADASTRO"].value_counts().sort_index().reset_index()
+    df_line.columns = ["Data", "Quantidade"]
+
+    # KPI e gráfico por fonte: somas das células do cubo (das linhas, se houver busca)
+    celulas = consultar(obter_cubo(data, DIMENSOES_CUBO, ["VALOR"]), condicoes, df_filtrado,
+                        fora_do_cubo=bool(termo))
+    df_fonte = celulas["VALOR"].groupby(celulas["FONTE"]).sum().reset_index()
+    return {
+        "posicoes": df_filtrado.posicoes,
+        "valor_faturado": celulas["VALOR"].sum(),
+        "df_line": df_line,
+        "df_fonte": df_fonte.sort_values("VALOR", ascending=True),
+    }
+
+
+# Mesma versão da aba + mesmos filtros = mesma visão: vem pronta do cache
+# compartilhado entre as sessões (ver cache_visoes.py)
+visao = lembrar(chave_visao(
+    data, "medicoes", programa=sel_programa, direc=sel_direc, municipio=sel_municipio, ano=sel_ano,
+    busca=termo,
+), calcular_visao)
+df_filtrado = Selecao(data, visao["posicoes"])
 
 
 # --- 1. BLOCO DE MÉTRICAS E GRÁFICOS ---
@@ -113,8 +115,7 @@ col1, col2 = st.columns(2)
 with col1:
     my_metric("Quantidade", len(df_filtrado), t_red, "fas fa-clipboard-list")
 with col2:
-    valor_faturado = df_filtrado["VALOR"].sum()
-    my_metric("Valor Faturado", formatar_moeda_visual(valor_faturado), t_green, "fas fa-file-invoice-dollar")
+    my_metric("Valor Faturado", formatar_moeda_visual(visao["valor_faturado"]), t_green, "fas fa-file-invoice-dollar")
 
 # Linha 2: Gráficos
 if not df_filtrado.empty:
@@ -122,8 +123,7 @@ if not df_filtrado.empty:
     
     with col3:
         # GRÁFICO DE LINHA
-        df_line = df_filtrado["DATA CADASTRO"].value_counts().sort_index().reset_index()
-        df_line.columns = ["Data", "Quantidade"]
+        df_line = visao["df_line"]
         
         fig_line = px.line(
             df_line, x="Data", y="Quantidade",
@@ -136,8 +136,7 @@ if not df_filtrado.empty:
 
     with col4:
         # GRÁFICO DE BARRAS
-        df_fonte = df_filtrado.groupby("FONTE")["VALOR"].sum().reset_index()
-        df_fonte = df_fonte.sort_values("VALOR", ascending=True) 
+        df_fonte = visao["df_fonte"]
         max_valor = df_fonte["VALOR"].max()
 
         fig_bar = px.bar(
@@ -171,10 +170,6 @@ with st.expander("Visualizar Tabela Completa", expanded=True):
                'DATA ORDEM BANCARIA', 'COMENTÁRIOS', 'ANO FISCAL']
 
     cols_to_show = [c for c in colunas if c in df_filtrado.columns]
-    df_display = df_filtrado[cols_to_show].copy()
-
-    if "VALOR" in df_display.columns:
-        df_display["VALOR"] = df_display["VALOR"].apply(formatar_moeda_visual)
 
-    st.dataframe(df_display, hide_index=True, use_container_width=True)
-    st.caption(f"Total de registros exibidos: {len(df_display)}")
\ No newline at end of file
+    # VALOR continua numérico (ordenável); o "R$ 1.234,56" é só formato de exibição
+    tabela_paginada(df_filtrado, cols_to_show, chave="medicoes", preparar=formatar_reais)
\ No newline at end of file
@@ -1,55 +1,25 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from utils import carregar_df, my_metric
+from utils import carregar_preparado, my_metric
+from filtros import Selecao, opcoes_filtro, selecionar
+from busca import buscar, normalizar
+from cache_visoes import chave_visao, lembrar
+from tabela import tabela_paginada
+from tipos import contar_valores
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(page_title="Pague Predial", layout="wide")
 
 # --- CARREGAMENTO DE DADOS ---
+# Consolidação das colunas e ajuste de Data/ANO ficam em preparo.preparar_pague
 planilha = st.secrets["planilha"]
 aba = st.secrets["aba_pague"] 
 
-data = carregar_df(planilha, aba)
-
-# --- TRATAMENTO DE DADOS (CONSOLIDAÇÃO) ---
-def consolidar_colunas(row, colunas_alvo):
-    """Junta valores de várias colunas em uma só, ignorando vazios."""
-    valores = [str(row[c]) for c in colunas_alvo if c in row and pd.notna(row[c]) and str(row[c]).strip() != ""]
-    return " | ".join(valores) if valores else "-"
-
-# 1. Consolidar ÁREA DE AÇÃO
-cols_area = ["Área de Ação (Baixa)", "Área de Ação (Média)"]
-data["Área Unificada"] = data.apply(consolidar_colunas, axis=1, colunas_alvo=cols_area)
-
-# 2. Consolidar DESCRIÇÃO
-cols_descricao = [
-    "Descrição do Serviço (Baixa - Hidráulica)",
-    "Descrição do Serviço (Baixa - Elétrica)",
-    "Descrição do Serviço (Baixa - Alvenaria/Marcenaria)",
-    "Descrição do Serviço (Baixa - Limpeza de Vegetação)",
-    "Descrição do Serviço (Baixa - Manutenção de Ar Condicionado)",
-    "Relato Problema Estrutural (Média)",
-    "Dúvida (Alta)"
-]
-data["Descrição Unificada"] = data.apply(consolidar_colunas, axis=1, colunas_alvo=cols_descricao)
-
-# 3. Consolidar DOCUMENTOS/PROPOSTAS
-cols_docs = [
-    "Proposta de Preço (Baixa)",
-    "Proposta de Preço (Média)",
-    "Ofício de Solicitação DIREC (Alta)"
-]
-data["Documentos Unificados"] = data.apply(consolidar_colunas, axis=1, colunas_alvo=cols_docs)
-
-# 4. Ajuste de Data e Criação de Coluna ANO
-if "Data" in data.columns:
-    data["Data"] = pd.to_datetime(data["Data"], dayfirst=True, errors='coerce')
-    data["ANO"] = data["Data"].dt.year # Cria coluna auxiliar de ano para o filtro
-    data["Data"] = data["Data"].dt.date # Remove a hora para visualização
-
-# Cria cópia para filtrar
-df_filtrado = data.copy()
+data = carregar_preparado(planilha, aba, "pague")
+
+# Colunas com índice de bitmaps (filtros.py), montado uma vez por versão da planilha
+COLUNAS_FILTRO = ["Município", "Situação Estrutural", "Área de Ação (Baixa)", "Área de Ação (Média)", "ANO"]
 
 st.title("🏫 Pague Predial - Solicitações de Manutenção")
 
@@ -63,14 +33,14 @@ st.sidebar.markdown("---")
 
 # 2. Filtro de Município
 if "Município" in data.columns:
-    opcoes_mun = ["Todos"] + sorted(data["Município"].dropna().unique().tolist())
+    opcoes_mun = ["Todos"] + opcoes_filtro(data, "Município", dropna=True)
     sel_municipio = st.sidebar.selectbox("Selecione o Município:", options=opcoes_mun)
 else:
     sel_municipio = "Todos"
 
 # 3. Filtro de Situação Estrutural
 if "Situação Estrutural" in data.columns:
-    opcoes_sit = ["Todas"] + sorted(data["Situação Estrutural"].dropna().unique().tolist())
+    opcoes_sit = ["Todas"] + opcoes_filtro(data, "Situação Estrutural", dropna=True)
     sel_situacao = st.sidebar.selectbox("Situação Estrutural:", options=opcoes_sit)
 else:
     sel_situacao = "Todas"
@@ -79,43 +49,69 @@ else:
 sel_area = [] 
 if sel_situacao == "Baixa complexidade":
     if "Área de Ação (Baixa)" in data.columns:
-        opcoes_area_baixa = sorted(data["Área de Ação (Baixa)"].dropna().unique().tolist())
+        opcoes_area_baixa = opcoes_filtro(data, "Área de Ação (Baixa)", dropna=True)
         sel_area = st.sidebar.multiselect("Área de Ação (Baixa):", options=opcoes_area_baixa, placeholder="Todos")
 
 elif sel_situacao == "Média complexidade":
     if "Área de Ação (Média)" in data.columns:
-        opcoes_area_media = sorted(data["Área de Ação (Média)"].dropna().unique().tolist())
+        opcoes_area_media = opcoes_filtro(data, "Área de Ação (Média)", dropna=True)
         sel_area = st.sidebar.multiselect("Área de Ação (Média):", options=opcoes_area_media, placeholder="Todos")
 
 # 5. Filtro de Ano (ATUALIZADO)
 sel_ano = []
 if "ANO" in data.columns:
     # Ordenei reverso para o ano mais atual aparecer primeiro na lista
-    ano_opcoes = sorted(data["ANO"].dropna().astype(int).unique().tolist(), reverse=True)
+    ano_opcoes = opcoes_filtro(data, "ANO", dropna=True, tipo="int", reverse=True)
     sel_ano = st.sidebar.multiselect("Selecione o ano:", options=ano_opcoes, placeholder="Todos")
 
 # --- APLICAÇÃO DOS FILTROS ---
-if busca_escola:
-    df_filtrado = df_filtrado[df_filtrado["Escola"].str.contains(busca_escola, case=False, na=False)]
-
-if sel_municipio != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["Município"] == sel_municipio]
-
-if sel_situacao != "Todas":
-    df_filtrado = df_filtrado[df_filtrado["Situação Estrutural"] == sel_situacao]
-
-if sel_area:
+# Busca normalizada uma vez: decide a busca e compõe a chave da visão (só pontuação = sem busca)
+termo = normalizar(busca_escola)
+
+def calcular_visao():
+    """Linhas filtradas (mais recentes primeiro), KPIs e tabelas dos gráficos."""
+    # Filtros de lista pelo índice de bitmaps
+    condicoes = {
+        "Município": None if sel_municipio == "Todos" else sel_municipio,
+        "Situação Estrutural": None if sel_situacao == "Todas" else sel_situacao,
+        "ANO": sel_ano,
+    }
     if sel_situacao == "Baixa complexidade":
-        df_filtrado = df_filtrado[df_filtrado["Área de Ação (Baixa)"].isin(sel_area)]
+        condicoes["Área de Ação (Baixa)"] = sel_area
     elif sel_situacao == "Média complexidade":
-        df_filtrado = df_filtrado[df_filtrado["Área de Ação (Média)"].isin(sel_area)]
-
-if sel_ano:
-    df_filtrado = df_filtrado[df_filtrado["ANO"].isin(sel_ano)]
-
-# ORDENAÇÃO POR DATA (Mais recente primeiro)
-if "Data" in df_filtrado.columns:
-    df_filtrado = df_filtrado.sort_values(by="Data", ascending=False)
+        condicoes["Área de Ação (Média)"] = sel_area
+
+    df_filtrado = selecionar(data, COLUNAS_FILTRO, condicoes)
+
+    # Busca por escola (índice sem acentos, ver busca.py)
+    if termo:
+        df_filtrado = df_filtrado.na_ordem(buscar(data, "Escola", termo))
+
+    # ORDENAÇÃO POR DATA (Mais recente primeiro)
+    if "Data" in df_filtrado.columns:
+        df_filtrado = df_filtrado.ordenar("Data", ascending=False)
+
+    situacao = df_filtrado["Situação Estrutural"]
+    df_sit = contar_valores(situacao).reset_index()
+    df_sit.columns = ["Situação", "Quantidade"]
+    df_direc = contar_valores(df_filtrado["DIREC"]).head(10).reset_index()
+    df_direc.columns = ["DIREC", "Quantidade"]
+    return {
+        "posicoes": df_filtrado.posicoes,
+        "qtd_alta": int((situacao == "Alta complexidade").sum()),
+        "qtd_media": int((situacao == "Média complexidade").sum()),
+        "qtd_baixa": int((situacao == "Baixa complexidade").sum()),
+        "df_sit": df_sit,
+        "df_direc": df_direc,
+    }
+
+# Mesma versão da aba + mesmos filtros = mesma visão: vem pronta do cache
+# compartilhado entre as sessões (ver cache_visoes.py)
+visao = lembrar(chave_visao(
+    data, "pague", municipio=sel_municipio, situacao=sel_situacao, area=sel_area, ano=sel_ano,
+    busca=termo,
+), calcular_visao)
+df_filtrado = Selecao(data, visao["posicoes"])
 
 
 # --- 1. BLOCO DE MÉTRICAS E GRÁFICOS ---
@@ -140,16 +136,13 @@ with col1:
     my_metric("Total Solicitações", len(df_filtrado), t_blue, "fas fa-clipboard-list")
 
 with col2:
-    qtd_alta = len(df_filtrado[df_filtrado["Situação Estrutural"] == "Alta complexidade"])
-    my_metric("Alta Complexidade", qtd_alta, t_red, "fas fa-exclamation-triangle")
+    my_metric("Alta Complexidade", visao["qtd_alta"], t_red, "fas fa-exclamation-triangle")
 
 with col3:
-    qtd_media = len(df_filtrado[df_filtrado["Situação Estrutural"] == "Média complexidade"])
-    my_metric("Média Complexidade", qtd_media, t_orange, "fas fa-exclamation-circle")
+    my_metric("Média Complexidade", visao["qtd_media"], t_orange, "fas fa-exclamation-circle")
 
 with col4:
-    qtd_baixa = len(df_filtrado[df_filtrado["Situação Estrutural"] == "Baixa complexidade"])
-    my_metric("Baixa Complexidade", qtd_baixa, t_green, "fas fa-tools")
+    my_metric("Baixa Complexidade", visao["qtd_baixa"], t_green, "fas fa-tools")
 
 
 # Linha 2: Gráficos
@@ -158,8 +151,7 @@ if not df_filtrado.empty:
     
     with col4:
         # GRÁFICO 1: Distribuição por Complexidade
-        df_sit = df_filtrado["Situação Estrutural"].value_counts().reset_index()
-        df_sit.columns = ["Situação", "Quantidade"]
+        df_sit = visao["df_sit"]
         
         fig_pie = px.pie(
             df_sit, values="Quantidade", names="Situação",
@@ -170,8 +162,7 @@ if not df_filtrado.empty:
 
     with col5:
         # GRÁFICO 2: Top 10 DIREC
-        df_direc = df_filtrado["DIREC"].value_counts().head(10).reset_index()
-        df_direc.columns = ["DIREC", "Quantidade"]
+        df_direc = visao["df_direc"]
         
         fig_bar = px.bar(
             df_direc, x="DIREC", y="Quantidade",
@@ -203,13 +194,12 @@ with st.expander("Visualizar Tabela Completa", expanded=True):
     ]
 
     cols_to_show = [c for c in colunas_finais if c in df_filtrado.columns]
-    
-    df_display = df_filtrado[cols_to_show].copy()
 
-    # Formatação de Data para String (Dia/Mês/Ano)
-    if "Data" in df_display.columns:
-        # Garante que é datetime antes de formatar
-        df_display["Data"] = pd.to_datetime(df_display["Data"]).dt.strftime('%d/%m/%Y')
+    def formatar_pagina(df_display):
+        # Formatação de Data para String (Dia/Mês/Ano), só nas linhas da página visível
+        if "Data" in df_display.columns:
+            # Garante que é datetime antes de formatar
+            df_display["Data"] = pd.to_datetime(df_display["Data"]).dt.strftime('%d/%m/%Y')
+        return df_display
 
-    st.dataframe(df_display, hide_index=True, use_container_width=True)
-    st.caption(f"Total de registros exibidos: {len(df_display)}")
\ No newline at end of file
+    tabela_paginada(df_filtrado, cols_to_show, chave="pague", preparar=formatar_pagina)
\ No newline at end of file
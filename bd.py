@@ -1,87 +1,83 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px 
-from utils import carregar_df, my_metric
+from utils import carregar_preparado, aviso_valores_invalidos, my_metric
+from filtros import Selecao, opcoes_cascata, opcoes_filtro, selecionar
+from busca import buscar, normalizar
+from cache_visoes import chave_visao, lembrar
+from cubo import LINHAS, consultar, obter_cubo
+from preparo import COLUNA_CODIGO_STATUS, STATUS_CANCELADO, STATUS_CONCLUIDO, STATUS_EXECUCAO
+from tabela import chaves_controles, tabela_paginada
+from secoes import escolher_secao
+from medicao import fragmento
+from estilos import formatar_reais
 from mitosheet.streamlit.v1 import spreadsheet # Import do Mito
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(page_title="Obras", layout="wide")
 
 # --- CARREGAMENTO DE DADOS (GLOBAL) ---
+# A limpeza (MUNICÍPIO, VALOR) fica em preparo.preparar_obras e roda uma vez por versão da planilha
 planilha = st.secrets["planilha"]
 aba = st.secrets["aba_bd"]
 
-data = carregar_df(planilha, aba)
+data = carregar_preparado(planilha, aba, "obras")
 
-
-# --- TRATAMENTO DE DADOS (LIMPEZA) ---
-# Tratamento básico de string
-data["MUNICÍPIO"] = data["MUNICÍPIO"].astype(str).str.strip()
-
-data_analise = data.copy()
-
-def limpar_moeda(valor):
-    if isinstance(valor, str):
-        # Remove R$, espaços e pontos de milhar, troca vírgula por ponto
-        limpo = valor.replace('R$', '').replace(' ', '').replace('.', '').replace(',', '.')
-        try:
-            return float(limpo)
-        except ValueError:
-            return 0.0
-    return valor if isinstance(valor, (int, float)) else 0.0
-
-# Aplica a limpeza se a coluna existir
-if "VALOR" in data.columns:
-    data["VALOR"] = data["VALOR"].apply(limpar_moeda)
+# Colunas com índice de bitmaps (filtros.py), montado uma vez por versão da planilha
+# (o código de status calculado na carga atende os toggles do Pague Predial)
+COLUNAS_FILTRO = ["PROGRAMA", "DIREC", "MUNICÍPIO", "ANO", COLUNA_CODIGO_STATUS]
+# Dimensões do cubo de KPIs e gráficos (cubo.py)
+DIMENSOES_CUBO = COLUNAS_FILTRO
 
 st.title("📝 Banco de Dados - Obras")
+aviso_valores_invalidos(data)
 
 # --- CRIAÇÃO DAS ABAS ---
-tab1, tab2 = st.tabs(["Dashboard & Filtros", "Análise Avançada"])
+# Só a aba escolhida roda: mexer nos filtros não monta a planilha do Mito (ver secoes.py)
+ABA_DASHBOARD = "Dashboard & Filtros"
+ABA_ANALISE = "Análise Avançada"
+FILTROS_DASHBOARD = ["obras_programa", "obras_busca", "obras_direc", "obras_municipio", "obras_ano",
+                     "obras_concluido", "obras_execucao"]
+aba_ativa = escolher_secao([ABA_DASHBOARD, ABA_ANALISE], "obras_aba",
+                           manter={ABA_DASHBOARD: FILTROS_DASHBOARD + chaves_controles("obras")})
 
 # ==============================================================================
 # ABA 1: DASHBOARD COM FILTROS LOCAIS
 # ==============================================================================
-with tab1:
+# Fragmento: mexer num filtro roda só o painel (filtros, KPIs, gráficos e tabela),
+# sem o topo da página; a tabela é um fragmento próprio (paginação e ordenação)
+@fragmento("Obras: painel")
+def painel_dashboard():
     # --- ÁREA DE FILTROS (DENTRO DA ABA) ---
     with st.expander("🔍 Filtros da Visualização", expanded=True):
         # Organizando em colunas para ficar visualmente agradável como no exemplo
         col_f1, col_f2, col_f3, col_f4, col_f5 = st.columns(5)
         
-        # Cópia local para filtragem
-        df_filtrado = data.copy()
-        
         with col_f1:
             # Filtro de Programa
-            opcoes_prog = ["Todos"] + sorted(data["PROGRAMA"].unique().tolist())
-            sel_programa = st.selectbox("Programa:", options=opcoes_prog)
+            opcoes_prog = ["Todos"] + opcoes_filtro(data, "PROGRAMA")
+            sel_programa = st.selectbox("Programa:", options=opcoes_prog, key="obras_programa")
 
         with col_f2:
             # Busca por Escola
-            busca_escola = st.text_input("Buscar Escola (Nome):")
+            busca_escola = st.text_input("Buscar Escola (Nome):", key="obras_busca")
 
         with col_f3:
             # Filtro de DIREC
-            direc_opcoes = sorted(data["DIREC"].unique().tolist())
-            sel_direc = st.multiselect("DIREC:", options=direc_opcoes, placeholder="Todas")
+            direc_opcoes = opcoes_filtro(data, "DIREC")
+            sel_direc = st.multiselect("DIREC:", options=direc_opcoes, placeholder="Todas", key="obras_direc")
             
         with col_f4:
              # --- LÓGICA DE FILTRO ANINHADO (CASCATA) ---
-             # Se houver DIREC selecionada, filtra os municípios. 
-             # Se não, mostra todos.
-            if sel_direc:
-                # Filtra o dataframe original apenas para pegar os municípios das DIRECs selecionadas
-                mun_disponiveis = data[data["DIREC"].isin(sel_direc)]["MUNICÍPIO"].unique().tolist()
-            else:
-                mun_disponiveis = data["MUNICÍPIO"].unique().tolist()
-
-            municipios_opcoes = ["Todos"] + sorted(mun_disponiveis)
-            sel_municipio = st.selectbox("Município:", options=municipios_opcoes)
+             # Se houver DIREC selecionada, mostra só os municípios dela (consulta ao
+             # mapa DIREC → municípios da versão atual). Se não, mostra todos.
+            municipios_opcoes = ["Todos"] + opcoes_cascata(data, "DIREC", "MUNICÍPIO", sel_direc)
+            sel_municipio = st.selectbox("Município:", options=municipios_opcoes, key="obras_municipio")
 
         with col_f5:
              # Filtro de Ano
-            ano_opcoes = sorted(data["ANO"].unique().tolist())
-            sel_ano = st.multiselect("Ano:", options=ano_opcoes, placeholder="Todos")
+            ano_opcoes = opcoes_filtro(data, "ANO", dropna=True)
+            sel_ano = st.multiselect("Ano:", options=ano_opcoes, placeholder="Todos", key="obras_ano")
 
         # Lógica Específica do "Pague Predial" (Toggles)
         # Colocamos abaixo das colunas se o programa for selecionado
@@ -92,40 +88,75 @@ with tab1:
             st.markdown("---")
             col_t1, col_t2, col_blank = st.columns([1, 1, 3])
             with col_t1:
-                filtro_concluido = st.toggle("Mostrar 'CONCLUÍDO'")
+                filtro_concluido = st.toggle("Mostrar 'CONCLUÍDO'", key="obras_concluido")
             with col_t2:
-                filtro_execucao = st.toggle("Mostrar 'EM EXECUÇÃO'")
+                filtro_execucao = st.toggle("Mostrar 'EM EXECUÇÃO'", key="obras_execucao")
 
     # --- APLICAÇÃO DOS FILTROS ---
-    
-    # 1. Filtro Programa e Toggles Específicos
-    if sel_programa != "Todos":
-        df_filtrado = df_filtrado[df_filtrado["PROGRAMA"] == sel_programa]
-        
-        # Lógica específica Pague Predial
+    # Busca normalizada uma vez: decide a busca e compõe a chave da visão (só pontuação = sem busca)
+    termo = normalizar(busca_escola)
+
+    def calcular_visao():
+        """Linhas filtradas, KPIs e tabelas dos gráficos para a combinação de filtros atual."""
+        # Filtros de lista pelo índice de bitmaps; os demais entram como máscaras extras
+        mascaras = []
+
+        # 1. Lógica específica Pague Predial (Toggles): os status escolhidos são um
+        # filtro comum sobre o código de status (lista vazia = todos)
+        status_escolhidos = []
         if sel_programa == "MANUTENÇÃO - PAGUE PREDIAL":
-            df_filtrado = df_filtrado[df_filtrado["OS"].notna()]
-            condicoes = []
+            mascaras.append(data["OS"].notna())
             if filtro_concluido:
-                condicoes.append(df_filtrado['STATUS'].str.startswith('CONCLUÍDO'))
+                status_escolhidos.append(STATUS_CONCLUIDO)
             if filtro_execucao:
-                condicoes.append(df_filtrado['STATUS'].str.startswith('EM EXECUÇÃO'))
-            
-            if condicoes:
-                filtro_final = condicoes[0]
-                for condicao in condicoes[1:]:
-                    filtro_final = filtro_final | condicao
-                df_filtrado = df_filtrado[filtro_final]
-
-    # 2. Outros Filtros
-    if busca_escola:
-        df_filtrado = df_filtrado[df_filtrado["ESCOLA"].str.contains(busca_escola, case=False, na=False)]
-    if sel_direc:
-        df_filtrado = df_filtrado[df_filtrado["DIREC"].isin(sel_direc)]
-    if sel_municipio != "Todos":
-        df_filtrado = df_filtrado[df_filtrado["MUNICÍPIO"] == sel_municipio]
-    if sel_ano:
-        df_filtrado = df_filtrado[df_filtrado["ANO"].isin(sel_ano)]
+                status_escolhidos.append(STATUS_EXECUCAO)
+
+        # 2. Interseção de tudo; df_filtrado guarda só as posições das linhas (sem cópia)
+        condicoes = {
+            "PROGRAMA": None if sel_programa == "Todos" else sel_programa,
+            "DIREC": sel_direc,
+            "MUNICÍPIO": None if sel_municipio == "Todos" else sel_municipio,
+            "ANO": sel_ano,
+            COLUNA_CODIGO_STATUS: status_escolhidos,
+        }
+        df_filtrado = selecionar(data, COLUNAS_FILTRO, condicoes, mascaras)
+
+        # 3. Busca por escola (índice sem acentos, ver busca.py): as melhores correspondências primeiro
+        if termo:
+            df_filtrado = df_filtrado.na_ordem(buscar(data, "ESCOLA", termo))
+
+        # 4. KPIs e gráficos: somas das células do cubo; com busca ou no Pague Predial
+        # (OS preenchida é filtro fora do cubo), das linhas filtradas
+        celulas = consultar(obter_cubo(data, DIMENSOES_CUBO, ["VALOR"]), condicoes, df_filtrado,
+                            fora_do_cubo=bool(mascaras or termo))
+
+        df_direc = celulas[LINHAS].groupby(celulas['DIREC']).sum().sort_values(ascending=False).reset_index()
+        df_direc.columns = ['DIREC', 'Qtd Obras']
+        df_direc['Ordem'] = pd.to_numeric(df_direc['DIREC'], errors='coerce')
+
+        df_fat = celulas['VALOR'].groupby(celulas['DIREC']).sum().reset_index()
+        # Ordenação Numérica (Mantemos isso para a ordem ficar correta: 1, 2, 3...)
+        df_fat['Ordem'] = pd.to_numeric(df_fat['DIREC'], errors='coerce')
+
+        # Os três cartões de status saem de uma única soma por código de status
+        por_status = celulas[[LINHAS, "VALOR"]].groupby(celulas[COLUNA_CODIGO_STATUS], observed=False).sum()
+
+        return {
+            "posicoes": df_filtrado.posicoes,
+            "qtd_execucao": int(por_status[LINHAS].get(STATUS_EXECUCAO, 0)),
+            "qtd_concluido": int(por_status[LINHAS].get(STATUS_CONCLUIDO, 0)),
+            "total_fat": por_status["VALOR"].drop(STATUS_CANCELADO, errors="ignore").sum(),
+            "df_direc": df_direc.sort_values('Ordem', na_position='last'),
+            "df_fat": df_fat.sort_values('Ordem', na_position='last'),
+        }
+
+    # Mesma versão da aba + mesmos filtros = mesma visão: vem pronta do cache
+    # compartilhado entre as sessões (ver cache_visoes.py)
+    visao = lembrar(chave_visao(
+        data, "obras", programa=sel_programa, direc=sel_direc, municipio=sel_municipio, ano=sel_ano,
+        busca=termo, concluido=filtro_concluido, execucao=filtro_execucao,
+    ), calcular_visao)
+    df_filtrado = Selecao(data, visao["posicoes"])
 
     # --- MÉTRICAS E GRÁFICOS ---
     blue = (150, 173, 231)
@@ -143,14 +174,11 @@ with tab1:
     with col1:
         my_metric("Total Geral", len(df_filtrado), red, "fas fa-clipboard-list")
     with col2:
-        qtd_execucao = len(df_filtrado[df_filtrado["STATUS"].str.startswith("EM EXECUÇÃO", na=False)])
-        my_metric("Em Execução", qtd_execucao, green, "fas fa-hammer")
+        my_metric("Em Execução", visao["qtd_execucao"], green, "fas fa-hammer")
     with col3:
-        qtd_concluido = len(df_filtrado[df_filtrado["STATUS"].str.startswith("CONCLUÍDO", na=False)])
-        my_metric("Concluído", qtd_concluido, blue, "fas fa-check-circle")
+        my_metric("Concluído", visao["qtd_concluido"], blue, "fas fa-check-circle")
     with col4:
-        total_fat = df_filtrado[df_filtrado["STATUS ÚNICO"] != "CANCELADO"]["VALOR"].sum()
-        my_metric("Valor Total OS", formatar_moeda_visual(total_fat), yellow, "fas fa-file-invoice-dollar")
+        my_metric("Valor Total OS", formatar_moeda_visual(visao["total_fat"]), yellow, "fas fa-file-invoice-dollar")
 
     # Gráficos
     if not df_filtrado.empty:
@@ -158,11 +186,7 @@ with tab1:
 
         with col_graf1:
             # GRÁFICO 1: OBRAS POR DIREC
-            df_direc = df_filtrado['DIREC'].value_counts().reset_index()
-            df_direc.columns = ['DIREC', 'Qtd Obras']
-            
-            df_direc['Ordem'] = pd.to_numeric(df_direc['DIREC'], errors='coerce')
-            df_direc = df_direc.sort_values('Ordem', na_position='last')
+            df_direc = visao["df_direc"]
 
             fig_direc = px.bar(
                 df_direc, x='DIREC', y='Qtd Obras', text='Qtd Obras',
@@ -180,11 +204,7 @@ with tab1:
 
         with col_graf2:
             # GRÁFICO 2: FATURAMENTO POR DIREC
-            df_fat = df_filtrado.groupby('DIREC')['VALOR'].sum().reset_index()
-    
-            # Ordenação Numérica (Mantemos isso para a ordem ficar correta: 1, 2, 3...)
-            df_fat['Ordem'] = pd.to_numeric(df_fat['DIREC'], errors='coerce')
-            df_fat = df_fat.sort_values('Ordem', na_position='last')
+            df_fat = visao["df_fat"]
 
             fig_fat = px.bar(
                 df_fat, x='DIREC', y='VALOR',
@@ -214,56 +234,28 @@ with tab1:
                    "EMPRESA", "ASSINATURA SEEC"]
         
         cols_to_show = [c for c in colunas if c in df_filtrado.columns]
-        df_display = df_filtrado[cols_to_show].copy()
 
-        def formatar_tabela(valor):
-            if pd.isna(valor) or valor == "": return "-"
-            try:
-                val_float = float(valor)
-                return f"R$ {val_float:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            except:
-                return valor
+        # VALOR, VALOR FATURADO e SALDO CONTRATUAL continuam numéricos (ordenáveis);
+        # o "R$ 1.234,56" é aplicado só na exibição (ver estilos.py)
+        tabela_paginada(df_filtrado, cols_to_show, chave="obras", preparar=formatar_reais)
 
-        colunas_financeiras = ["VALOR", "VALOR FATURADO", "SALDO CONTRATUAL"]
-        for col in colunas_financeiras:
-            if col in df_display.columns:
-                df_display[col] = df_display[col].apply(formatar_tabela)
 
-        st.dataframe(df_display, hide_index=True, use_container_width=True)
-        st.caption(f"Total de registros exibidos: {len(df_display)}")
+if aba_ativa == ABA_DASHBOARD:
+    painel_dashboard()
 
 
 # ==============================================================================
 # ABA 2: ANÁLISE AVANÇADA (MITO)
 # ==============================================================================
-with tab2:
+elif aba_ativa == ABA_ANALISE:
     st.header("Análise Avançada de Obras")
     st.markdown("Utilize a planilha abaixo para criar tabelas dinâmicas, filtrar e editar os dados originais.")
 
-    # --- BLOCO DE TRATAMENTO DE DADOS ---
-    
-    # A. Limpeza de Colunas Financeiras (Loop para várias colunas)
-    cols_financeiras = ["VALOR", "VALOR FATURADO", "SALDO CONTRATUAL"]
-    
-    for col in cols_financeiras:
-        if col in data_analise.columns:
-            data_analise[col] = data_analise[col].apply(limpar_moeda)
-
-    # B. Tratamento de INEP (Numérico -> Inteiro -> String sem .00)
-    if "INEP" in data_analise.columns:
-        # 1. Garante que é número, transforma erros em NaN
-        data_analise["INEP"] = pd.to_numeric(data_analise["INEP"], errors='coerce')
-        # 2. Preenche vazios com 0
-        data_analise["INEP"] = data_analise["INEP"].fillna(0)
-        # 3. Converte para Inteiro (corta decimal) e depois para String
-        data_analise["INEP"] = data_analise["INEP"].astype(int).astype(str)
-        # 4. Limpeza visual: Se virou "0", volta a ser vazio ""
-        data_analise["INEP"] = data_analise["INEP"].replace("0", "")
-
-    # C. Tratamento de DIAS (Converter para Inteiro)
-    if "DIAS" in data_analise.columns:
-        data_analise["DIAS"] = pd.to_numeric(data_analise["DIAS"], errors='coerce').fillna(0).astype(int)
+    # --- DADOS TRATADOS ---
+    # Colunas financeiras, INEP e DIAS já vêm tratados de preparo.preparar_obras_analise
+    data_analise = carregar_preparado(planilha, aba, "obras_analise")
 
     # --- EXIBIÇÃO NO MITO ---
     # Agora passamos o dataframe 'data_analise' totalmente limpo e formatado
-    dfs, code = spreadsheet(data_analise)
\ No newline at end of file
+    # Cópia rasa e alterável: a tabela compartilhada é somente leitura e a planilha do Mito edita os dados
+    dfs, code = spreadsheet(data_analise.copy(deep=False))
\ No newline at end of file
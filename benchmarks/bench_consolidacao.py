@@ -0,0 +1,64 @@
+# Arquivo: benchmarks/bench_consolidacao.py
+# Compara a consolidação antiga do Pague Predial (três data.apply(axis=1)) com
+# preparo.consolidar_colunas, que trabalha coluna a coluna.
+# Uso (na raiz do projeto): python benchmarks/bench_consolidacao.py
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from preparo import CONSOLIDACOES_PAGUE, consolidar_colunas
+
+
+def consolidar_linha(row, colunas_alvo):
+    # Versão original, copiada de bd-pague.py
+    valores = [str(row[c]) for c in colunas_alvo if c in row and pd.notna(row[c]) and str(row[c]).strip() != ""]
+    return " | ".join(valores) if valores else "-"
+
+
+def consolidar_antigo(data):
+    for destino, origens in CONSOLIDACOES_PAGUE.items():
+        data[destino] = data.apply(consolidar_linha, axis=1, colunas_alvo=origens)
+    return data
+
+
+def gerar_formulario(n, seed=42):
+    """Formulário parecido com o real: cada resposta preenche só algumas colunas."""
+    rng = np.random.default_rng(seed)
+    colunas = {}
+    for origens in CONSOLIDACOES_PAGUE.values():
+        for c in origens:
+            valores = np.array([f"{c[:12]} {i}" for i in range(n)], dtype=object)
+            sorteio = rng.random(n)
+            valores[sorteio < 0.6] = np.nan
+            valores[(sorteio >= 0.6) & (sorteio < 0.65)] = "  "
+            colunas[c] = valores
+    return pd.DataFrame(colunas)
+
+
+def medir(func, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+if __name__ == "__main__":
+    print(f"{'linhas':>10} | {'apply (s)':>10} | {'colunar (s)':>11} | {'ganho':>6}")
+    for n in [1_000, 10_000, 100_000]:
+        formulario = gerar_formulario(n)
+
+        antigo = consolidar_antigo(formulario.copy())
+        novo = consolidar_colunas(formulario.copy(), CONSOLIDACOES_PAGUE)
+        for destino in CONSOLIDACOES_PAGUE:
+            assert antigo[destino].tolist() == novo[destino].tolist(), destino
+
+        repeticoes = 1 if n >= 100_000 else 3
+        t_apply = medir(lambda: consolidar_antigo(formulario.copy()), repeticoes)
+        t_colunar = medir(lambda: consolidar_colunas(formulario.copy(), CONSOLIDACOES_PAGUE), repeticoes)
+        print(f"{n:>10,} | {t_apply:>10.3f} | {t_colunar:>11.3f} | {t_apply / t_colunar:>5.1f}x")
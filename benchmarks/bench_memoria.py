@@ -0,0 +1,154 @@
+# Arquivo: benchmarks/bench_memoria.py
+# Pico de memória de um rerun da página de Obras (bd.py), antes e depois do
+# caminho sem cópias (filtros.selecionar + cache_resource).
+# "antes": as duas leituras do cache_data (bruto e preparado, desserializadas a cada
+# rerun), data.copy(), filtros encadeados e df_filtrado[cols].copy() na tabela.
+# "depois": DataFrame compartilhado, seleção por posições e só as colunas exibidas
+# copiadas.
+# Cada cenário roda num processo separado: o pico do pyarrow (onde ficam as
+# colunas de texto no pandas 3) não pode ser zerado dentro do mesmo processo.
+# Uso (na raiz do projeto): python benchmarks/bench_memoria.py
+import os
+import pickle
+import subprocess
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COLUNAS_TABELA = ["PROCESSO", "OS", "PROGRAMA", "ESCOLA", "MUNICÍPIO", "DIREC", "DESCRIÇÃO",
+                  "ANO", "STATUS", "VALOR", "VALOR FATURADO", "SALDO CONTRATUAL", "PERCENTUAL EXECUTADO",
+                  "EMPRESA", "ASSINATURA SEEC"]
+COLUNAS_FINANCEIRAS = ["VALOR", "VALOR FATURADO", "SALDO CONTRATUAL"]
+COLUNAS_FILTRO = ["PROGRAMA", "DIREC", "MUNICÍPIO", "ANO"]
+
+# (descrição, DIRECs selecionadas, anos selecionados)
+FILTROS = {
+    "sem filtro": ([], []),
+    "3 DIRECs, 2 anos": ([1, 2, 3], [2024, 2025]),
+}
+
+
+def gerar_obras(n, seed=42):
+    """Aba de obras sintética, já preparada (valores numéricos), com colunas extras como a real."""
+    rng = np.random.default_rng(seed)
+    status = np.array(["EM EXECUÇÃO", "CONCLUÍDO", "CANCELADO", "PARALISADA"], dtype=object)
+    data = {
+        "PROCESSO": [f"SEI-{i:08d}" for i in range(n)],
+        "OS": [f"OS {i}" for i in range(n)],
+        "PROGRAMA": rng.choice(["REFORMA", "AMPLIAÇÃO", "MANUTENÇÃO - PAGUE PREDIAL", "CONSTRUÇÃO"], n),
+        "ESCOLA": [f"ESCOLA ESTADUAL NÚMERO {i % 700}" for i in range(n)],
+        "MUNICÍPIO": [f"MUNICÍPIO {i % 167}" for i in range(n)],
+        "DIREC": rng.integers(1, 17, n),
+        "DESCRIÇÃO": [f"Serviço de reforma e adequação da unidade {i}" for i in range(n)],
+        "ANO": rng.integers(2019, 2027, n),
+        "STATUS": rng.choice(status, n),
+        "VALOR": rng.random(n) * 1e6,
+        "VALOR FATURADO": rng.random(n) * 1e6,
+        "SALDO CONTRATUAL": rng.random(n) * 1e5,
+        "PERCENTUAL EXECUTADO": rng.random(n),
+        "EMPRESA": [f"EMPRESA {i % 90} LTDA" for i in range(n)],
+        "ASSINATURA SEEC": [f"{1 + i % 28:02d}/{1 + i % 12:02d}/2025" for i in range(n)],
+    }
+    data["STATUS ÚNICO"] = data["STATUS"]
+    for k in range(15):
+        data[f"OBSERVAÇÃO {k}"] = [f"observação {k} da linha {i}" for i in range(n)]
+    return pd.DataFrame(data)
+
+
+def formatar_tabela(valor):
+    # Mesma formatação da tabela de bd.py
+    if pd.isna(valor) or valor == "": return "-"
+    try:
+        val_float = float(valor)
+        return f"R$ {val_float:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    except:
+        return valor
+
+
+def rerun_antes(bruto_serializado, preparado_serializado, sel_direc, sel_ano):
+    # cache_data devolve uma cópia (desserializada) de cada função em cada rerun
+    pickle.loads(bruto_serializado)
+    data = pickle.loads(preparado_serializado)
+
+    df_filtrado = data.copy()
+    if sel_direc:
+        df_filtrado = df_filtrado[df_filtrado["DIREC"].isin(sel_direc)]
+    if sel_ano:
+        df_filtrado = df_filtrado[df_filtrado["ANO"].isin(sel_ano)]
+
+    len(df_filtrado[df_filtrado["STATUS"].str.startswith("EM EXECUÇÃO", na=False)])
+    len(df_filtrado[df_filtrado["STATUS"].str.startswith("CONCLUÍDO", na=False)])
+    df_filtrado[df_filtrado["STATUS ÚNICO"] != "CANCELADO"]["VALOR"].sum()
+    df_filtrado.groupby("DIREC")["VALOR"].sum()
+
+    df_display = df_filtrado[COLUNAS_TABELA].copy()
+    for col in COLUNAS_FINANCEIRAS:
+        df_display[col] = df_display[col].apply(formatar_tabela)
+    return df_display
+
+
+def rerun_depois(data, indice, sel_direc, sel_ano):
+    from filtros import Selecao
+
+    if sel_direc or sel_ano:
+        df_filtrado = Selecao(data, indice.posicoes(indice.filtrar({"DIREC": sel_direc, "ANO": sel_ano})))
+    else:
+        df_filtrado = Selecao(data)
+
+    int(df_filtrado["STATUS"].str.startswith("EM EXECUÇÃO", na=False).sum())
+    int(df_filtrado["STATUS"].str.startswith("CONCLUÍDO", na=False).sum())
+    df_filtrado["VALOR"][df_filtrado["STATUS ÚNICO"] != "CANCELADO"].sum()
+    df_filtrado["VALOR"].groupby(df_filtrado["DIREC"]).sum()
+
+    df_display = df_filtrado.linhas(COLUNAS_TABELA)
+    for col in COLUNAS_FINANCEIRAS:
+        df_display[col] = df_display[col].apply(formatar_tabela)
+    return df_display
+
+
+def medir_cenario(cenario, n, filtro):
+    """Roda um rerun e devolve o pico de memória (MB) alocado durante ele."""
+    from filtros import IndiceFiltros
+
+    sel_direc, sel_ano = FILTROS[filtro]
+    data = gerar_obras(n)
+    # O que fica guardado nos caches entre reruns não conta como custo do rerun
+    if cenario == "antes":
+        bruto = pickle.dumps(data)
+        preparado = pickle.dumps(data)
+        executar = lambda: rerun_antes(bruto, preparado, sel_direc, sel_ano)
+    else:
+        indice = IndiceFiltros(data, COLUNAS_FILTRO)
+        executar = lambda: rerun_depois(data, indice, sel_direc, sel_ano)
+
+    pool = pa.default_memory_pool()
+    arrow_inicio = pool.bytes_allocated()
+    tracemalloc.start()
+    executar()
+    _, pico_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pico_arrow = max(pool.max_memory() - arrow_inicio, 0)
+    return (pico_python + pico_arrow) / 1e6
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        # Processo filho: um cenário só
+        print(medir_cenario(sys.argv[1], int(sys.argv[2]), sys.argv[3]))
+        sys.exit(0)
+
+    print(f"{'linhas':>8} | {'filtro':<18} | {'antes (MB)':>10} | {'depois (MB)':>11} | {'redução':>7}")
+    for n in [5_000, 50_000]:
+        for filtro in FILTROS:
+            picos = {}
+            for cenario in ["antes", "depois"]:
+                saida = subprocess.run([sys.executable, __file__, cenario, str(n), filtro],
+                                       capture_output=True, text=True, check=True)
+                picos[cenario] = float(saida.stdout.strip().splitlines()[-1])
+            print(f"{n:>8,} | {filtro:<18} | {picos['antes']:>10.1f} | {picos['depois']:>11.1f} | "
+                  f"{picos['antes'] / picos['depois']:>6.1f}x")
@@ -0,0 +1,63 @@
+# Arquivo: benchmarks/bench_moeda.py
+# Compara o limpar_moeda antigo (Series.apply, célula a célula) com moeda.converter_moeda,
+# numa coluna mista (textos, números e vazios, como a da conta de serviço) e numa coluna
+# só de textos (tipo str do pandas, como a da leitura pública).
+# Uso (na raiz do projeto): python benchmarks/bench_moeda.py
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from moeda import converter_moeda
+
+
+def limpar_moeda(valor):
+    # Versão original, copiada de bd.py / bd-medicoes.py
+    if isinstance(valor, str):
+        limpo = valor.replace('R$', '').replace(' ', '').replace('.', '').replace(',', '.')
+        try:
+            return float(limpo)
+        except ValueError:
+            return 0.0
+    return valor if isinstance(valor, (int, float)) else 0.0
+
+
+def gerar_coluna(n, seed=42):
+    """Coluna parecida com a da planilha: textos "R$ 1.234,56", números soltos, vazios e lixo."""
+    rng = np.random.default_rng(seed)
+    valores = rng.uniform(0, 5_000_000, n).round(2)
+    textos = [f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") for v in valores]
+    coluna = pd.Series(textos, dtype=object)
+    sorteio = rng.random(n)
+    coluna[sorteio < 0.05] = valores[sorteio < 0.05]
+    coluna[(sorteio >= 0.05) & (sorteio < 0.08)] = np.nan
+    coluna[(sorteio >= 0.08) & (sorteio < 0.09)] = "A DEFINIR"
+    return coluna
+
+
+def medir(func, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+if __name__ == "__main__":
+    print(f"{'coluna':>6} | {'linhas':>10} | {'apply (s)':>10} | {'vetorizado (s)':>14} | {'ganho':>6} | inválidos")
+    for n in [10_000, 100_000, 1_000_000]:
+        mista = gerar_coluna(n)
+        textos = pd.Series([v if isinstance(v, str) else None for v in mista], dtype="str")
+        for nome, coluna in [("mista", mista), ("str", textos)]:
+            # Vazios continuam vazios no conversor novo (o antigo os trocava por 0.0)
+            antigo = coluna.apply(limpar_moeda).astype("float64").where(coluna.notna())
+            novo, invalidos = converter_moeda(coluna, invalido=0.0)
+            pd.testing.assert_series_equal(antigo, novo, check_names=False)
+
+            t_apply = medir(lambda: coluna.apply(limpar_moeda))
+            t_vetor = medir(lambda: converter_moeda(coluna, invalido=0.0))
+            print(f"{nome:>6} | {n:>10,} | {t_apply:>10.3f} | {t_vetor:>14.3f} | {t_apply / t_vetor:>5.1f}x | {invalidos:,}")
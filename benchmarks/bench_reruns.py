@@ -0,0 +1,145 @@
+# Arquivo: benchmarks/bench_reruns.py
+# Latência de cada interação nas páginas de Obras (bd.py) e Medições
+# (bd-medicoes.py), rodando as páginas de verdade pelo AppTest do Streamlit com
+# abas sintéticas no lugar do Google Sheets.
+# "script inteiro": tempo do AppTest.run, que sempre executa a página toda.
+# "só o fragmento": tempo do fragmento que a interação reexecuta no app de verdade
+# (medido pelo próprio fragmento, ver medicao.py); filtros da barra lateral das
+# Medições não estão num fragmento e rodam a página inteira.
+# As duas colunas vêm da mesma versão do código: não é uma comparação com a versão
+# anterior aos fragmentos (para isso, rode o script nos dois commits).
+# Uso (na raiz do projeto, com as dependências do requirements.txt):
+#     python benchmarks/bench_reruns.py
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+SECRETS = {"pass": "bench", "planilha": "bench", "aba_bd": "obras", "aba_medicoes": "medicoes"}
+LINHAS = 50_000
+REPETICOES = 5
+
+
+def _reais(valores):
+    return [f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") for v in valores]
+
+
+def gerar_abas(n, seed=42):
+    """Abas brutas (tudo texto, como vêm da planilha) de Obras e Medições."""
+    rng = np.random.default_rng(seed)
+    programas = ["REFORMA", "AMPLIAÇÃO", "MANUTENÇÃO - PAGUE PREDIAL", "CONSTRUÇÃO"]
+    obras = pd.DataFrame({
+        "PROCESSO": [f"SEI-{i:08d}" for i in range(n)],
+        "OS": [f"OS {i}" if i % 3 else None for i in range(n)],
+        "PROGRAMA": rng.choice(programas, n),
+        "ESCOLA": [f"ESCOLA ESTADUAL NÚMERO {i % 700}" for i in range(n)],
+        "MUNICÍPIO": [f"MUNICÍPIO {i % 167}" for i in range(n)],
+        "DIREC": rng.integers(1, 17, n).astype(str),
+        "DESCRIÇÃO": [f"Serviço de reforma e adequação da unidade {i}" for i in range(n)],
+        "ANO": rng.integers(2019, 2027, n).astype(str),
+        "STATUS": rng.choice(["EM EXECUÇÃO", "CONCLUÍDO", "CANCELADO", "PARALISADA"], n),
+        "VALOR": _reais(rng.random(n) * 1e6),
+        "VALOR FATURADO": _reais(rng.random(n) * 1e6),
+        "SALDO CONTRATUAL": _reais(rng.random(n) * 1e5),
+        "PERCENTUAL EXECUTADO": rng.random(n).round(2).astype(str),
+        "EMPRESA": [f"EMPRESA {i % 90} LTDA" for i in range(n)],
+        "ASSINATURA SEEC": [f"{1 + i % 28:02d}/{1 + i % 12:02d}/2025" for i in range(n)],
+    })
+    obras["STATUS ÚNICO"] = obras["STATUS"]
+    medicoes = pd.DataFrame({
+        "PROGRAMA": rng.choice(programas, n),
+        "ESCOLA": [f"ESCOLA ESTADUAL NÚMERO {i % 700}" for i in range(n)],
+        "MUNICÍPIO": [f"MUNICÍPIO {i % 167}" for i in range(n)],
+        "DIREC": rng.integers(1, 17, n).astype(str),
+        "ANO FISCAL": rng.integers(2019, 2027, n).astype(str),
+        "FONTE": [f"FONTE {i % 12}" for i in range(n)],
+        "VALOR": _reais(rng.random(n) * 1e5),
+        "DATA CADASTRO": [f"{1 + i % 28:02d}/{1 + i % 12:02d}/{2019 + i % 7}" for i in range(n)],
+        "EMPRESA": [f"EMPRESA {i % 90} LTDA" for i in range(n)],
+    })
+    return {"obras": obras, "medicoes": medicoes}
+
+
+def preparar_ambiente(n):
+    """Importa utils com os secrets do benchmark e troca a leitura do Sheets pelas abas sintéticas."""
+    secrets = Secrets()
+    secrets._secrets = SECRETS
+    st.secrets = secrets
+    import utils
+    from somente_leitura import somente_leitura
+
+    abas = {}
+    for nome, data in gerar_abas(n).items():
+        data.attrs["versao"] = f"bench-{nome}-{n}"
+        abas[nome] = somente_leitura(data)
+    utils.carregar_compartilhado = lambda planilha, aba: abas[aba]
+
+
+def _ultimo_ms(trecho):
+    from medicao import tempos_medidos
+    return tempos_medidos()[trecho]["ultimo_ms"]
+
+
+def medir(app, interagir, trecho):
+    """Mediana em ms de (script inteiro, só o fragmento 'trecho'); sem 'trecho', as duas são o script inteiro."""
+    inteiro, fragmento = [], []
+    for i in range(REPETICOES):
+        interagir(app, i)
+        inicio = time.perf_counter()
+        app.run(timeout=120)
+        total = (time.perf_counter() - inicio) * 1000
+        if app.exception:
+            raise RuntimeError(app.exception[0].value)
+        inteiro.append(total)
+        fragmento.append(_ultimo_ms(trecho) if trecho else total)
+    return statistics.median(inteiro), statistics.median(fragmento)
+
+
+def _alternar(widget, valores, i):
+    widget.set_value(valores[i % len(valores)])
+
+
+def _por_rotulo(elementos, rotulo):
+    return next(e for e in elementos if e.label == rotulo)
+
+
+INTERACOES = {
+    "bd.py": [
+        ("filtro DIREC", lambda at, i: _alternar(at.multiselect(key="obras_direc"), [["1", "2"], []], i), "Obras: painel"),
+        ("filtro Ano", lambda at, i: _alternar(at.multiselect(key="obras_ano"), [["2024"], []], i), "Obras: painel"),
+        ("página da tabela", lambda at, i: at.number_input(key="obras_pagina").set_value(2 + i), "Tabela (obras)"),
+        ("ordenação da tabela", lambda at, i: _alternar(at.selectbox(key="obras_ordem"), ["VALOR", "ESCOLA"], i),
+         "Tabela (obras)"),
+    ],
+    "bd-medicoes.py": [
+        ("filtro DIREC (barra lateral)",
+         lambda at, i: _alternar(_por_rotulo(at.sidebar.multiselect, "Selecione a DIREC:"), [["1", "2"], []], i), None),
+        ("filtro Ano (barra lateral)",
+         lambda at, i: _alternar(_por_rotulo(at.sidebar.multiselect, "Selecione o ano:"), [["2024"], []], i), None),
+        ("página da tabela", lambda at, i: at.number_input(key="medicoes_pagina").set_value(2 + i), "Tabela (medicoes)"),
+        ("ordenação da tabela", lambda at, i: _alternar(at.selectbox(key="medicoes_ordem"), ["VALOR", "ESCOLA"], i),
+         "Tabela (medicoes)"),
+    ],
+}
+
+
+if __name__ == "__main__":
+    preparar_ambiente(LINHAS)
+    print(f"{LINHAS:,} linhas por aba, mediana de {REPETICOES} interações")
+    print(f"{'página':<15} | {'interação':<29} | {'script inteiro (ms)':>19} | {'só o fragmento (ms)':>19}")
+    for pagina, interacoes in INTERACOES.items():
+        app = AppTest.from_file(os.path.join(RAIZ, pagina), default_timeout=120)
+        app.secrets.update(SECRETS)
+        app.run()  # primeira carga: preparo, índices e cubo ficam em cache
+        for descricao, interagir, trecho in interacoes:
+            inteiro, fragmento = medir(app, interagir, trecho)
+            print(f"{pagina:<15} | {descricao:<29} | {inteiro:>19.1f} | {fragmento:>19.1f}")
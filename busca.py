@@ -0,0 +1,105 @@
+# Arquivo: busca.py
+# Busca por nome de escola sem diferenciar acentos e maiúsculas ("joao" encontra
+# "JOÃO"). O índice é montado uma vez por versão da aba: nomes normalizados,
+# trigramas de cada nome e as linhas de cada nome. A consulta só confere os nomes
+# que têm todos os trigramas digitados, e devolve as linhas dos melhores primeiro.
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sincronizacao import versao_df
+
+_SEPARADORES = re.compile(r"[\W_]+")
+
+# Ordem do ranking (menor = melhor)
+_IGUAL, _COMECA_COM, _PALAVRAS_INTEIRAS, _INICIO_DE_PALAVRAS, _TRECHO = range(5)
+
+
+def normalizar(texto):
+    """Minúsculas, sem acentos e com pontuação virando espaço: "E.E. João" -> "e e joao"."""
+    decomposto = unicodedata.normalize("NFKD", str(texto).casefold())
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return _SEPARADORES.sub(" ", sem_acentos).strip()
+
+
+def _trigramas(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class IndiceBusca:
+    """Índice de trigramas sobre os nomes distintos de uma coluna de texto."""
+
+    def __init__(self, serie):
+        codigos, nomes = pd.factorize(serie, use_na_sentinel=True)
+        self.nomes = [normalizar(nome) for nome in nomes]
+        self._palavras = [nome.split() for nome in self.nomes]
+
+        # Linhas de cada nome (linhas vazias, código -1, ficam de fora)
+        ordem = np.argsort(codigos, kind="stable")
+        limites = np.searchsorted(codigos[ordem], np.arange(len(nomes) + 1))
+        self._linhas = [ordem[limites[k]:limites[k + 1]] for k in range(len(nomes))]
+
+        postagens = {}
+        for k, nome in enumerate(self.nomes):
+            for trigrama in _trigramas(nome):
+                postagens.setdefault(trigrama, []).append(k)
+        self._postagens = {t: np.array(ids, dtype=np.int32) for t, ids in postagens.items()}
+
+    def _candidatos(self, tokens):
+        # Interseção das listas dos trigramas; tokens com menos de 3 letras só são conferidos depois
+        candidatos = None
+        for token in tokens:
+            for trigrama in _trigramas(token):
+                ids = self._postagens.get(trigrama)
+                if ids is None:
+                    return np.array([], dtype=np.int32)
+                candidatos = ids if candidatos is None else np.intersect1d(candidatos, ids, assume_unique=True)
+        return np.arange(len(self.nomes)) if candidatos is None else candidatos
+
+    def _nota(self, k, consulta, tokens):
+        nome = self.nomes[k]
+        if nome == consulta:
+            return _IGUAL
+        if nome.startswith(consulta):
+            return _COMECA_COM
+        palavras = self._palavras[k]
+        if all(t in palavras for t in tokens):
+            return _PALAVRAS_INTEIRAS
+        if all(any(p.startswith(t) for p in palavras) for t in tokens):
+            return _INICIO_DE_PALAVRAS
+        return _TRECHO
+
+    def buscar(self, texto):
+        """
+        Posições (iloc) das linhas cujo nome contém todas as palavras digitadas, em
+        qualquer ordem. As linhas dos nomes mais parecidos com a busca vêm primeiro
+        (nome igual, começa com a busca, palavras inteiras, início de palavras, trecho).
+        """
+        consulta = normalizar(texto)
+        tokens = consulta.split()
+        if not tokens:
+            return np.array([], dtype=np.intp)
+
+        encontrados = []
+        for k in self._candidatos(tokens):
+            if all(t in self.nomes[k] for t in tokens):
+                encontrados.append((self._nota(k, consulta, tokens), len(self.nomes[k]), self.nomes[k], k))
+        encontrados.sort()
+        if not encontrados:
+            return np.array([], dtype=np.intp)
+        return np.concatenate([self._linhas[k] for *_, k in encontrados])
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _indice(_data, coluna, versao):
+    return IndiceBusca(_data[coluna])
+
+
+def buscar(data, coluna, texto):
+    """
+    Busca 'texto' na coluna de nomes (ESCOLA, Escola...) usando o índice da versão
+    atual da aba. Devolve as posições das linhas encontradas, melhores primeiro.
+    """
+    return _indice(data, coluna, versao_df(data)).buscar(texto)
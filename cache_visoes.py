@@ -0,0 +1,116 @@
+# Arquivo: cache_visoes.py
+# Cache LRU compartilhado por todas as sessões para as "visões" das páginas:
+# linhas filtradas, valores dos KPIs e tabelas dos gráficos de uma combinação de
+# filtros. Vários usuários olhando a mesma DIREC no mesmo ano recebem o resultado
+# pronto. A chave inclui a versão da aba, então uma planilha nova nunca recebe
+# resultado antigo. O tamanho total respeita um limite de memória.
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sincronizacao import versao_df
+
+# Memória máxima (MB) ocupada pelas visões guardadas
+LIMITE_CACHE_VISOES_MB = int(os.environ.get("SCMCE_CACHE_VISOES_MB", "128"))
+
+
+def tamanho_em_bytes(valor):
+    """Estimativa do espaço ocupado por um resultado (arrays, DataFrames e containers)."""
+    if valor is None:
+        return 0
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        uso = valor.memory_usage(deep=True, index=True)
+        return int(uso.sum()) if isinstance(valor, pd.DataFrame) else int(uso)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamanho_em_bytes(k) + tamanho_em_bytes(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple, set)):
+        return sys.getsizeof(valor) + sum(tamanho_em_bytes(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CacheLRU:
+    """LRU com limite em bytes; descarta os itens usados há mais tempo quando estoura."""
+
+    def __init__(self, limite_bytes):
+        self.limite_bytes = limite_bytes
+        self._itens = OrderedDict()  # chave -> (valor, tamanho)
+        self._trava = threading.Lock()
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def obter(self, chave, calcular):
+        """Devolve o valor guardado em 'chave' ou calcula, guarda e devolve."""
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave][0]
+            self.falhas += 1
+
+        # Cálculo fora da trava: outras sessões não esperam por ele
+        valor = calcular()
+        tamanho = tamanho_em_bytes(valor)
+        if tamanho > self.limite_bytes:
+            return valor
+
+        with self._trava:
+            if chave in self._itens:
+                self.bytes_usados -= self._itens.pop(chave)[1]
+            self._itens[chave] = (valor, tamanho)
+            self.bytes_usados += tamanho
+            while self.bytes_usados > self.limite_bytes:
+                _, (_, removido) = self._itens.popitem(last=False)
+                self.bytes_usados -= removido
+                self.descartes += 1
+        return valor
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = self.acertos + self.falhas
+            return {
+                "itens": len(self._itens),
+                "mb_usados": self.bytes_usados / 1024 ** 2,
+                "mb_limite": self.limite_bytes / 1024 ** 2,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "descartes": self.descartes,
+                "taxa_acerto": self.acertos / consultas if consultas else None,
+            }
+
+
+@st.cache_resource
+def _cache_visoes():
+    return CacheLRU(LIMITE_CACHE_VISOES_MB * 1024 ** 2)
+
+
+def _normalizar(valor):
+    # Seleções múltiplas viram tuplas ordenadas: a ordem dos cliques não muda o resultado
+    if isinstance(valor, (list, tuple, set)):
+        return tuple(sorted(valor, key=str))
+    return valor
+
+
+def chave_visao(data, pagina, **filtros):
+    """Chave da visão: (versão da aba, página, filtros normalizados em ordem fixa)."""
+    return (versao_df(data), pagina, tuple((nome, _normalizar(v)) for nome, v in sorted(filtros.items())))
+
+
+def lembrar(chave, calcular):
+    """
+    Resultado de 'calcular()' para a chave, vindo do cache compartilhado quando
+    outra sessão já calculou. O valor é compartilhado: quem recebe não deve alterá-lo.
+    """
+    return _cache_visoes().obter(chave, calcular)
+
+
+def estatisticas_cache_visoes():
+    """Acertos, falhas, descartes e memória usada pelo cache de visões."""
+    return _cache_visoes().estatisticas()
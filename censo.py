@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 import folium
 from streamlit_folium import st_folium
-from utils import carregar_df
+from censo_base import carregar_censo
+from mapa_censo import mostrar_mapa_estado
 
 # Configuração da página
 st.set_page_config(page_title="Censo", layout="wide")
@@ -14,37 +15,20 @@ planilha_censo = st.secrets["planilha_censo"]
 aba_censo_25 = st.secrets["aba_censo_25"]
 aba_censo_25_matriculas = st.secrets["aba_censo_25_matriculas"]
 
-# Carrega as duas tabelas
-df_escolas = carregar_df(planilha, aba_censo_25)
-df_matriculas = carregar_df(planilha_censo, aba_censo_25_matriculas)
+# Escolas + matrículas unidas e tipadas (preparo.preparar_censo) uma vez por versão
+# das duas abas; as leituras das duas planilhas correm em paralelo
+censo = carregar_censo(planilha, aba_censo_25, planilha_censo, aba_censo_25_matriculas)
 
-# --- MERGE (UNIÃO) ---
-data = pd.merge(df_escolas, df_matriculas, on="CO_ENTIDADE", how="left")
+# --- MODO DE VISUALIZAÇÃO ---
+modo = st.radio("Visualização:", ["Escola", "Mapa do estado"], horizontal=True)
 
-# --- TRATAMENTO DOS DADOS ---
-data['ESCOLA_MUNICIPIO'] = data['NO_ENTIDADE'] + ' - ' + data['NO_MUNICIPIO']
-
-# 1. TRATAMENTO ESPECÍFICO PARA COORDENADAS (Importante para o mapa)
-for col in ["LATITUDE_C", "LONGITUDE_C"]:
-    if col in data.columns:
-        # Remove espaços, converte para string e troca vírgula por ponto
-        data[col] = data[col].astype(str).str.strip().str.replace(',', '.')
-        # Converte para numérico (float)
-        data[col] = pd.to_numeric(data[col], errors='coerce')
-
-# 2. CONVERSÃO DE INTEIROS (Para evitar o .0)
-cols_to_fix = [
-    "NU_TELEFONE", "MATRICULAS TOTAIS", "MATRICULAS FUND", "MATRICULAS MED",
-    "MATRICULAS PROF", "MATRICULAS EJA", "SALAS", "SALAS_CLIMATIZADAS",
-    "SALAS_ACESSIVEIS", "DOCENTES_TOTAIS"
-]
-
-for col in cols_to_fix:
-    if col in data.columns:
-        data[col] = pd.to_numeric(data[col], errors='coerce').astype('Int64')
+if modo == "Mapa do estado":
+    # Todas as escolas, agrupadas no servidor conforme o zoom (ver mapa_censo.py)
+    mostrar_mapa_estado(censo)
+    st.stop()
 
 # --- INTERFACE DE SELEÇÃO ---
-opcoes_formatadas = sorted(data['ESCOLA_MUNICIPIO'].unique().tolist())
+opcoes_formatadas = censo.opcoes
 
 escola_selecionada_formatada = st.selectbox(
     "Escolha uma escola para visualizar as informações:",
@@ -55,10 +39,10 @@ escola_selecionada_formatada = st.selectbox(
 
 # --- EXIBIÇÃO ---
 if escola_selecionada_formatada:
-    escola_filtrada = data[data['ESCOLA_MUNICIPIO'] == escola_selecionada_formatada]
+    # Consulta direta ao dicionário da BaseCenso (sem varrer a tabela)
+    escola = censo.escola(escola_selecionada_formatada)
     
-    if not escola_filtrada.empty:
-        escola = escola_filtrada.iloc[0]
+    if escola is not None:
 
         # Informações principais
         st.markdown(f"""
@@ -0,0 +1,66 @@
+# Arquivo: censo_base.py
+# Tabela do Censo (escolas + matrículas) unida e tipada uma vez por versão das
+# duas abas de origem, com dicionários para achar a escola escolhida sem varrer
+# a tabela a cada rerun.
+import numpy as np
+import streamlit as st
+from preparo import ESQUEMAS_TIPOS, preparar_censo
+from sincronizacao import versao_df
+from somente_leitura import somente_leitura
+from tipos import otimizar_tipos
+from utils import carregar_em_paralelo
+
+
+def _primeira_posicao(serie):
+    """{valor: posição da primeira linha com esse valor}, ignorando vazios."""
+    validos = serie.notna().to_numpy()
+    vistos = {}
+    for pos, valor in zip(np.flatnonzero(validos), serie.to_numpy()[validos]):
+        vistos.setdefault(valor, int(pos))
+    return vistos
+
+
+def _chave_inep(valor):
+    # O código pode vir como número (123.0) ou texto ("123"): compara pelo texto inteiro
+    texto = str(valor).strip()
+    return texto[:-2] if texto.endswith(".0") else texto
+
+
+class BaseCenso:
+    """Tabela do Censo pronta para consulta, com busca direta por escola."""
+
+    def __init__(self, data):
+        self.data = data
+        self._por_escola = _primeira_posicao(data["ESCOLA_MUNICIPIO"])
+        self._por_inep = {_chave_inep(v): pos for v, pos in _primeira_posicao(data["CO_ENTIDADE"]).items()}
+        self.opcoes = sorted(self._por_escola)
+
+    def escola(self, escola_municipio):
+        """Registro (Series) da escola pelo texto "ESCOLA - MUNICÍPIO", ou None."""
+        pos = self._por_escola.get(escola_municipio)
+        return None if pos is None else self.data.iloc[pos]
+
+    def escola_por_inep(self, co_entidade):
+        """Registro (Series) da escola pelo código INEP (CO_ENTIDADE), ou None."""
+        pos = self._por_inep.get(_chave_inep(co_entidade))
+        return None if pos is None else self.data.iloc[pos]
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _base_censo(_escolas, _matriculas, versao):
+    data = otimizar_tipos(preparar_censo(_escolas, _matriculas), ESQUEMAS_TIPOS["censo"], nome="censo")
+    # Versão da tabela unida: chave dos caches derivados (ex.: camadas do mapa)
+    data.attrs["versao"] = versao
+    return BaseCenso(somente_leitura(data))
+
+
+def carregar_censo(planilha, aba_escolas, planilha_matriculas, aba_matriculas):
+    """
+    Carrega as duas abas do Censo (em paralelo, são planilhas diferentes) e devolve
+    a BaseCenso da versão atual. União e tipagem só rodam quando alguma das abas muda.
+    """
+    escolas, matriculas = carregar_em_paralelo([
+        (planilha, aba_escolas),
+        (planilha_matriculas, aba_matriculas),
+    ])
+    return _base_censo(escolas, matriculas, f"{versao_df(escolas)}+{versao_df(matriculas)}")
@@ -0,0 +1,74 @@
+# Arquivo: cubo.py
+# Cubo de agregação: para as dimensões dos filtros e gráficos (DIREC, ANO,
+# PROGRAMA, STATUS, FONTE...) guarda, uma vez por versão da aba, a contagem de
+# linhas e a soma das medidas (VALOR) de cada combinação de valores. KPIs e
+# gráficos por DIREC/FONTE somam essas células, que são muito menos numerosas que
+# as linhas. Filtros que o cubo não cobre (busca por escola, NE...) usam as linhas.
+import numpy as np
+import pandas as pd
+import streamlit as st
+from filtros import condicao_vazia
+from sincronizacao import versao_df
+
+# Coluna com a quantidade de linhas de cada célula
+LINHAS = "_linhas"
+
+
+class Cubo:
+    """Contagem e somas por combinação de valores das dimensões."""
+
+    def __init__(self, data, dimensoes, medidas):
+        self.dimensoes = [c for c in dimensoes if c in data.columns]
+        self.medidas = [c for c in medidas if c in data.columns]
+        grupos = data.groupby(self.dimensoes, dropna=False, sort=False, observed=True)
+        celulas = grupos.size().to_frame(LINHAS)
+        for medida in self.medidas:
+            celulas[medida] = grupos[medida].sum()
+        self.celulas = celulas.reset_index()
+
+    def atende(self, condicoes):
+        """O cubo responde sozinho se toda condição ativa é sobre uma de suas dimensões."""
+        return all(condicao_vazia(v) or c in self.dimensoes for c, v in condicoes.items())
+
+    def fatia(self, condicoes):
+        """Células que passam nas condições {dimensão: valor ou lista de valores}."""
+        passa = np.ones(len(self.celulas), dtype=bool)
+        for coluna, valores in condicoes.items():
+            if condicao_vazia(valores):
+                continue
+            if not isinstance(valores, (list, tuple, set)):
+                valores = [valores]
+            passa &= self.celulas[coluna].isin(list(valores)).to_numpy()
+        return self.celulas[passa]
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _cubo(_data, dimensoes, medidas, versao):
+    return Cubo(_data, dimensoes, medidas)
+
+
+def obter_cubo(data, dimensoes, medidas):
+    """Cubo do DataFrame, construído uma vez por versão da aba."""
+    return _cubo(data, tuple(dimensoes), tuple(medidas), versao_df(data))
+
+
+def celulas_das_linhas(selecao, cubo):
+    """
+    Caminho das linhas: as dimensões e medidas da seleção, cada linha como uma
+    célula de contagem 1. Tem as mesmas colunas que Cubo.fatia, então o mesmo
+    código de KPIs e gráficos serve para os dois caminhos.
+    """
+    celulas = pd.DataFrame({c: selecao[c].to_numpy() for c in cubo.dimensoes + cubo.medidas})
+    celulas[LINHAS] = 1
+    return celulas
+
+
+def consultar(cubo, condicoes, selecao, fora_do_cubo=False):
+    """
+    Células para os KPIs e gráficos da seleção filtrada por 'condicoes'. Vêm do
+    cubo quando ele cobre todas as condições; com filtros que ele não conhece
+    ('fora_do_cubo', ex.: busca por texto) vêm das linhas da 'selecao'.
+    """
+    if fora_do_cubo or not cubo.atende(condicoes):
+        return celulas_das_linhas(selecao, cubo)
+    return cubo.fatia(condicoes)
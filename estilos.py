@@ -0,0 +1,56 @@
+# Arquivo: estilos.py
+# Apresentação das tabelas. Destaque de linhas por regras: cada regra vira uma
+# máscara vetorizada sobre a coluna inteira, e o Styler recebe a grade de estilos
+# pronta (apply com axis=None), sem chamar uma função Python para cada linha.
+# Valores em reais: as colunas continuam numéricas e o "R$ 1.234,56" é só o
+# formato de exibição.
+import numpy as np
+import pandas as pd
+from pandas.io.formats.style import Styler
+
+# Cores usadas nas tabelas do sistema
+VERDE = "background-color: #ace796; color: black"
+VERMELHO = "background-color: #edb0bc; color: black"
+VERDE_CLARO = "background-color: lightgreen; color: black"
+
+# Colunas financeiras exibidas em reais
+COLUNAS_REAIS = ["VALOR", "VALOR FATURADO", "SALDO CONTRATUAL"]
+
+
+def estilos_linhas(data, regras, ignorar_caixa=False):
+    """
+    Grade de CSS (mesmo formato de 'data') para as regras [(coluna, valor, css), ...]:
+    as linhas em que data[coluna] == valor recebem 'css' em todas as células.
+    Vale a primeira regra que casar, como num if/elif. Com 'ignorar_caixa', a
+    comparação ignora maiúsculas e espaços nas pontas. Colunas ausentes são ignoradas.
+    """
+    css = np.full(len(data), "", dtype=object)
+    livres = np.ones(len(data), dtype=bool)
+    for coluna, valor, estilo in regras:
+        if coluna not in data.columns:
+            continue
+        serie = data[coluna]
+        if ignorar_caixa:
+            serie = serie.astype(str).str.strip().str.casefold()
+            valor = str(valor).strip().casefold()
+        casa = (serie == valor).to_numpy(dtype=bool, na_value=False) & livres
+        css[casa] = estilo
+        livres &= ~casa
+    grade = np.repeat(css[:, np.newaxis], len(data.columns), axis=1)
+    return pd.DataFrame(grade, index=data.index, columns=data.columns)
+
+
+def destacar_linhas(data, regras, ignorar_caixa=False):
+    """Styler de 'data' com as linhas destacadas pelas regras (ver estilos_linhas)."""
+    return data.style.apply(estilos_linhas, axis=None, regras=regras, ignorar_caixa=ignorar_caixa)
+
+
+def formatar_reais(dados, colunas=COLUNAS_REAIS):
+    """
+    Styler (a partir de um DataFrame ou de outro Styler) com 'colunas' exibidas como
+    "R$ 1.234,56" e vazios como "-". Os valores continuam float64: a ordenação pela
+    grade do st.dataframe segue numérica. Colunas ausentes são ignoradas.
+    """
+    styler = dados if isinstance(dados, Styler) else dados.style
+    presentes = [c for c in colunas if c in styler.data.columns]
+    return styler.format("R$ {:,.2f}", subset=presentes, decimal=",", thousands=".", na_rep="-")
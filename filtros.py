@@ -0,0 +1,230 @@
+# Arquivo: filtros.py
+# Motor de filtros por bitmaps: para cada coluna categórica (DIREC, MUNICÍPIO,
+# PROGRAMA, ANO...) guarda, uma vez por versão da aba, as linhas de cada valor.
+# Qualquer combinação de filtros vira uma interseção de bitmaps; as páginas recebem
+# uma Selecao (só as posições das linhas) e copiam apenas as colunas que exibem.
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sincronizacao import versao_df
+
+# Valores que aparecem em menos de 1/32 das linhas guardam a lista de posições
+# (4 bytes por linha) em vez do bitmap completo (1 bit por linha da aba)
+_FRACAO_ESPARSO = 32
+
+
+def condicao_vazia(valores):
+    # Filtro sem seleção (None ou lista vazia) não restringe nada
+    return valores is None or (isinstance(valores, (list, tuple, set)) and not valores)
+
+
+def _chave(valor):
+    # NaN/None viram a mesma chave (NaN != NaN quebraria a busca no dicionário)
+    return None if pd.isna(valor) else valor
+
+
+class IndiceFiltros:
+    """Bitmaps por valor das colunas categóricas de um DataFrame."""
+
+    def __init__(self, data, colunas):
+        self.n = len(data)
+        self._bytes = (self.n + 7) // 8
+        self._valores = {}
+        for col in colunas:
+            if col not in data.columns:
+                continue
+            codigos, unicos = pd.factorize(data[col], use_na_sentinel=False)
+            ordem = np.argsort(codigos, kind="stable")
+            limites = np.searchsorted(codigos[ordem], np.arange(len(unicos) + 1))
+            valores = {}
+            for k, valor in enumerate(unicos):
+                posicoes = ordem[limites[k]:limites[k + 1]].astype(np.int32)
+                if len(posicoes) * _FRACAO_ESPARSO < self.n:
+                    valores[_chave(valor)] = posicoes
+                else:
+                    valores[_chave(valor)] = self._bitmap_de_posicoes(posicoes)
+            self._valores[col] = valores
+
+    # --- CONVERSÕES ---
+    def _bitmap_de_posicoes(self, posicoes):
+        mascara = np.zeros(self.n, dtype=bool)
+        mascara[posicoes] = True
+        return np.packbits(mascara)
+
+    def _bitmap(self, guardado):
+        # Bitmaps têm dtype uint8; listas de posições, int32
+        return guardado if guardado.dtype == np.uint8 else self._bitmap_de_posicoes(guardado)
+
+    def bitmap_da_mascara(self, mascara):
+        """Converte uma máscara booleana (ex.: busca por texto) para o formato de bitmap."""
+        return np.packbits(np.asarray(mascara, dtype=bool))
+
+    def todos(self):
+        return self.bitmap_da_mascara(np.ones(self.n, dtype=bool))
+
+    # --- CONSULTAS ---
+    def colunas(self):
+        return list(self._valores)
+
+    def bitmap(self, coluna, valores):
+        """Linhas em que 'coluna' tem algum dos 'valores' (união dos bitmaps)."""
+        if not isinstance(valores, (list, tuple, set)):
+            valores = [valores]
+        resultado = np.zeros(self._bytes, dtype=np.uint8)
+        por_valor = self._valores[coluna]
+        for valor in valores:
+            guardado = por_valor.get(_chave(valor))
+            if guardado is not None:
+                resultado |= self._bitmap(guardado)
+        return resultado
+
+    def filtrar(self, condicoes, mascaras=()):
+        """
+        Interseção dos filtros. 'condicoes' é {coluna: valor ou lista de valores};
+        condições vazias (None ou []) são ignoradas. 'mascaras' são bitmaps
+        extras para filtros fora do índice (busca por texto, por exemplo).
+        Retorna o bitmap final.
+        """
+        resultado = None
+        for coluna, valores in condicoes.items():
+            if condicao_vazia(valores):
+                continue
+            parcial = self.bitmap(coluna, valores)
+            resultado = parcial if resultado is None else resultado & parcial
+        for mascara in mascaras:
+            resultado = mascara if resultado is None else resultado & mascara
+        return self.todos() if resultado is None else resultado
+
+    def posicoes(self, bitmap):
+        """Posições (iloc) das linhas marcadas no bitmap."""
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.n))
+
+    def contar(self, bitmap):
+        return int(np.unpackbits(bitmap, count=self.n).sum())
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _indice(_data, colunas, versao):
+    return IndiceFiltros(_data, colunas)
+
+
+def obter_indice(data, colunas):
+    """Índice de filtros do DataFrame, construído uma vez por versão da aba."""
+    return _indice(data, tuple(colunas), versao_df(data))
+
+
+# --- OPÇÕES DOS FILTROS ---
+@st.cache_resource(max_entries=128, show_spinner=False)
+def _opcoes(_data, coluna, versao, dropna, tipo, reverse):
+    serie = _data[coluna]
+    if dropna:
+        serie = serie.dropna()
+    if tipo is not None:
+        serie = serie.astype(tipo)
+    valores = serie.unique().tolist()
+    # Vazios (NaN, pd.NA dos inteiros anuláveis) não se comparam com os demais
+    # valores: ficam fora da ordenação e, se mantidos, entram uma vez no fim
+    vazios = [v for v in valores if pd.isna(v)]
+    opcoes = sorted((v for v in valores if not pd.isna(v)), reverse=reverse)
+    return tuple(opcoes + vazios[:1])
+
+
+def opcoes_filtro(data, coluna, dropna=False, tipo=None, reverse=False):
+    """
+    Valores distintos e ordenados de 'coluna' para os widgets de filtro, calculados
+    uma vez por versão da aba. 'tipo' ("str", "int"...) converte antes de ordenar.
+    """
+    return list(_opcoes(data, coluna, versao_df(data), dropna, tipo, reverse))
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _mapa_cascata(_data, pai, filho, versao):
+    return {
+        _chave(valor): tuple(grupo.unique().tolist())
+        for valor, grupo in _data.groupby(pai, sort=False, dropna=False)[filho]
+    }
+
+
+def opcoes_cascata(data, pai, filho, selecionados):
+    """
+    Opções de 'filho' restritas aos valores 'selecionados' de 'pai' (ex.: municípios
+    das DIRECs escolhidas). O mapa pai → filhos é montado uma vez por versão da aba,
+    então cada rerun é só uma consulta ao dicionário. Sem seleção, devolve todas.
+    """
+    if not selecionados:
+        return opcoes_filtro(data, filho)
+    mapa = _mapa_cascata(data, pai, filho, versao_df(data))
+    disponiveis = set()
+    for valor in selecionados:
+        disponiveis.update(mapa.get(_chave(valor), ()))
+    return sorted(disponiveis)
+
+
+class Selecao:
+    """
+    Linhas escolhidas pelos filtros sobre o DataFrame compartilhado. Guarda só as
+    posições: cada coluna pedida é copiada sob demanda (apenas as linhas da seleção)
+    e o DataFrame original nunca é copiado nem alterado.
+    """
+
+    def __init__(self, data, posicoes=None):
+        self.data = data
+        # None = todas as linhas, na ordem original
+        self.posicoes = posicoes
+
+    def __len__(self):
+        return len(self.data) if self.posicoes is None else len(self.posicoes)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def columns(self):
+        return self.data.columns
+
+    def __getitem__(self, coluna):
+        """Uma coluna da seleção (Series), como df[coluna]."""
+        serie = self.data[coluna]
+        return serie if self.posicoes is None else serie.iloc[self.posicoes]
+
+    def restringir(self, mascara):
+        """Nova seleção só com as linhas em que 'mascara' (alinhada à seleção) é verdadeira."""
+        return Selecao(self.data, self._todas_posicoes()[np.asarray(mascara, dtype=bool)])
+
+    def na_ordem(self, posicoes):
+        """Nova seleção só com as linhas que também estão em 'posicoes', na ordem de 'posicoes'."""
+        if self.posicoes is None:
+            return Selecao(self.data, posicoes)
+        return Selecao(self.data, posicoes[np.isin(posicoes, self.posicoes)])
+
+    def ordenar(self, coluna, ascending=True):
+        """Nova seleção ordenada por 'coluna' (só a coluna é copiada para a ordenação)."""
+        ordem = self[coluna].reset_index(drop=True).sort_values(ascending=ascending).index.to_numpy()
+        return Selecao(self.data, self._todas_posicoes()[ordem])
+
+    def linhas(self, colunas=None, inicio=0, fim=None):
+        """
+        Materializa a seleção como DataFrame: só as 'colunas' pedidas e só as linhas
+        [inicio:fim]. É a única cópia feita no caminho até a tela.
+        """
+        indices = slice(None) if colunas is None else [self.data.columns.get_loc(c) for c in colunas]
+        if self.posicoes is None:
+            return self.data.iloc[inicio:fim, indices].copy()
+        return self.data.iloc[self.posicoes[inicio:fim], indices]
+
+    def _todas_posicoes(self):
+        return np.arange(len(self.data)) if self.posicoes is None else self.posicoes
+
+
+def selecionar(data, colunas, condicoes, mascaras=()):
+    """
+    Atalho para as páginas: aplica as condições usando o índice da versão atual e
+    devolve a Selecao (sem copiar linhas). As máscaras extras são booleanas,
+    alinhadas às linhas de 'data'.
+    """
+    if not mascaras and all(condicao_vazia(v) for v in condicoes.values()):
+        return Selecao(data)
+    indice = obter_indice(data, colunas)
+    bitmap = indice.filtrar(condicoes, [indice.bitmap_da_mascara(m) for m in mascaras])
+    return Selecao(data, indice.posicoes(bitmap))
@@ -1,5 +1,9 @@
 import streamlit as st
 import pandas as pd
+from pre_carregamento import status_pre_carregamento
+from cache_visoes import estatisticas_cache_visoes
+from tipos import relatorios_memoria
+from medicao import tempos_medidos
 # Removidas as importações do dashboard que não serão usadas
 # from utils import connect_gsheets, get_worksheet 
 # import re
@@ -36,4 +40,62 @@ st.caption("Utilize o menu de navegação na parte superior para acessar a ferra
 st.info("""
 Este sistema é atualizado com base no dia a dia da equipe.  
 Dúvidas, erros ou sugestões? Fale com a gente!
-""")
\ No newline at end of file
+""")
+
+# --- STATUS DO CARREGAMENTO DAS BASES ---
+with st.expander("🔄 Status do carregamento das bases"):
+    icones = {"pronto": "✅", "carregando": "⏳", "na fila": "🕒", "erro": "❌", "não configurada": "➖"}
+    status = status_pre_carregamento()
+    if status:
+        df_status = pd.DataFrame([
+            {
+                "Base": rotulo,
+                "Situação": f"{icones.get(info.get('situacao'), '')} {info.get('situacao', '')}",
+                "Tempo (s)": round(info["segundos"], 2) if info.get("segundos") is not None else None,
+                "Erro": info.get("erro") or "",
+            }
+            for rotulo, info in status.items()
+        ])
+        st.dataframe(df_status, hide_index=True, use_container_width=True)
+        if st.button("Atualizar status"):
+            st.rerun()
+    else:
+        st.caption("Nenhuma base foi carregada ainda.")
+
+    # Visões filtradas reaproveitadas entre as sessões (cache_visoes.py)
+    cache = estatisticas_cache_visoes()
+    taxa = f"{cache['taxa_acerto']:.0%}" if cache["taxa_acerto"] is not None else "-"
+    st.caption(
+        f"Cache de visões: {cache['acertos']} acertos, {cache['falhas']} falhas (taxa {taxa}), "
+        f"{cache['itens']} visões em {cache['mb_usados']:.1f} de {cache['mb_limite']:.0f} MB, "
+        f"{cache['descartes']} descartes"
+    )
+
+    # Memória de cada base antes e depois dos tipos compactos (tipos.py)
+    memoria = relatorios_memoria()
+    if memoria:
+        df_memoria = pd.DataFrame([
+            {
+                "Base": nome,
+                "Antes (MB)": round(info["mb_antes"], 2),
+                "Depois (MB)": round(info["mb_depois"], 2),
+                "Redução": f"{1 - info['mb_depois'] / info['mb_antes']:.0%}" if info["mb_antes"] else "-",
+                "Colunas convertidas": len(info["colunas"]),
+            }
+            for nome, info in memoria.items()
+        ])
+        st.dataframe(df_memoria, hide_index=True, use_container_width=True)
+
+    # Tempo dos trechos que rodam sozinhos a cada interação (fragmentos, ver medicao.py)
+    tempos = tempos_medidos()
+    if tempos:
+        df_tempos = pd.DataFrame([
+            {
+                "Trecho": nome,
+                "Execuções": info["execucoes"],
+                "Última (ms)": round(info["ultimo_ms"], 1),
+                "Mediana (ms)": round(info["mediana_ms"], 1),
+            }
+            for nome, info in sorted(tempos.items())
+        ])
+        st.dataframe(df_tempos, hide_index=True, use_container_width=True)
\ No newline at end of file
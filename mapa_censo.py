@@ -0,0 +1,167 @@
+# Arquivo: mapa_censo.py
+# Mapa de todas as escolas do Censo. Um marcador por escola travaria o navegador,
+# então o agrupamento é feito aqui no servidor: as escolas da área visível são
+# reunidas numa grade que acompanha o zoom, e só esses grupos vão para o mapa.
+# Cada camada pronta (versão, zoom, área) fica em cache para as próximas visitas.
+import folium
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit_folium import st_folium
+from sincronizacao import versao_df
+
+# Vista inicial: o estado inteiro (limites aproximados do RN)
+LIMITES_ESTADO = ((-7.0, -38.6), (-4.8, -34.9))
+CENTRO_ESTADO = (-5.8, -36.6)
+ZOOM_INICIAL = 8
+
+# Tamanho (em pixels da tela) de cada célula da grade de agrupamento
+CELULA_PX = 60
+# A partir deste zoom as escolas aparecem uma a uma, se couberem no limite abaixo
+ZOOM_SEM_AGRUPAR = 14
+MAX_MARCADORES = 400
+
+_CHAVE_VISTA = "mapa_censo_vista"
+
+
+def _graus_por_celula(zoom):
+    # Na projeção do mapa, 256 px cobrem 360° de longitude no zoom 0
+    return CELULA_PX * 360 / (256 * 2 ** zoom)
+
+
+def _area_da_camada(limites, zoom):
+    """
+    Arredonda a área visível para fora, em blocos de 8 células: pequenos arrastes
+    caem na mesma área (e no mesmo cache) e a camada já traz uma margem em volta.
+    """
+    bloco = _graus_por_celula(zoom) * 8
+    (sul, oeste), (norte, leste) = limites
+    return (
+        (float(np.floor(sul / bloco) * bloco), float(np.floor(oeste / bloco) * bloco)),
+        (float(np.ceil(norte / bloco) * bloco), float(np.ceil(leste / bloco) * bloco)),
+    )
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _pontos(_censo, versao):
+    # Só as escolas com coordenadas válidas
+    data = _censo.data
+    pontos = pd.DataFrame({
+        "lat": data["LATITUDE_C"],
+        "lon": data["LONGITUDE_C"],
+        "nome": data["ESCOLA_MUNICIPIO"],
+        "inep": data["CO_ENTIDADE"],
+    })
+    return pontos[pontos["lat"].notna() & pontos["lon"].notna()].reset_index(drop=True)
+
+
+def agrupar(pontos, zoom, area):
+    """
+    Grupos de escolas dentro da área: lat/lon médias, quantidade e, para grupos de
+    uma escola só, nome e INEP. A grade é fixa no mapa (não na tela), então os
+    grupos não mudam ao arrastar.
+    """
+    (sul, oeste), (norte, leste) = area
+    dentro = pontos[pontos["lat"].between(sul, norte) & pontos["lon"].between(oeste, leste)]
+
+    if zoom >= ZOOM_SEM_AGRUPAR and len(dentro) <= MAX_MARCADORES:
+        return dentro.assign(qtd=1)
+
+    celula = _graus_por_celula(zoom)
+    grade_x = np.floor(dentro["lon"].to_numpy() / celula).astype(np.int64)
+    grade_y = np.floor(dentro["lat"].to_numpy() / celula).astype(np.int64)
+    return (
+        dentro.groupby([grade_x, grade_y], sort=False)
+        .agg(lat=("lat", "mean"), lon=("lon", "mean"), qtd=("lat", "size"), nome=("nome", "first"), inep=("inep", "first"))
+        .reset_index(drop=True)
+    )
+
+
+def _icone_grupo(qtd):
+    lado = int(26 + 6 * np.log10(qtd))
+    return folium.DivIcon(
+        icon_size=(lado, lado),
+        icon_anchor=(lado // 2, lado // 2),
+        html=(
+            f'<div style="width:{lado}px;height:{lado}px;line-height:{lado}px;border-radius:50%;'
+            f'background:rgba(76,120,168,0.85);color:white;text-align:center;font-size:12px;'
+            f'font-weight:bold;border:2px solid white;">{qtd}</div>'
+        ),
+    )
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _grupos(_pontos, versao, zoom, area):
+    """Grupos da área como tupla de tuplas (imutável), calculados uma vez por versão/zoom/área."""
+    return tuple(agrupar(_pontos, zoom, area)[["lat", "lon", "qtd", "nome", "inep"]].itertuples(index=False))
+
+
+def _camada(grupos):
+    """
+    Camada (FeatureGroup) com os grupos e escolas da área. O objeto folium é mutável
+    (o st_folium o altera ao renderizar), então é montado a cada execução, só com os
+    dados já agrupados do cache; nada dele é compartilhado entre sessões.
+    """
+    camada = folium.FeatureGroup(name="Escolas")
+    for grupo in grupos:
+        if grupo.qtd == 1:
+            folium.CircleMarker(
+                location=[grupo.lat, grupo.lon], radius=6,
+                color="white", weight=1, fill=True, fill_color="#e4574c", fill_opacity=0.9,
+                tooltip=grupo.nome, popup=str(grupo.inep),
+            ).add_to(camada)
+        else:
+            folium.Marker(
+                location=[grupo.lat, grupo.lon], icon=_icone_grupo(grupo.qtd),
+                tooltip=f"{grupo.qtd} escolas (aproxime para ver)",
+            ).add_to(camada)
+    return camada
+
+
+def _limites_da_vista(bounds):
+    # Formato devolvido pelo st_folium: {"_southWest": {"lat", "lng"}, "_northEast": {...}}
+    try:
+        return (
+            (bounds["_southWest"]["lat"], bounds["_southWest"]["lng"]),
+            (bounds["_northEast"]["lat"], bounds["_northEast"]["lng"]),
+        )
+    except (KeyError, TypeError):
+        return None
+
+
+def mostrar_mapa_estado(censo):
+    """
+    Mapa estadual das escolas do Censo. A cada movimento o st_folium devolve zoom e
+    área visível; só a camada dessa área é enviada (o mapa base não é recriado).
+    Clicar numa escola mostra o resumo dela, buscado pelo INEP.
+    """
+    versao = versao_df(censo.data)
+    pontos = _pontos(censo, versao)
+    zoom, area = st.session_state.get(_CHAVE_VISTA, (ZOOM_INICIAL, _area_da_camada(LIMITES_ESTADO, ZOOM_INICIAL)))
+
+    st.caption(f"{len(pontos)} escolas com coordenadas cadastradas. Aproxime o mapa para ver cada escola.")
+    mapa = folium.Map(location=CENTRO_ESTADO, zoom_start=ZOOM_INICIAL, tiles="OpenStreetMap")
+    saida = st_folium(
+        mapa,
+        key="mapa_censo",
+        feature_group_to_add=_camada(_grupos(pontos, versao, zoom, area)),
+        returned_objects=["bounds", "zoom", "last_object_clicked_popup"],
+        use_container_width=True,
+        height=550,
+    ) or {}
+
+    # Zoom ou área mudaram: guarda a nova vista e recarrega só a camada
+    limites = _limites_da_vista(saida.get("bounds"))
+    if limites is not None and saida.get("zoom") is not None:
+        nova_vista = (int(saida["zoom"]), _area_da_camada(limites, int(saida["zoom"])))
+        if nova_vista != (zoom, area):
+            st.session_state[_CHAVE_VISTA] = nova_vista
+            st.rerun()
+
+    inep = saida.get("last_object_clicked_popup")
+    escola = censo.escola_por_inep(inep) if inep else None
+    if escola is not None:
+        st.markdown(
+            f"**🏫 {escola['NO_ENTIDADE']}** — {escola['NO_MUNICIPIO']} · INEP {escola['CO_ENTIDADE']} · "
+            f"Matrículas: {escola['MATRICULAS TOTAIS'] if pd.notna(escola.get('MATRICULAS TOTAIS')) else 'N/A'}"
+        )
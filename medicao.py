@@ -0,0 +1,69 @@
+# Arquivo: medicao.py
+# Fragmentos cronometrados: cada interação com um widget dentro de um fragmento
+# roda só aquele trecho da página (st.fragment), e o tempo de cada execução fica
+# guardado para conferência na página inicial e no benchmark de reruns.
+import functools
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+# Execuções mais recentes guardadas por trecho
+AMOSTRAS = 50
+
+
+class _Tempos:
+    """Durações recentes de cada trecho (compartilhado entre as sessões)."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.por_trecho = {}
+
+    def registrar(self, nome, segundos):
+        with self._trava:
+            self.por_trecho.setdefault(nome, deque(maxlen=AMOSTRAS)).append(segundos)
+
+    def resumo(self):
+        with self._trava:
+            return {
+                nome: {
+                    "execucoes": len(tempos),
+                    "ultimo_ms": tempos[-1] * 1000,
+                    "mediana_ms": statistics.median(tempos) * 1000,
+                }
+                for nome, tempos in self.por_trecho.items()
+            }
+
+
+@st.cache_resource
+def _tempos():
+    return _Tempos()
+
+
+@contextmanager
+def cronometro(nome):
+    """Mede o bloco e guarda a duração em 'nome'."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _tempos().registrar(nome, time.perf_counter() - inicio)
+
+
+def fragmento(nome):
+    """Decorador: st.fragment que mede cada execução (ver tempos_medidos)."""
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            with cronometro(nome):
+                return funcao(*args, **kwargs)
+        return st.fragment(medida)
+    return decorar
+
+
+def tempos_medidos():
+    """{trecho: {"execucoes", "ultimo_ms", "mediana_ms"}} das execuções recentes."""
+    return _tempos().resumo()
@@ -0,0 +1,94 @@
+# Arquivo: moeda.py
+# Conversão vetorizada de valores no formato brasileiro ("R$ 1.234,56") para float64.
+# Substitui o limpar_moeda aplicado célula a célula com Series.apply: a coluna inteira
+# é tratada de uma vez com os kernels de texto do Arrow (pyarrow.compute).
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Número já "limpo" (ponto decimal, sem milhar), com sinal e expoente opcionais, ou
+# nan/inf, que o float() do limpar_moeda original também aceitava
+_NUMERO_VALIDO = r"(?i)^[+-]?((\d+\.?\d*|\.\d+)(e[+-]?\d+)?|nan|inf|infinity)$"
+
+# isinstance(v, str) aplicado pelo numpy a um array de objetos inteiro (sem laço em Python)
+_EH_TEXTO = np.frompyfunc(str.__instancecheck__, 1, 1)
+
+
+def _mascara_textos(serie):
+    """Máscara booleana das células que são texto (str)."""
+    if pd.api.types.is_string_dtype(serie) and serie.dtype != object:
+        return serie.notna().to_numpy()
+    if pd.api.types.infer_dtype(serie, skipna=True) == "string":
+        # Caso mais comum: coluna só de textos e vazios
+        return serie.notna().to_numpy()
+    return _EH_TEXTO(serie.to_numpy(dtype=object)).astype(bool)
+
+
+def _textos_arrow(serie, eh_texto):
+    # Colunas de texto do pandas já são Arrow: o recorte dos textos não passa por objetos Python
+    if serie.dtype != object:
+        return pa.array(serie.array[eh_texto])
+    return pa.array(serie.to_numpy(dtype=object)[eh_texto], type=pa.string())
+
+
+def _converter_textos(textos):
+    """Converte um array Arrow de textos em reais. Retorna (float64 ndarray, válido, em_branco)."""
+    limpo = textos
+    for antigo, novo in (("R$", ""), (" ", ""), (".", ""), (",", ".")):
+        limpo = pc.replace_substring(limpo, antigo, novo)
+    # Como o float() original: espaços em branco (\n, \t, \xa0...) só nas pontas
+    limpo = pc.utf8_trim_whitespace(limpo)
+
+    valido = pc.fill_null(pc.match_substring_regex(limpo, _NUMERO_VALIDO), False)
+    numeros = pc.cast(pc.if_else(valido, limpo, pa.scalar(None, limpo.type)), pa.float64())
+
+    em_branco = pc.fill_null(pc.equal(limpo, ""), False)
+    return (
+        numeros.to_numpy(zero_copy_only=False),
+        valido.to_numpy(zero_copy_only=False),
+        em_branco.to_numpy(zero_copy_only=False),
+    )
+
+
+def converter_moeda(valores, invalido=np.nan):
+    """
+    Converte uma coluna inteira de valores em reais para float64 numa única passada.
+
+    - Textos: remove "R$", espaços e pontos de milhar e troca a vírgula decimal por ponto;
+      outros espaços em branco só são aceitos nas pontas e "nan" continua NaN.
+    - Números (int/float) são mantidos como estão; vazios (NaN/None) continuam NaN.
+    - Textos que não formam um número (e outros tipos) recebem o valor de 'invalido'.
+
+    Retorna uma tupla (serie_float64, qtd_invalidos). Textos em branco recebem
+    'invalido', mas não entram na contagem.
+    """
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(valores)
+
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return serie.astype("float64"), 0
+
+    resultado = np.full(len(serie), np.nan)
+    falhas = np.zeros(len(serie), dtype=bool)
+    qtd_invalidos = 0
+
+    eh_texto = _mascara_textos(serie)
+
+    # 1. Textos no formato brasileiro
+    if eh_texto.any():
+        numeros, valido, em_branco = _converter_textos(_textos_arrow(serie, eh_texto))
+        resultado[eh_texto] = numeros
+        falhas[eh_texto] = ~valido
+        qtd_invalidos += int((~valido & ~em_branco).sum())
+
+    # 2. Demais valores: números passam direto, outros tipos não nulos são falhas
+    if not eh_texto.all():
+        outros = serie[~eh_texto]
+        numeros = pd.to_numeric(outros, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        falha_outros = np.isnan(numeros) & outros.notna().to_numpy()
+        resultado[~eh_texto] = numeros
+        falhas[~eh_texto] = falha_outros
+        qtd_invalidos += int(falha_outros.sum())
+
+    resultado[falhas] = invalido
+    return pd.Series(resultado, index=serie.index, name=serie.name), qtd_invalidos
@@ -0,0 +1,84 @@
+# Arquivo: pre_carregamento.py
+# Aquece o cache de todas as abas logo após o login, em paralelo, para que a
+# primeira visita a cada página já encontre os dados prontos.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from utils import carregar_compartilhado, carregar_preparado
+
+# Máximo de leituras simultâneas no Google Sheets (respeita a cota da API)
+MAX_LEITURAS_SIMULTANEAS = 4
+
+# (rótulo, chave da planilha no secrets, chave da aba no secrets, preparo ou None)
+ABAS_CONFIGURADAS = [
+    ("Obras", "planilha", "aba_bd", "obras"),
+    ("Medições", "planilha", "aba_medicoes", "medicoes"),
+    ("Empenhos", "planilha", "aba_empenho", "empenhos"),
+    ("Empenhos - Análise", "planilha", "aba_analise", "ano_inteiro"),
+    ("Empenhos - Saldo", "planilha", "aba_saldo", "ano_inteiro"),
+    ("Pague Predial", "planilha", "aba_pague", "pague"),
+    ("Projetos Elétricos", "planilha", "aba_eletrico", "eletrico"),
+    ("Acessibilidade", "planilha", "aba_acessibilidade", "acessibilidade"),
+    ("Censo - Escolas", "planilha", "aba_censo_25", None),
+    ("Censo - Matrículas", "planilha_censo", "aba_censo_25_matriculas", None),
+]
+
+
+class PreCarregamento:
+    """Estado compartilhado por todas as sessões: um pool limitado e o status de cada aba."""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=MAX_LEITURAS_SIMULTANEAS, thread_name_prefix="pre-carga")
+        self._trava = threading.Lock()
+        self.status = {}
+
+    def _atualizar_status(self, rotulo, **campos):
+        with self._trava:
+            self.status[rotulo] = {**self.status.get(rotulo, {}), **campos}
+
+    def _carregar(self, rotulo, planilha, aba, preparo):
+        self._atualizar_status(rotulo, situacao="carregando")
+        inicio = time.perf_counter()
+        try:
+            if preparo:
+                carregar_preparado(planilha, aba, preparo)
+            else:
+                carregar_compartilhado(planilha, aba)
+            self._atualizar_status(rotulo, situacao="pronto", segundos=time.perf_counter() - inicio, erro=None)
+        except Exception as e:
+            self._atualizar_status(rotulo, situacao="erro", segundos=time.perf_counter() - inicio, erro=str(e))
+
+    def iniciar(self):
+        """Agenda a leitura de todas as abas configuradas que não estejam em andamento."""
+        for rotulo, chave_planilha, chave_aba, preparo in ABAS_CONFIGURADAS:
+            if chave_planilha not in st.secrets or chave_aba not in st.secrets:
+                self._atualizar_status(rotulo, situacao="não configurada")
+                continue
+            with self._trava:
+                if self.status.get(rotulo, {}).get("situacao") in ("na fila", "carregando"):
+                    continue
+                self.status[rotulo] = {"situacao": "na fila"}
+            self._executor.submit(self._carregar, rotulo, st.secrets[chave_planilha], st.secrets[chave_aba], preparo)
+
+    def resumo(self):
+        with self._trava:
+            return {rotulo: dict(campos) for rotulo, campos in self.status.items()}
+
+
+@st.cache_resource
+def _pre_carregamento():
+    return PreCarregamento()
+
+
+def iniciar_pre_carregamento():
+    """Dispara o aquecimento das abas uma vez por sessão (chamado pelo app.py após o login)."""
+    if not st.session_state.get("pre_carregamento_iniciado"):
+        st.session_state.pre_carregamento_iniciado = True
+        _pre_carregamento().iniciar()
+
+
+def status_pre_carregamento():
+    """Status de cada aba: {rótulo: {"situacao", "segundos", "erro"}}."""
+    return _pre_carregamento().resumo()
@@ -0,0 +1,343 @@
+# Arquivo: preparo.py
+# Limpeza e tipagem de cada aba, feitas uma única vez por versão da planilha.
+# As páginas recebem o DataFrame já pronto para filtrar (ver utils.carregar_preparado).
+import numpy as np
+import pandas as pd
+from moeda import converter_moeda
+
+
+# --- FUNÇÕES AUXILIARES DE LIMPEZA ---
+def converter_colunas_moeda(data, colunas):
+    """
+    Converte as colunas financeiras com o conversor vetorizado (moeda.converter_moeda).
+    Textos inválidos viram 0.0, como antes, mas a quantidade por coluna fica
+    registrada em data.attrs["valores_invalidos"] (ver utils.aviso_valores_invalidos).
+    """
+    invalidos = {}
+    for col in colunas:
+        if col in data.columns:
+            data[col], qtd = converter_moeda(data[col], invalido=0.0)
+            if qtd:
+                invalidos[col] = qtd
+    data.attrs["valores_invalidos"] = invalidos
+
+
+def consolidar_colunas(data, mapa):
+    """
+    Junta os valores de várias colunas em uma só, coluna a coluna (sem loop por linha).
+
+    'mapa' é um dicionário {coluna_destino: [colunas_origem]}. Para cada linha os
+    valores não vazios são unidos com " | "; se nada sobrar, o destino recebe "-".
+    Colunas de origem ausentes na planilha são ignoradas.
+    """
+    for destino, origens in mapa.items():
+        resultado = pd.Series("", index=data.index, dtype=object)
+        for c in origens:
+            if c not in data.columns:
+                continue
+            texto = data[c].astype(str)
+            valido = (data[c].notna() & (texto.str.strip() != "")).to_numpy()
+            separador = np.where(valido & (resultado != "").to_numpy(), " | ", "")
+            resultado = resultado + separador + texto.where(valido, "").astype(object)
+        data[destino] = resultado.mask(resultado == "", "-")
+    return data
+
+
+# --- OBRAS (bd.py) ---
+# Código da situação da obra, calculado uma vez na carga a partir de STATUS/STATUS ÚNICO
+COLUNA_CODIGO_STATUS = "CÓDIGO STATUS"
+STATUS_EXECUCAO = "execução"
+STATUS_CONCLUIDO = "concluído"
+STATUS_CANCELADO = "cancelado"
+STATUS_OUTRO = "outro"
+CODIGOS_STATUS = [STATUS_EXECUCAO, STATUS_CONCLUIDO, STATUS_CANCELADO, STATUS_OUTRO]
+
+
+def _classificar_valores(serie, regra):
+    # Classifica só os valores distintos (poucos) e espalha o resultado pelas linhas
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    classes = np.array([regra(v) for v in unicos], dtype=object)
+    return classes[codigos]
+
+
+def _status_da_obra(valor):
+    texto = "" if pd.isna(valor) else str(valor)
+    if texto.startswith("EM EXECUÇÃO"):
+        return STATUS_EXECUCAO
+    if texto.startswith("CONCLUÍDO"):
+        return STATUS_CONCLUIDO
+    return STATUS_OUTRO
+
+
+def classificar_status(data):
+    """
+    Coluna categórica COLUNA_CODIGO_STATUS: "cancelado" quando STATUS ÚNICO é
+    CANCELADO; senão "execução"/"concluído" pelo começo do STATUS; senão "outro".
+    KPIs e toggles do dashboard contam esse código em vez de varrer os textos.
+    """
+    codigo = np.full(len(data), STATUS_OUTRO, dtype=object)
+    if "STATUS" in data.columns:
+        codigo = _classificar_valores(data["STATUS"], _status_da_obra)
+    coluna_cancelado = "STATUS ÚNICO" if "STATUS ÚNICO" in data.columns else "STATUS"
+    if coluna_cancelado in data.columns:
+        cancelado = _classificar_valores(data[coluna_cancelado], lambda v: v == "CANCELADO").astype(bool)
+        codigo = np.where(cancelado, STATUS_CANCELADO, codigo)
+    data[COLUNA_CODIGO_STATUS] = pd.Categorical(codigo, categories=CODIGOS_STATUS)
+    return data
+
+
+def preparar_obras(data):
+    """Aba de Obras pronta para o dashboard: MUNICÍPIO sem espaços, colunas financeiras numéricas e código de status."""
+    data = data.copy()
+    data["MUNICÍPIO"] = data["MUNICÍPIO"].astype(str).str.strip()
+
+    # As três colunas ficam float64; o "R$" é só formato de exibição (estilos.formatar_reais)
+    converter_colunas_moeda(data, ["VALOR", "VALOR FATURADO", "SALDO CONTRATUAL"])
+    return classificar_status(data)
+
+
+def preparar_obras_analise(data):
+    """Aba de Obras para a Análise Avançada (Mito): colunas financeiras, INEP e DIAS tratados."""
+    data = data.copy()
+    data["MUNICÍPIO"] = data["MUNICÍPIO"].astype(str).str.strip()
+
+    # A. Limpeza de Colunas Financeiras
+    converter_colunas_moeda(data, ["VALOR", "VALOR FATURADO", "SALDO CONTRATUAL"])
+
+    # B. Tratamento de INEP (Numérico -> Inteiro -> String sem .00)
+    if "INEP" in data.columns:
+        data["INEP"] = pd.to_numeric(data["INEP"], errors='coerce').fillna(0)
+        data["INEP"] = data["INEP"].astype(int).astype(str)
+        # Se virou "0", volta a ser vazio ""
+        data["INEP"] = data["INEP"].replace("0", "")
+
+    # C. Tratamento de DIAS (Converter para Inteiro)
+    if "DIAS" in data.columns:
+        data["DIAS"] = pd.to_numeric(data["DIAS"], errors='coerce').fillna(0).astype(int)
+    return data
+
+
+# --- MEDIÇÕES (bd-medicoes.py) ---
+def preparar_medicoes(data):
+    """Aba de Medições: VALOR numérico, DATA CADASTRO como data e ANO FISCAL como texto."""
+    data = data.copy()
+
+    # 1. Limpeza de Valor
+    converter_colunas_moeda(data, ["VALOR"])
+
+    # 2. Limpeza de Data
+    if "DATA CADASTRO" in data.columns:
+        data["DATA CADASTRO"] = pd.to_datetime(data["DATA CADASTRO"], dayfirst=True, errors='coerce')
+        data["DATA CADASTRO"] = data["DATA CADASTRO"].dt.date
+
+    # 3. Limpeza do Ano Fiscal (COMO TEXTO)
+    if "ANO FISCAL" in data.columns:
+        data["ANO FISCAL"] = data["ANO FISCAL"].fillna("-")
+        data["ANO FISCAL"] = data["ANO FISCAL"].astype(str)
+        # Remove o ".0" de anos que o pandas possa ter lido como "2024.0"
+        data["ANO FISCAL"] = data["ANO FISCAL"].str.replace(".0", "", regex=False)
+        data["ANO FISCAL"] = data["ANO FISCAL"].replace(["nan", "0", "<NA>"], "-")
+    return data
+
+
+# --- EMPENHOS (bd-empenhos.py) ---
+def preparar_empenhos(data):
+    """Aba de Empenhos: VALOR numérico (linhas sem valor descartadas) e DIREC inteira."""
+    data = data.copy()
+
+    converter_colunas_moeda(data, ["VALOR"])
+    if "VALOR" in data.columns:
+        data = data.dropna(subset=['VALOR'])
+
+    if "DIREC" in data.columns:
+        data["DIREC"] = pd.to_numeric(data["DIREC"], errors='coerce').fillna(0).astype(int)
+    return data
+
+
+def preparar_ano_inteiro(data):
+    """Abas auxiliares de Empenhos (Análise e Saldo): coluna ANO convertida para inteiro.
+
+    Evita erros se numa planilha estiver "2026" (texto) e na outra 2026 (número).
+    """
+    data = data.copy()
+    if "ANO" in data.columns:
+        data["ANO"] = pd.to_numeric(data["ANO"], errors='coerce').fillna(0).astype(int)
+    return data
+
+
+# --- PAGUE PREDIAL (bd-pague.py) ---
+# Colunas do formulário que são consolidadas em uma só na tabela: {destino: [origens]}
+CONSOLIDACOES_PAGUE = {
+    "Área Unificada": [
+        "Área de Ação (Baixa)",
+        "Área de Ação (Média)"
+    ],
+    "Descrição Unificada": [
+        "Descrição do Serviço (Baixa - Hidráulica)",
+        "Descrição do Serviço (Baixa - Elétrica)",
+        "Descrição do Serviço (Baixa - Alvenaria/Marcenaria)",
+        "Descrição do Serviço (Baixa - Limpeza de Vegetação)",
+        "Descrição do Serviço (Baixa - Manutenção de Ar Condicionado)",
+        "Relato Problema Estrutural (Média)",
+        "Dúvida (Alta)"
+    ],
+    "Documentos Unificados": [
+        "Proposta de Preço (Baixa)",
+        "Proposta de Preço (Média)",
+        "Ofício de Solicitação DIREC (Alta)"
+    ],
+}
+
+
+def preparar_pague(data):
+    """Aba do Pague Predial: colunas consolidadas e coluna auxiliar ANO a partir de Data."""
+    data = data.copy()
+
+    # 1. Consolidações (Área, Descrição e Documentos)
+    consolidar_colunas(data, CONSOLIDACOES_PAGUE)
+
+    # 2. Ajuste de Data e Criação de Coluna ANO
+    if "Data" in data.columns:
+        data["Data"] = pd.to_datetime(data["Data"], dayfirst=True, errors='coerce')
+        data["ANO"] = data["Data"].dt.year # Coluna auxiliar de ano para o filtro
+        data["Data"] = data["Data"].dt.date # Remove a hora para visualização
+    return data
+
+
+# --- CENSO (censo.py) ---
+# Colunas inteiras do Censo (evita o ".0" na exibição)
+COLUNAS_INTEIRAS_CENSO = [
+    "NU_TELEFONE", "MATRICULAS TOTAIS", "MATRICULAS FUND", "MATRICULAS MED",
+    "MATRICULAS PROF", "MATRICULAS EJA", "SALAS", "SALAS_CLIMATIZADAS",
+    "SALAS_ACESSIVEIS", "DOCENTES_TOTAIS"
+]
+
+
+def preparar_censo(escolas, matriculas):
+    """
+    Une as escolas do Censo às matrículas (por CO_ENTIDADE) e trata as colunas:
+    ESCOLA_MUNICIPIO para a seleção, coordenadas numéricas e contagens inteiras.
+    """
+    data = pd.merge(escolas, matriculas, on="CO_ENTIDADE", how="left")
+    data["ESCOLA_MUNICIPIO"] = data["NO_ENTIDADE"] + " - " + data["NO_MUNICIPIO"]
+
+    # Coordenadas: remove espaços e troca vírgula por ponto antes de converter
+    for col in ["LATITUDE_C", "LONGITUDE_C"]:
+        if col in data.columns:
+            data[col] = data[col].astype(str).str.strip().str.replace(",", ".")
+            data[col] = pd.to_numeric(data[col], errors="coerce")
+
+    for col in COLUNAS_INTEIRAS_CENSO:
+        if col in data.columns:
+            data[col] = pd.to_numeric(data[col], errors="coerce").astype("Int64")
+    return data
+
+
+# --- PROJETOS ELÉTRICOS E ACESSIBILIDADE (proj_eletrico.py, soli_acessibilidade.py) ---
+def _texto_sem_espacos(data, colunas):
+    # Garante que colunas de texto não tenham espaços extras
+    data = data.copy()
+    for col in colunas:
+        if col in data.columns:
+            data[col] = data[col].astype(str).str.strip()
+    return data
+
+
+def preparar_eletrico(data):
+    """Aba de Projetos Elétricos: colunas dos filtros sem espaços extras."""
+    return _texto_sem_espacos(data, ["Projetista", "Orçamento", "Projeto", "Tipo de Projeto"])
+
+
+def preparar_acessibilidade(data):
+    """Aba de Acessibilidade: colunas dos filtros sem espaços extras."""
+    return _texto_sem_espacos(data, ["ESCOLA", "CIDADE", "SITUAÇÃO", "CRITICIDADE POR TEMPO DE PROCESSO"])
+
+
+# Registro dos preparos disponíveis, referenciados pelo nome em carregar_preparado
+PREPAROS = {
+    "obras": preparar_obras,
+    "obras_analise": preparar_obras_analise,
+    "medicoes": preparar_medicoes,
+    "empenhos": preparar_empenhos,
+    "ano_inteiro": preparar_ano_inteiro,
+    "pague": preparar_pague,
+    "eletrico": preparar_eletrico,
+    "acessibilidade": preparar_acessibilidade,
+}
+
+# Tipos compactos de cada aba depois do preparo (ver tipos.otimizar_tipos). A
+# Análise Avançada (Mito) não recebe categóricas: a planilha edita os valores.
+ESQUEMAS_TIPOS = {
+    "obras": {
+        "categorias": ["PROGRAMA", "DIREC", "MUNICÍPIO", "STATUS", "STATUS ÚNICO", "EMPRESA"],
+        "inteiros": ["ANO"],
+    },
+    "obras_analise": {"inteiros": ["ANO", "DIAS"]},
+    "medicoes": {"categorias": ["PROGRAMA", "DIREC", "MUNICÍPIO", "ANO FISCAL", "FONTE"]},
+    "empenhos": {"categorias": ["EMPRESA", "TIPO DE NE", "FONTE"], "inteiros": ["DIREC", "ANO"]},
+    "ano_inteiro": {"inteiros": ["ANO"]},
+    "pague": {
+        "categorias": ["DIREC", "Município", "Situação Estrutural", "Área de Ação (Baixa)", "Área de Ação (Média)"],
+        "inteiros": ["ANO"],
+    },
+    "eletrico": {"categorias": ["DIREC", "Munícipio", "Projetista", "Projeto", "Tipo de Projeto", "Orçamento"]},
+    "acessibilidade": {"categorias": ["CIDADE", "SITUAÇÃO", "CRITICIDADE POR TEMPO DE PROCESSO"]},
+    "censo": {
+        "categorias": ["NO_MUNICIPIO", "CO_ORGAO_REGIONAL", "ETAPAS", "MODALIDADE"],
+        "inteiros": COLUNAS_INTEIRAS_CENSO,
+        "float32": ["LATITUDE_C", "LONGITUDE_C"],
+    },
+}
+
+
+# --- PREPARO INCREMENTAL ---
+# Preparos em que cada linha preparada depende só da linha bruta correspondente.
+# Medições e Pague Predial ficam de fora: o to_datetime deduz o formato das datas
+# pela coluna inteira, então um trecho isolado poderia ser lido de outro jeito.
+PREPAROS_POR_LINHA = {"obras", "obras_analise", "empenhos", "ano_inteiro", "eletrico", "acessibilidade"}
+
+
+def _posicoes(faixas, total):
+    partes = [np.arange(inicio, min(fim, total)) for inicio, fim in faixas if inicio < total]
+    return np.concatenate(partes) if partes else np.array([], dtype=np.intp)
+
+
+def _indice_padrao(data):
+    return data.index.equals(pd.RangeIndex(len(data)))
+
+
+def repreparar(preparo, bruto_anterior, preparado_anterior, bruto, faixas):
+    """
+    Mesmo resultado de PREPAROS[preparo](bruto) (antes da otimização de tipos), mas
+    só as 'faixas' de linhas [(inicio, fim), ...] alteradas desde 'bruto_anterior'
+    passam pelo preparo; as demais vêm de 'preparado_anterior'. Devolve None quando
+    não é possível (preparo fora de PREPAROS_POR_LINHA ou índice diferente de 0..n-1).
+    """
+    if preparo not in PREPAROS_POR_LINHA or not (_indice_padrao(bruto) and _indice_padrao(bruto_anterior)):
+        return None
+    preparar = PREPAROS[preparo]
+    antigas = _posicoes(faixas, len(bruto_anterior))
+    refeitas = preparar(bruto.iloc[_posicoes(faixas, len(bruto))])
+
+    # Linhas fora das faixas são iguais nas duas versões (mesmo bloco, mesma posição)
+    mantidas = preparado_anterior[~preparado_anterior.index.isin(antigas)]
+    for col in ESQUEMAS_TIPOS.get(preparo, {}).get("categorias", []):
+        # Categóricas voltam ao tipo original: a otimização refaz as categorias com as linhas novas
+        if col in mantidas.columns and isinstance(mantidas[col].dtype, pd.CategoricalDtype):
+            mantidas[col] = mantidas[col].astype(mantidas[col].cat.categories.dtype)
+
+    partes = [parte for parte in (mantidas, refeitas) if len(parte)]
+    data = pd.concat(partes).sort_index(kind="stable") if partes else refeitas
+    if _indice_padrao(data):
+        data.index = pd.RangeIndex(len(data))
+
+    data.attrs = {}
+    if "valores_invalidos" in preparado_anterior.attrs:
+        # Contagem anterior, sem as linhas refeitas, mais a contagem delas na versão nova
+        invalidos = dict(preparado_anterior.attrs["valores_invalidos"])
+        for col, qtd in preparar(bruto_anterior.iloc[antigas]).attrs.get("valores_invalidos", {}).items():
+            invalidos[col] = invalidos.get(col, 0) - qtd
+        for col, qtd in refeitas.attrs.get("valores_invalidos", {}).items():
+            invalidos[col] = invalidos.get(col, 0) + qtd
+        data.attrs["valores_invalidos"] = {col: qtd for col, qtd in invalidos.items() if qtd}
+    return data
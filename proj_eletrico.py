@@ -1,6 +1,11 @@
 import streamlit as st
 import plotly.express as px
-from utils import carregar_df, my_metric
+from utils import carregar_preparado, my_metric
+from filtros import Selecao, opcoes_filtro
+from busca import buscar, normalizar
+from estilos import VERDE_CLARO, destacar_linhas
+from tabela import tabela_paginada
+from tipos import contar_valores
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(page_title="Projetos Elétricos", layout="wide")
@@ -10,17 +15,11 @@ st.set_page_config(page_title="Projetos Elétricos", layout="wide")
 planilha = st.secrets["planilha"]
 aba = st.secrets["aba_eletrico"]
 
-data = carregar_df(planilha, aba)
+# Colunas de texto sem espaços extras e tipos compactos: preparo.preparar_eletrico
+data = carregar_preparado(planilha, aba, "eletrico")
 
-# --- TRATAMENTO DE DADOS (LIMPEZA/PREPARAÇÃO) ---
-# Garante que colunas de texto não tenham espaços extras
-cols_texto = ["Projetista", "Orçamento", "Projeto", "Tipo de Projeto"]
-for col in cols_texto:
-    if col in data.columns:
-        data[col] = data[col].astype(str).str.strip()
-
-# Cria cópia para filtrar
-df_filtrado = data.copy()
+# Sem cópia: cada filtro abaixo já gera um DataFrame novo só com as linhas que passam
+df_filtrado = data
 
 st.title("💡 Projetos Elétricos")
 
@@ -34,7 +33,7 @@ st.sidebar.markdown("---")
 
 # 2. Filtro de Projetista (Lista/Multiselect)
 if "Projetista" in data.columns:
-    opcoes_projetista = sorted(data["Projetista"].unique().tolist())
+    opcoes_projetista = opcoes_filtro(data, "Projetista")
     # Remove valores vazios ou 'nan'
     opcoes_projetista = [x for x in opcoes_projetista if str(x).lower() != 'nan' and str(x) != '']
     sel_projetista = st.sidebar.multiselect("Projetista:", options=opcoes_projetista, placeholder="Todos")
@@ -43,7 +42,7 @@ else:
 
 # 3. Filtro de Projeto (NOVO)
 if "Projeto" in data.columns:
-    opcoes_projeto = sorted(data["Projeto"].unique().tolist())
+    opcoes_projeto = opcoes_filtro(data, "Projeto")
     # Remove valores vazios ou 'nan'
     opcoes_projeto = [x for x in opcoes_projeto if str(x).lower() != 'nan' and str(x) != '']
     sel_projeto = st.sidebar.multiselect("Situação do Projeto:", options=opcoes_projeto, placeholder="Todos")
@@ -52,15 +51,17 @@ else:
 
 # 4. Filtro de Orçamento (Lista/Multiselect)
 if "Orçamento" in data.columns:
-    opcoes_orcamento = sorted(data["Orçamento"].unique().tolist())
+    opcoes_orcamento = opcoes_filtro(data, "Orçamento")
     opcoes_orcamento = [x for x in opcoes_orcamento if str(x).lower() != 'nan' and str(x) != '']
     sel_orcamento = st.sidebar.multiselect("Orçamento (Status):", options=opcoes_orcamento, placeholder="Todos")
 else:
     sel_orcamento = []
 
 # --- APLICAÇÃO DOS FILTROS ---
-if busca_escola:
-    df_filtrado = df_filtrado[df_filtrado["Nome da Escola Estadual"].str.contains(busca_escola, case=False, na=False)]
+termo = normalizar(busca_escola)
+if termo:
+    # Índice sem acentos (busca.py): linhas das escolas mais parecidas primeiro
+    df_filtrado = Selecao(data).na_ordem(buscar(data, "Nome da Escola Estadual", termo)).linhas()
 
 if sel_projetista:
     df_filtrado = df_filtrado[df_filtrado["Projetista"].isin(sel_projetista)]
@@ -111,7 +112,7 @@ if not df_filtrado.empty:
     
     with col_g1:
         # GRÁFICO 1: Projetos por Projetista
-        df_proj = df_filtrado["Projetista"].value_counts().reset_index()
+        df_proj = contar_valores(df_filtrado["Projetista"]).reset_index()
         df_proj.columns = ["Projetista", "Quantidade"]
         
         fig_bar = px.bar(
@@ -126,7 +127,7 @@ if not df_filtrado.empty:
     with col_g2:
         # GRÁFICO 2: Status do Projeto (Pizza)
         if "Projeto" in df_filtrado.columns:
-            df_status = df_filtrado["Projeto"].value_counts().reset_index()
+            df_status = contar_valores(df_filtrado["Projeto"]).reset_index()
             df_status.columns = ["Status", "Quantidade"]
             
             fig_pie = px.pie(
@@ -150,23 +151,9 @@ with st.expander("Visualizar Tabela Completa", expanded=True):
     
     # Filtra colunas existentes para evitar erro
     cols_to_show = [c for c in colunas_desejadas if c in df_filtrado.columns]
-    
-    df_display = df_filtrado[cols_to_show].copy()
-
-    # Função de Estilo (Original sua)
-    def pintar_linha(linha):
-        # Verifica se 'Projeto' existe na linha e se é 'Pronto' (case insensitive para segurança)
-        val = str(linha.get('Projeto', '')).strip().lower()
-        if val == 'pronto':
-            return ['background-color: lightgreen; color: black'] * len(linha)
-        else:
-            return [''] * len(linha)
-
-    # Aplica o estilo e exibe
-    st.dataframe(
-        df_display.style.apply(pintar_linha, axis=1), 
-        hide_index=True, 
-        use_container_width=True
-    )
-    
-    st.caption(f"Total de registros exibidos: {len(df_display)}")
\ No newline at end of file
+
+    # Projetos prontos em verde ('Pronto' sem diferenciar maiúsculas, ver estilos.py)
+    tabela_paginada(
+        df_filtrado, cols_to_show, chave="eletrico",
+        preparar=lambda df_display: destacar_linhas(df_display, [("Projeto", "pronto", VERDE_CLARO)], ignorar_caixa=True),
+    )
\ No newline at end of file
@@ -1,29 +1,24 @@
-import requests
+import argparse
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import pandas as pd
-import time
+import requests
+from sipat_http import URL_API, LimiteTaxa, criar_sessao, extrair_lista, pedir_com_retentativas
 
 # 1. Configurações da Requisição
-url = "https://sgpapi.hml.sistemas.cotic.rn.gov.br/ObterImoveis"
+url = f"{URL_API}/ObterImoveis"
+nome_arquivo = "imoveis_seec_completo.csv"
 
-headers = {
-    "Accept": "application/json, text/plain, */*",
-    "Content-Type": "application/json",
-    "Origin": "https://www.sipat.rn.gov.br",
-    "Referer": "https://www.sipat.rn.gov.br/",
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-}
+# Padrões educados com o servidor do Estado (ajustáveis pela linha de comando):
+# páginas buscadas ao mesmo tempo e pedidos por segundo no total
+MAX_SIMULTANEAS = 4
+PEDIDOS_POR_SEGUNDO = 4.0
 
-todos_imoveis = []
-pagina_atual = 1
 
-print("Iniciando a extração dos dados da SEEC...")
-
-# 2. Laço de repetição para varrer todas as páginas
-while True:
-    print(f"Buscando página {pagina_atual}...")
-    
+def montar_payload(pagina):
     # O payload (corpo da requisição) igual ao que você achou no curl, variando apenas a página
-    payload = {
+    return {
         "DominioId": 31,
         "SituacaoId": 0,
         "NumeroRegistro": "",
@@ -31,52 +26,115 @@ while True:
         "Logradouro": "",
         "Bairro": "",
         "Numero": "",
-        "pagina": pagina_atual
+        "pagina": pagina
     }
-    
-    # Fazendo a requisição POST
-    response = requests.post(url, json=payload, headers=headers)
-    
+
+
+def buscar_pagina(sessao, limite, pagina):
+    """
+    Registros da página (lista vazia = acabaram as páginas); None se a página falhou
+    mesmo após as retentativas (timeouts, 429 e 5xx são repetidos, ver sipat_http).
+    """
+    print(f"Buscando página {pagina}...")
+    try:
+        response = pedir_com_retentativas(sessao, "POST", url, limite=limite,
+                                          json=montar_payload(pagina), timeout=30)
+    except requests.exceptions.RequestException as e:
+        print(f"Falha de conexão na página {pagina}. Erro: {e}")
+        return None
+
     # Verifica se a requisição deu erro (ex: 404, 500)
     if response.status_code != 200:
-        print(f"Erro ao acessar a página {pagina_atual}. Status Code: {response.status_code}")
-        break
-        
-    dados_json = response.json()
-    
-    # 3. Lógica para extrair a lista de imóveis do JSON
-    registros = []
-    
-    # APIs costumam retornar a lista direto ou dentro de um dicionário (ex: {"itens": [...]})
-    if isinstance(dados_json, list):
-        registros = dados_json
-    elif isinstance(dados_json, dict):
-        # Procura dinamicamente pela chave que contém a lista de dados
-        registros = next((v for v in dados_json.values() if isinstance(v, list)), [])
-        
-    # Se a lista vier vazia, significa que as páginas acabaram
-    if not registros:
-        print(f"Página {pagina_atual} vazia. Extração concluída!")
-        break
-        
-    # Adiciona os registros desta página na nossa lista mestre
-    todos_imoveis.extend(registros)
-    
-    pagina_atual += 1
-    
-    # Pausa de 1 segundo entre os pedidos para não derrubar/sobrecarregar o servidor do Estado
-    time.sleep(1)
-
-# 4. Transformação e Salvamento
-if todos_imoveis:
-    print(f"\nTotal de imóveis extraídos: {len(todos_imoveis)}")
-    
-    # Converte a lista de dicionários para um DataFrame do Pandas
-    df = pd.DataFrame(todos_imoveis)
-    
-    # Salva em CSV
-    nome_arquivo = "imoveis_seec_completo.csv"
-    df.to_csv(nome_arquivo, index=False, encoding='utf-8-sig', sep=';')
-    print(f"Arquivo salvo com sucesso: {nome_arquivo}")
-else:
-    print("Nenhum dado foi retornado pela API.")
\ No newline at end of file
+        print(f"Erro ao acessar a página {pagina}. Status Code: {response.status_code}")
+        return None
+    try:
+        return extrair_lista(response.json())
+    except (ValueError, requests.exceptions.RequestException) as e:
+        print(f"Resposta inválida na página {pagina}. Erro: {e}")
+        return None
+
+
+def extrair_imoveis(max_simultaneas=MAX_SIMULTANEAS, por_segundo=PEDIDOS_POR_SEGUNDO):
+    """
+    Varre as páginas com até 'max_simultaneas' pedidos em andamento. As respostas
+    chegam fora de ordem: a primeira página vazia conhecida marca o fim, nenhuma
+    página depois dela é pedida e as que já estavam em andamento são descartadas.
+    Uma página que falha (mesmo após as retentativas) também interrompe a
+    varredura, mas não é confundida com o fim.
+    Devolve (registros na ordem das páginas, páginas com falha antes do fim); com
+    alguma falha a extração está incompleta.
+    """
+    sessao = criar_sessao(max_simultaneas)
+    limite = LimiteTaxa(por_segundo, rajada=max_simultaneas)
+    por_pagina = {}
+    fim = None  # primeira página vazia
+    falhas = set()  # páginas que falharam
+    parada = None  # primeira página vazia ou com falha: nada depois dela é pedido
+    proxima = 1
+
+    with ThreadPoolExecutor(max_workers=max_simultaneas) as executor:
+        em_andamento = {}
+        while True:
+            # Mantém a janela cheia enquanto o fim não for conhecido
+            while len(em_andamento) < max_simultaneas and (parada is None or proxima < parada):
+                em_andamento[executor.submit(buscar_pagina, sessao, limite, proxima)] = proxima
+                proxima += 1
+            if not em_andamento:
+                break
+
+            prontas, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+            for futuro in prontas:
+                pagina = em_andamento.pop(futuro)
+                registros = futuro.result()
+                if registros is None:
+                    falhas.add(pagina)
+                # Se a lista vier vazia, significa que as páginas acabaram
+                elif not registros:
+                    if fim is None or pagina < fim:
+                        fim = pagina
+                else:
+                    por_pagina[pagina] = registros
+                    continue
+                if parada is None or pagina < parada:
+                    parada = pagina
+
+    paginas_com_falha = sorted(p for p in falhas if fim is None or p < fim)
+    if fim is not None and not paginas_com_falha:
+        print(f"Página {fim} vazia. Extração concluída!")
+    todos_imoveis = []
+    for pagina in sorted(por_pagina):
+        if pagina < parada:
+            todos_imoveis.extend(por_pagina[pagina])
+    return todos_imoveis, paginas_com_falha
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrai todos os imóveis da SEEC no SIPAT.")
+    parser.add_argument("--simultaneas", type=int, default=MAX_SIMULTANEAS,
+                        help=f"páginas buscadas ao mesmo tempo (padrão: {MAX_SIMULTANEAS})")
+    parser.add_argument("--por-segundo", type=float, default=PEDIDOS_POR_SEGUNDO,
+                        help=f"máximo de pedidos por segundo (padrão: {PEDIDOS_POR_SEGUNDO})")
+    args = parser.parse_args()
+
+    print("Iniciando a extração dos dados da SEEC...")
+
+    # 2. Varredura de todas as páginas (em paralelo, com limite de taxa)
+    todos_imoveis, paginas_com_falha = extrair_imoveis(args.simultaneas, args.por_segundo)
+    if paginas_com_falha:
+        # Extração incompleta: o CSV da última extração completa é preservado
+        print(f"\nFalha nas páginas {paginas_com_falha} mesmo após as retentativas. "
+              f"Extração incompleta; '{nome_arquivo}' não foi alterado. Rode o script de novo.")
+        sys.exit(1)
+
+    # 3. Transformação e Salvamento
+    if todos_imoveis:
+        print(f"\nTotal de imóveis extraídos: {len(todos_imoveis)}")
+
+        # Converte a lista de dicionários para um DataFrame do Pandas
+        df = pd.DataFrame(todos_imoveis)
+
+        # Salva em CSV
+        df.to_csv(nome_arquivo, index=False, encoding='utf-8-sig', sep=';')
+        print(f"Arquivo salvo com sucesso: {nome_arquivo}")
+    else:
+        print("Nenhum dado foi retornado pela API.")
@@ -1,78 +1,188 @@
-import requests
+import argparse
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
-import time
+import requests
+from sipat_http import URL_API, LimiteTaxa, criar_sessao, pedir_com_retentativas
 
 # --- CONFIGURAÇÕES ---
 nome_arquivo_imoveis = "imoveis_seec_completo.csv"
 nome_arquivo_saida = "arquivos_imoveis_seec.csv"
+# Um ID de imóvel por linha, gravado assim que seus arquivos estão salvos na saída
+nome_arquivo_progresso = "arquivos_imoveis_seec.progresso"
 
-url_api_arquivos = "https://sgpapi.hml.sistemas.cotic.rn.gov.br/ObterArquivo"
+url_api_arquivos = f"{URL_API}/ObterArquivo"
 url_base_download = "http://sistemas.searh.rn.gov.br/SGP/Arquivos/"
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-}
-
-# --- 1. LENDO OS IMÓVEIS ---
-try:
-    df_imoveis = pd.read_csv(nome_arquivo_imoveis, sep=';')
-except FileNotFoundError:
-    print(f"Erro: O arquivo '{nome_arquivo_imoveis}' não foi encontrado na pasta.")
-    exit()
+# Padrões educados com o servidor do Estado (ajustáveis pela linha de comando)
+MAX_SIMULTANEAS = 4
+PEDIDOS_POR_SEGUNDO = 4.0
 
-# Descobre automaticamente o nome da coluna de ID no seu CSV (pode vir como 'id', 'Id', 'ID', etc.)
-coluna_id = next((col for col in df_imoveis.columns if col.lower() == 'id'), None)
+COLUNAS_SAIDA = ["id_arquivo", "imovelId", "url_download", "dataCadastro", "categoria", "nomeOriginal",
+                 "usuarioCadastro"]
 
-if not coluna_id:
-    print("Erro: Não encontrei uma coluna de ID no seu CSV de imóveis.")
-    exit()
 
-# Pega apenas os IDs únicos removendo valores nulos (caso existam)
-ids_imoveis = df_imoveis[coluna_id].dropna().unique()
-print(f"Iniciando a busca de arquivos para {len(ids_imoveis)} imóveis...")
+def ler_ids_imoveis():
+    """IDs únicos (como texto) do CSV de imóveis; None se o arquivo ou a coluna não existir."""
+    try:
+        df_imoveis = pd.read_csv(nome_arquivo_imoveis, sep=';')
+    except FileNotFoundError:
+        print(f"Erro: O arquivo '{nome_arquivo_imoveis}' não foi encontrado na pasta.")
+        return None
 
-# --- 2. BUSCANDO OS ARQUIVOS NA API ---
-lista_arquivos_final = []
+    # Descobre automaticamente o nome da coluna de ID no seu CSV (pode vir como 'id', 'Id', 'ID', etc.)
+    coluna_id = next((col for col in df_imoveis.columns if col.lower() == 'id'), None)
+    if not coluna_id:
+        print("Erro: Não encontrei uma coluna de ID no seu CSV de imóveis.")
+        return None
 
-for imovel_id in ids_imoveis:
     # Como o ID pode vir como float (ex: 91.0), forçamos para inteiro e depois string
-    imovel_id_str = str(int(imovel_id)) 
-    print(f"Buscando arquivos do Imóvel ID: {imovel_id_str}...")
-    
+    return [str(int(imovel_id)) for imovel_id in df_imoveis[coluna_id].dropna().unique()]
+
+
+def ler_progresso():
+    """
+    IDs já concluídos numa execução anterior. Vazio se não houver progresso salvo ou
+    se a saída não existir mais (apagada ou movida): sem ela, os arquivos desses
+    imóveis se perderam e a execução recomeça com todos.
+    """
+    if not os.path.exists(nome_arquivo_progresso):
+        return set()
+    if not os.path.exists(nome_arquivo_saida):
+        print(f"Aviso: '{nome_arquivo_saida}' não foi encontrado; o progresso salvo será descartado.")
+        return set()
+    with open(nome_arquivo_progresso, encoding="utf-8") as f:
+        return {linha.strip() for linha in f if linha.strip()}
+
+
+def montar_registro(arq):
+    # Monta o dicionário selecionando só o que você pediu e criando a URL
+    return {
+        "id_arquivo": arq.get("id"),
+        "imovelId": arq.get("imovelId"),
+        "url_download": f"{url_base_download}{arq.get('nomeArquivo')}",
+        "dataCadastro": arq.get("dataCadastro"),
+        "categoria": arq.get("categoria"),
+        "nomeOriginal": arq.get("nomeOriginal"),
+        "usuarioCadastro": arq.get("usuarioCadastro")
+    }
+
+
+def buscar_arquivos(sessao, limite, imovel_id):
+    """Registros dos arquivos do imóvel (lista vazia se não houver); None se falhou mesmo após as retentativas."""
     try:
-        # Faz um GET simples passando o ID na URL
-        response = requests.get(f"{url_api_arquivos}?id={imovel_id_str}", headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            arquivos = response.json()
-            
-            # Se a API retornar uma lista de arquivos, processamos um por um
-            if arquivos and isinstance(arquivos, list):
-                for arq in arquivos:
-                    # Monta o dicionário selecionando só o que você pediu e criando a URL
-                    dados_arquivo = {
-                        "id_arquivo": arq.get("id"),
-                        "imovelId": arq.get("imovelId"),
-                        "url_download": f"{url_base_download}{arq.get('nomeArquivo')}",
-                        "dataCadastro": arq.get("dataCadastro"),
-                        "categoria": arq.get("categoria"),
-                        "nomeOriginal": arq.get("nomeOriginal"),
-                        "usuarioCadastro": arq.get("usuarioCadastro")
-                    }
-                    lista_arquivos_final.append(dados_arquivo)
-        else:
-             print(f"  Aviso: Retorno {response.status_code} no imóvel {imovel_id_str}")
-             
+        response = pedir_com_retentativas(sessao, "GET", url_api_arquivos, limite=limite,
+                                          params={"id": imovel_id}, timeout=10)
     except requests.exceptions.RequestException as e:
-        print(f"  Falha de conexão ao buscar o imóvel {imovel_id_str}. Erro: {e}")
-        
-    # Pausa de meio segundo para não sobrecarregar a API
-    time.sleep(0.5)
-
-# --- 3. SALVANDO O RESULTADO ---
-if lista_arquivos_final:
-    df_arquivos = pd.DataFrame(lista_arquivos_final)
-    df_arquivos.to_csv(nome_arquivo_saida, index=False, encoding='utf-8-sig', sep=';')
-    print(f"\nPronto! {len(lista_arquivos_final)} links de arquivos foram salvos em '{nome_arquivo_saida}'")
-else:
-    print("\nNenhum arquivo foi encontrado para os imóveis pesquisados.")
\ No newline at end of file
+        print(f"  Falha de conexão ao buscar o imóvel {imovel_id}. Erro: {e}")
+        return None
+
+    if response.status_code != 200:
+        print(f"  Aviso: Retorno {response.status_code} no imóvel {imovel_id}")
+        return None
+    try:
+        arquivos = response.json()
+    except (ValueError, requests.exceptions.RequestException) as e:
+        # Ex.: página de erro em HTML com status 200; o imóvel fica para a próxima execução
+        print(f"  Aviso: Resposta inválida no imóvel {imovel_id}. Erro: {e}")
+        return None
+    # Só uma lista de arquivos interessa; qualquer outro retorno é um imóvel sem arquivos
+    if not arquivos or not isinstance(arquivos, list):
+        return []
+    return [montar_registro(arq) for arq in arquivos]
+
+
+def extrair_arquivos(ids_imoveis, max_simultaneas=MAX_SIMULTANEAS, por_segundo=PEDIDOS_POR_SEGUNDO):
+    """
+    Busca os arquivos dos 'ids_imoveis' com até 'max_simultaneas' pedidos em
+    andamento. Cada imóvel concluído é acrescentado à saída e ao arquivo de
+    progresso na hora, então uma execução interrompida (Ctrl+C, queda de rede)
+    retoma dos que faltam. Imóveis que falharam não entram no progresso e são
+    tentados de novo na próxima execução. Devolve (concluídos, arquivos, falhas).
+    """
+    sessao = criar_sessao(max_simultaneas)
+    limite = LimiteTaxa(por_segundo, rajada=max_simultaneas)
+    concluidos = total_arquivos = falhas = 0
+
+    # Sem progresso salvo (ou sem a saída, ver ler_progresso) tudo começa do zero;
+    # com os dois, continua a mesma saída
+    retomando = os.path.exists(nome_arquivo_progresso) and os.path.exists(nome_arquivo_saida)
+    with open(nome_arquivo_saida, "a" if retomando else "w", newline="",
+              encoding="utf-8" if retomando else "utf-8-sig") as saida, \
+            open(nome_arquivo_progresso, "a" if retomando else "w", encoding="utf-8") as progresso:
+        escritor = csv.DictWriter(saida, fieldnames=COLUNAS_SAIDA, delimiter=';')
+        if not retomando:
+            escritor.writeheader()
+
+        executor = ThreadPoolExecutor(max_workers=max_simultaneas)
+        try:
+            futuros = {executor.submit(buscar_arquivos, sessao, limite, imovel_id): imovel_id
+                       for imovel_id in ids_imoveis}
+            for futuro in as_completed(futuros):
+                imovel_id = futuros[futuro]
+                registros = futuro.result()
+                if registros is None:
+                    falhas += 1
+                    continue
+                # Arquivos primeiro, progresso depois: uma queda no meio só repete o imóvel
+                escritor.writerows(registros)
+                saida.flush()
+                progresso.write(f"{imovel_id}\n")
+                progresso.flush()
+                concluidos += 1
+                total_arquivos += len(registros)
+                print(f"Imóvel {imovel_id}: {len(registros)} arquivo(s) "
+                      f"[{concluidos}/{len(ids_imoveis)}]")
+        finally:
+            # Em caso de interrupção, descarta os pedidos que ainda não começaram
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    return concluidos, total_arquivos, falhas
+
+
+def remover_duplicados():
+    """Remove arquivos repetidos da saída (imóvel gravado pouco antes de uma interrupção e buscado de novo)."""
+    df_arquivos = pd.read_csv(nome_arquivo_saida, sep=';', dtype=str, encoding='utf-8-sig')
+    sem_duplicados = df_arquivos.drop_duplicates()
+    if len(sem_duplicados) < len(df_arquivos):
+        sem_duplicados.to_csv(nome_arquivo_saida, index=False, encoding='utf-8-sig', sep=';')
+    return len(sem_duplicados)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrai os links dos arquivos de cada imóvel da SEEC no SIPAT.")
+    parser.add_argument("--simultaneas", type=int, default=MAX_SIMULTANEAS,
+                        help=f"imóveis buscados ao mesmo tempo (padrão: {MAX_SIMULTANEAS})")
+    parser.add_argument("--por-segundo", type=float, default=PEDIDOS_POR_SEGUNDO,
+                        help=f"máximo de pedidos por segundo (padrão: {PEDIDOS_POR_SEGUNDO})")
+    parser.add_argument("--recomecar", action="store_true",
+                        help="ignora o progresso salvo e busca todos os imóveis de novo")
+    args = parser.parse_args()
+
+    # --- 1. LENDO OS IMÓVEIS ---
+    ids_imoveis = ler_ids_imoveis()
+    if ids_imoveis is None:
+        exit()
+
+    if args.recomecar and os.path.exists(nome_arquivo_progresso):
+        os.remove(nome_arquivo_progresso)
+    feitos = ler_progresso()
+    pendentes = [imovel_id for imovel_id in ids_imoveis if imovel_id not in feitos]
+    if feitos:
+        print(f"Retomando: {len(ids_imoveis) - len(pendentes)} imóveis já concluídos.")
+    print(f"Iniciando a busca de arquivos para {len(pendentes)} imóveis...")
+
+    # --- 2. BUSCANDO OS ARQUIVOS NA API (em paralelo, com limite de taxa e retentativas) ---
+    concluidos, total_arquivos, falhas = extrair_arquivos(pendentes, args.simultaneas, args.por_segundo)
+
+    # --- 3. RESULTADO ---
+    total_salvo = remover_duplicados()
+    print(f"\nNesta execução: {concluidos} imóveis concluídos, {total_arquivos} arquivos encontrados.")
+    if falhas:
+        print(f"\n{falhas} imóveis falharam; rode o script de novo para tentar só esses.")
+    if total_salvo:
+        print(f"\nPronto! {total_salvo} links de arquivos estão salvos em '{nome_arquivo_saida}'")
+    else:
+        print("\nNenhum arquivo foi encontrado para os imóveis pesquisados.")
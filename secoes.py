@@ -0,0 +1,24 @@
+# Arquivo: secoes.py
+# Seções de página que só rodam quando abertas. O st.tabs executa o código de
+# todas as abas a cada rerun (só esconde o conteúdo); aqui um seletor horizontal
+# escolhe a seção e a página roda apenas o bloco dela.
+import streamlit as st
+
+
+def escolher_secao(opcoes, chave, manter=None):
+    """
+    Seletor horizontal das seções (no lugar do st.tabs); devolve a opção escolhida.
+
+    Widgets de uma seção escondida não são desenhados e o Streamlit descartaria o
+    valor deles. 'manter' é {seção: [chaves dos widgets]}: as chaves das seções
+    escondidas são regravadas no session_state, e os filtros continuam como
+    estavam quando o usuário voltar.
+    """
+    escolhida = st.radio("Seção:", opcoes, horizontal=True, key=chave, label_visibility="collapsed")
+    for secao, chaves in (manter or {}).items():
+        if secao == escolhida:
+            continue
+        for chave_widget in chaves:
+            if chave_widget in st.session_state:
+                st.session_state[chave_widget] = st.session_state[chave_widget]
+    return escolhida
@@ -0,0 +1,156 @@
+# Arquivo: sincronizacao.py
+# Sincronização incremental das abas: só transfere a aba quando a planilha mudou
+# e só troca a versão em cache quando algum bloco de linhas da aba foi alterado;
+# as faixas alteradas seguem com o snapshot para o preparo refazer só essas linhas.
+# Também faz a leitura em lote de várias abas da mesma planilha (ler_abas).
+import hashlib
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de linhas por bloco na impressão digital da aba
+TAMANHO_BLOCO = 500
+
+# Planilhas já abertas pela conta de serviço (abrir custa uma requisição de metadados)
+_planilhas_abertas = {}
+_trava_planilhas = threading.Lock()
+
+
+def impressoes_blocos(data, tamanho=TAMANHO_BLOCO):
+    """
+    Impressão digital da aba: um hash por bloco de 'tamanho' linhas, mais um hash dos
+    nomes das colunas na posição 0. Duas leituras com as mesmas impressões têm o
+    mesmo conteúdo.
+    """
+    cabecalho = int(pd.util.hash_array(np.array([str(c) for c in data.columns], dtype=object)).sum())
+    if data.empty:
+        return [str(cabecalho)]
+
+    hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    # Peso pela posição para que trocar duas linhas de lugar também mude o bloco
+    pesos = np.arange(1, len(hashes) + 1, dtype=np.uint64)
+    inicios = np.arange(0, len(hashes), tamanho)
+    with np.errstate(over="ignore"):
+        blocos = np.add.reduceat(hashes * pesos, inicios)
+    return [str(cabecalho)] + [str(int(b)) for b in blocos]
+
+
+def versao_impressoes(impressoes):
+    """Identificador curto da versão da aba, derivado da impressão digital."""
+    return hashlib.sha1("|".join(impressoes).encode("utf-8")).hexdigest()[:16]
+
+
+def versao_df(data):
+    """
+    Versão do DataFrame: muda sempre que o conteúdo da aba muda. Usada como chave
+    dos caches derivados (índices de filtro, listas de opções etc.).
+    """
+    versao = data.attrs.get("versao")
+    if versao is None:
+        versao = str(int(pd.util.hash_pandas_object(data).sum()))
+    return versao
+
+
+def blocos_alterados(anteriores, atuais, tamanho=TAMANHO_BLOCO):
+    """
+    Compara duas impressões digitais e devolve a lista de faixas de linhas alteradas
+    [(inicio, fim), ...]. Se o cabeçalho mudou, a aba inteira conta como alterada.
+    Sem impressão anterior, devolve None (não há como comparar).
+    """
+    if not anteriores:
+        return None
+    if anteriores[0] != atuais[0]:
+        return [(0, (len(atuais) - 1) * tamanho)]
+
+    faixas = []
+    total = max(len(anteriores), len(atuais)) - 1
+    for i in range(total):
+        antes = anteriores[i + 1] if i + 1 < len(anteriores) else None
+        depois = atuais[i + 1] if i + 1 < len(atuais) else None
+        if antes != depois:
+            faixas.append((i * tamanho, (i + 1) * tamanho))
+    return faixas
+
+
+def _abrir_planilha(conn, planilha):
+    with _trava_planilhas:
+        if planilha not in _planilhas_abertas:
+            _planilhas_abertas[planilha] = conn.client._open_spreadsheet(spreadsheet=planilha)
+        return _planilhas_abertas[planilha]
+
+
+def suporta_verificacao(conn):
+    """A data de modificação só está disponível com a conta de serviço (gspread)."""
+    return hasattr(conn.client, "_open_spreadsheet")
+
+
+def modificado_em(conn, planilha):
+    """
+    Data da última modificação da planilha, lida dos metadados do Drive (uma
+    requisição leve, sem baixar as células). Devolve None quando não suportado.
+    """
+    if not suporta_verificacao(conn):
+        return None
+    try:
+        arquivo = _abrir_planilha(conn, planilha)
+        if hasattr(arquivo, "get_lastUpdateTime"):
+            return arquivo.get_lastUpdateTime()
+        arquivo.update_drive_metadata()
+        return arquivo._properties.get("modifiedTime")
+    except Exception:
+        # Sem a data de modificação a sincronização apenas cai para a leitura completa
+        logger.warning("Não foi possível consultar a data de modificação da planilha", exc_info=True)
+        return None
+
+
+# --- LEITURA EM LOTE ---
+_COLUNA_SEM_NOME = re.compile(r"^Unnamed: \d+$")
+
+
+def _valores_para_df(valores):
+    """Monta o DataFrame a partir das células, como o get_as_dataframe da conexão faz."""
+    if not valores:
+        return pd.DataFrame()
+    largura = max(len(linha) for linha in valores)
+    retangular = [linha + [""] * (largura - len(linha)) for linha in valores]
+    data = TextParser(retangular).read()
+    # Mesma limpeza da leitura normal: linhas vazias e colunas vazias sem nome saem
+    data = data.dropna(how="all", axis=0)
+    vazias = [c for c in data.columns if _COLUNA_SEM_NOME.match(str(c)) and data[c].isna().all()]
+    return data.drop(columns=vazias)
+
+
+def ler_abas(conn, planilha, abas):
+    """
+    Lê várias abas da mesma planilha e devolve {aba: DataFrame}.
+
+    Com a conta de serviço é uma única requisição (values.batchGet). Na planilha
+    pública não existe leitura em lote, então as abas são lidas em paralelo
+    pela mesma conexão: o tempo total fica perto de uma leitura só.
+    """
+    abas = list(dict.fromkeys(abas))
+    if not abas:
+        return {}
+
+    if suporta_verificacao(conn):
+        arquivo = _abrir_planilha(conn, planilha)
+        intervalos = ["'" + str(aba).replace("'", "''") + "'" for aba in abas]
+        resposta = arquivo.values_batch_get(
+            intervalos,
+            params={"valueRenderOption": "UNFORMATTED_VALUE", "dateTimeRenderOption": "FORMATTED_STRING"},
+        )
+        return {
+            aba: _valores_para_df(intervalo.get("values", []))
+            for aba, intervalo in zip(abas, resposta.get("valueRanges", []))
+        }
+
+    with ThreadPoolExecutor(max_workers=len(abas)) as executor:
+        leituras = {aba: executor.submit(conn.read, spreadsheet=planilha, worksheet=aba, ttl=0) for aba in abas}
+        return {aba: leitura.result() for aba, leitura in leituras.items()}
@@ -0,0 +1,110 @@
+# Arquivo: sipat_http.py
+# Acesso HTTP à API do SIPAT compartilhado pelos scripts de extração: uma sessão
+# com conexões keep-alive reaproveitadas (pool do tamanho da concorrência) e um
+# limite de taxa por balde de fichas, que substitui as pausas fixas entre pedidos
+# sem deixar de respeitar o servidor do Estado. Falhas passageiras (conexão, 429,
+# 5xx) são repetidas com espera exponencial e jitter.
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+URL_API = "https://sgpapi.hml.sistemas.cotic.rn.gov.br"
+
+HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Origin": "https://www.sipat.rn.gov.br",
+    "Referer": "https://www.sipat.rn.gov.br/",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+
+def criar_sessao(max_conexoes):
+    """Sessão com até 'max_conexoes' conexões keep-alive por host, reaproveitadas entre os pedidos."""
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexoes)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    sessao.headers.update(HEADERS)
+    return sessao
+
+
+class LimiteTaxa:
+    """
+    Balde de fichas: no máximo 'por_segundo' pedidos por segundo em média, com
+    rajadas de até 'rajada' pedidos. Seguro para várias threads.
+    """
+
+    def __init__(self, por_segundo, rajada=1):
+        self.por_segundo = por_segundo
+        self.rajada = rajada
+        self._fichas = float(rajada)
+        self._ultimo = time.monotonic()
+        self._trava = threading.Lock()
+
+    def aguardar(self):
+        """Bloqueia até haver uma ficha disponível e a consome."""
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                self._fichas = min(self.rajada, self._fichas + (agora - self._ultimo) * self.por_segundo)
+                self._ultimo = agora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.por_segundo
+            time.sleep(espera)
+
+
+# --- RETENTATIVAS ---
+# Respostas que valem nova tentativa: excesso de pedidos e erros do servidor
+STATUS_PASSAGEIROS = {429, 500, 502, 503, 504}
+TENTATIVAS = 5
+ESPERA_BASE = 1.0  # segundos; dobra a cada tentativa
+ESPERA_MAXIMA = 30.0
+
+
+def _espera(tentativa, response=None):
+    # Retry-After do servidor (em segundos) tem prioridade; senão, exponencial com jitter total
+    if response is not None:
+        try:
+            return min(float(response.headers.get("Retry-After")), ESPERA_MAXIMA)
+        except (TypeError, ValueError):
+            pass
+    return random.uniform(0, min(ESPERA_MAXIMA, ESPERA_BASE * 2 ** tentativa))
+
+
+def pedir_com_retentativas(sessao, metodo, url, limite=None, tentativas=TENTATIVAS, **kwargs):
+    """
+    sessao.request(metodo, url, **kwargs) repetido em falhas de conexão e nos
+    STATUS_PASSAGEIROS, com até 'tentativas' pedidos. Cada pedido consome uma ficha
+    do 'limite' (LimiteTaxa), se houver. Devolve a última resposta; se a última
+    tentativa falhou na conexão, a exceção é propagada.
+    """
+    for tentativa in range(tentativas):
+        if limite is not None:
+            limite.aguardar()
+        try:
+            response = sessao.request(metodo, url, **kwargs)
+        except requests.exceptions.RequestException:
+            if tentativa == tentativas - 1:
+                raise
+            time.sleep(_espera(tentativa))
+            continue
+        if response.status_code not in STATUS_PASSAGEIROS or tentativa == tentativas - 1:
+            return response
+        time.sleep(_espera(tentativa, response))
+
+
+def extrair_lista(dados_json):
+    """
+    Lista de registros da resposta: a API costuma devolver a lista direto ou dentro
+    de um dicionário (ex.: {"itens": [...]}); nesse caso vale a primeira lista.
+    """
+    if isinstance(dados_json, list):
+        return dados_json
+    if isinstance(dados_json, dict):
+        return next((v for v in dados_json.values() if isinstance(v, list)), [])
+    return []
@@ -0,0 +1,193 @@
+# Arquivo: snapshot.py
+# Cópia local (Parquet) da última leitura bem-sucedida de cada aba das planilhas.
+# Permite servir os dados na hora após um restart/deploy e continuar servindo a
+# última versão boa quando a API do Google Sheets estiver lenta ou fora do ar.
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+PASTA_SNAPSHOTS = os.environ.get("SCMCE_SNAPSHOTS", ".snapshots")
+
+# Colunas de objetos (textos, números e vazios misturados, comum nas abas lidas pela
+# conta de serviço) são gravadas em partes, uma por tipo de valor, e remontadas na
+# leitura com os mesmos valores e tipos: 5 continua int, True continua bool e None
+# continua None (diferente de NaN)
+_PARTES = {"num": float, "int": int, "bool": bool}
+_TIPOS_ARROW = {"num": pa.float64(), "int": pa.int64(), "bool": pa.bool_()}
+_CHAVE_META = b"scmce"
+
+
+def _tipo_da_parte(valor):
+    # bool antes de int (bool é subclasse de int); inteiros do numpy contam como int
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        return "str"
+    if isinstance(valor, (bool, np.bool_)):
+        return "bool"
+    if isinstance(valor, (int, np.integer)):
+        return "int"
+    if isinstance(valor, (float, np.floating)):
+        return "num"
+    return "texto"
+
+
+_TIPOS_DAS_PARTES = np.frompyfunc(_tipo_da_parte, 1, 1)
+
+
+def _dividir_objetos(serie):
+    """
+    Divide uma coluna de objetos em {"texto": array Arrow, parte: array Arrow}. Nulos
+    (None) ficam nulos em todas as partes; NaN é um valor da parte "num".
+    """
+    valores = serie.to_numpy(dtype=object)
+    tipos = _TIPOS_DAS_PARTES(valores)
+    textos = np.where(tipos == "str", valores, None)
+    outros = tipos == "texto"
+    if outros.any():
+        # Tipos raros (datas, Decimal...) são gravados como texto
+        textos[outros] = [str(v) for v in valores[outros]]
+    partes = {"texto": pa.array(textos, type=pa.string())}
+    for parte, tipo_python in _PARTES.items():
+        mascara = tipos == parte
+        if mascara.any():
+            vazio = tipo_python()
+            preenchido = np.where(mascara, valores, vazio).astype(_TIPOS_ARROW[parte].to_pandas_dtype())
+            partes[parte] = pa.array(preenchido, mask=~mascara, type=_TIPOS_ARROW[parte])
+    return partes
+
+
+def _juntar_objetos(tabela, nome, partes):
+    """Remonta a coluna de objetos 'nome' a partir da parte de texto e das 'partes' auxiliares."""
+    texto = tabela.column(nome)
+    valores = np.array(texto.to_pylist(), dtype=object)
+    for parte in partes:
+        coluna = tabela.column(f"{nome}::{parte}")
+        preenchido = pc.is_valid(coluna).to_numpy(zero_copy_only=False)
+        numeros = coluna.to_numpy()
+        valores[preenchido] = [_PARTES[parte](v) for v in numeros[preenchido]]
+    return valores
+
+
+def caminho_snapshot(planilha, aba):
+    """Arquivo do snapshot, identificado pela planilha e pela aba."""
+    chave = hashlib.sha1(f"{planilha}|{aba}".encode("utf-8")).hexdigest()[:20]
+    return os.path.join(PASTA_SNAPSHOTS, f"{chave}.parquet")
+
+
+def _codificar(data, versao=None, alteracao=None):
+    """
+    Prepara o DataFrame para o Parquet, separando as colunas de tipos misturados.
+    A 'versao' da aba e a 'alteracao' desde a versão anterior vão nos metadados do
+    próprio Parquet, junto com os dados.
+    """
+    colunas = {}
+    objetos = {}
+    for col in data.columns:
+        serie = data[col]
+        nome = str(col)
+        if serie.dtype == object:
+            objetos[nome] = _dividir_objetos(serie)
+            # Lugar reservado; a parte de texto entra nele depois
+            serie = pd.Series(None, index=data.index, dtype=object)
+        colunas[nome] = serie
+    tabela = pa.Table.from_pandas(pd.DataFrame(colunas, index=data.index), preserve_index=False)
+    for nome, partes in objetos.items():
+        tabela = tabela.set_column(tabela.schema.get_field_index(nome), nome, partes.pop("texto"))
+        for parte, array in partes.items():
+            tabela = tabela.append_column(f"{nome}::{parte}", array)
+        objetos[nome] = list(partes)
+    meta = dict(tabela.schema.metadata or {})
+    meta[_CHAVE_META] = json.dumps({"objetos": objetos, "versao": versao, "alteracao": alteracao}).encode("utf-8")
+    return tabela.replace_schema_metadata(meta)
+
+
+def _decodificar(tabela):
+    meta = json.loads((tabela.schema.metadata or {}).get(_CHAVE_META, b"{}"))
+    objetos = meta.get("objetos", {})
+    auxiliares = [f"{nome}::{parte}" for nome, partes in objetos.items() for parte in partes]
+    data = tabela.drop_columns(auxiliares).to_pandas()
+    for nome, partes in objetos.items():
+        data[nome] = pd.Series(_juntar_objetos(tabela, nome, partes), index=data.index, dtype=object)
+    for chave in ("versao", "alteracao"):
+        if meta.get(chave) is not None:
+            data.attrs[chave] = meta[chave]
+    return data
+
+
+def _gravar_atomico(destino, escrever):
+    temporario = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+    escrever(temporario)
+    os.replace(temporario, destino)
+
+
+def gravar_snapshot(planilha, aba, data, metadados=None, versao=None, alteracao=None):
+    """
+    Grava a leitura da aba no disco (escrita atômica: nunca deixa arquivo pela metade).
+    'versao' é gravada no próprio Parquet, na mesma escrita dos dados: ler_snapshot
+    a devolve em attrs["versao"] sem risco de misturar dados e versão de gravações
+    diferentes. O mesmo vale para 'alteracao' ({"versao_anterior", "faixas"}: linhas
+    alteradas desde a versão anterior), devolvida em attrs["alteracao"] para o
+    preparo incremental. 'metadados' (dict) fica num .json ao lado, usado pela
+    sincronização incremental.
+    """
+    os.makedirs(PASTA_SNAPSHOTS, exist_ok=True)
+    destino = caminho_snapshot(planilha, aba)
+    _gravar_atomico(destino, lambda tmp: pq.write_table(_codificar(data, versao, alteracao), tmp))
+    # Metadados depois dos dados: nunca descrevem uma versão que ainda não foi gravada
+    if metadados is not None:
+        gravar_metadados(planilha, aba, metadados)
+
+
+def _caminho_metadados(planilha, aba):
+    return caminho_snapshot(planilha, aba).replace(".parquet", ".json")
+
+
+def gravar_metadados(planilha, aba, metadados):
+    os.makedirs(PASTA_SNAPSHOTS, exist_ok=True)
+
+    def escrever(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(metadados, f)
+
+    _gravar_atomico(_caminho_metadados(planilha, aba), escrever)
+
+
+def ler_metadados(planilha, aba):
+    """Metadados gravados junto com o snapshot ({} quando não existem)."""
+    try:
+        with open(_caminho_metadados(planilha, aba), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def renovar_snapshot(planilha, aba):
+    """Marca o snapshot como conferido agora (a planilha não mudou desde a gravação)."""
+    os.utime(caminho_snapshot(planilha, aba))
+
+
+def existe_snapshot(planilha, aba):
+    return os.path.exists(caminho_snapshot(planilha, aba))
+
+
+def ler_snapshot(planilha, aba):
+    """
+    Lê o snapshot da aba, se existir.
+    Retorna (DataFrame, idade_em_segundos) ou None quando não há cópia local válida.
+    O DataFrame traz attrs["versao"] (e attrs["alteracao"]) quando gravados com os dados.
+    """
+    caminho = caminho_snapshot(planilha, aba)
+    try:
+        idade = time.time() - os.path.getmtime(caminho)
+        return _decodificar(pq.read_table(caminho)), idade
+    except (OSError, pa.ArrowException, ValueError):
+        return None
@@ -1,5 +1,9 @@
 import streamlit as st
-from utils import carregar_df, my_metric
+from utils import carregar_preparado, my_metric
+from filtros import Selecao, opcoes_filtro
+from busca import buscar, normalizar
+from estilos import VERDE_CLARO, destacar_linhas
+from tabela import tabela_paginada
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(page_title="Solicitações MP/PGE", layout="wide")
@@ -8,17 +12,11 @@ st.set_page_config(page_title="Solicitações MP/PGE", layout="wide")
 planilha = st.secrets["planilha"]
 aba = st.secrets["aba_acessibilidade"]
 
-data = carregar_df(planilha, aba)
+# Colunas de texto sem espaços extras e tipos compactos: preparo.preparar_acessibilidade
+data = carregar_preparado(planilha, aba, "acessibilidade")
 
-# --- TRATAMENTO DE DADOS (LIMPEZA) ---
-# Garante que colunas de texto não tenham espaços extras
-cols_texto = ["ESCOLA", "CIDADE", "SITUAÇÃO", "CRITICIDADE POR TEMPO DE PROCESSO"]
-for col in cols_texto:
-    if col in data.columns:
-        data[col] = data[col].astype(str).str.strip()
-
-# Cria cópia para filtrar
-df_filtrado = data.copy()
+# Sem cópia: cada filtro abaixo já gera um DataFrame novo só com as linhas que passam
+df_filtrado = data
 
 st.title("⚖️ Solicitações MP, PGE e PJe - Acessibilidade")
 
@@ -32,7 +30,7 @@ st.sidebar.markdown("---")
 
 # 2. Filtro de Cidade (Selectbox)
 if "CIDADE" in data.columns:
-    cidades = sorted(data['CIDADE'].dropna().unique().tolist())
+    cidades = opcoes_filtro(data, "CIDADE", dropna=True)
     # Remove vazios
     cidades = [x for x in cidades if x != '' and x.lower() != 'nan']
     sel_cidade = st.sidebar.selectbox("Cidade:", options=["Todas"] + cidades)
@@ -41,7 +39,7 @@ else:
 
 # 3. Filtro de Criticidade (Multiselect)
 if "CRITICIDADE POR TEMPO DE PROCESSO" in data.columns:
-    opcoes_crit = sorted(data["CRITICIDADE POR TEMPO DE PROCESSO"].dropna().unique().tolist())
+    opcoes_crit = opcoes_filtro(data, "CRITICIDADE POR TEMPO DE PROCESSO", dropna=True)
     opcoes_crit = [x for x in opcoes_crit if x != '' and x.lower() != 'nan']
     sel_crit = st.sidebar.multiselect("Criticidade:", options=opcoes_crit, placeholder="Todas")
 else:
@@ -49,15 +47,17 @@ else:
 
 # 4. Filtro de Situação (Opcional, mas útil já que pintamos os 'PRONTO')
 if "SITUAÇÃO" in data.columns:
-    opcoes_situacao = sorted(data["SITUAÇÃO"].unique().tolist())
+    opcoes_situacao = opcoes_filtro(data, "SITUAÇÃO")
     opcoes_situacao = [x for x in opcoes_situacao if x != '' and x.lower() != 'nan']
     sel_situacao = st.sidebar.multiselect("Situação:", options=opcoes_situacao, placeholder="Todas")
 else:
     sel_situacao = []
 
 # --- APLICAÇÃO DOS FILTROS ---
-if busca_escola:
-    df_filtrado = df_filtrado[df_filtrado["ESCOLA"].str.contains(busca_escola, case=False, na=False)]
+termo = normalizar(busca_escola)
+if termo:
+    # Índice sem acentos (busca.py): linhas das escolas mais parecidas primeiro
+    df_filtrado = Selecao(data).na_ordem(buscar(data, "ESCOLA", termo)).linhas()
 
 if sel_cidade != "Todas":
     df_filtrado = df_filtrado[df_filtrado["CIDADE"] == sel_cidade]
@@ -107,24 +107,9 @@ st.write("")
 st.subheader("Detalhamento dos Processos")
 
 with st.expander("Visualizar Tabela Completa", expanded=True):
-    # Colunas principais para exibir (ajuste conforme o nome real na planilha se precisar)
-    # Se quiser mostrar tudo, basta usar df_filtrado diretamente
-    
-    df_display = df_filtrado.copy()
-
-    # Função de Estilo
-    def pintar_linha(linha):
-        val = str(linha.get('SITUAÇÃO', '')).strip().upper()
-        if val == 'PRONTO':
-            return ['background-color: lightgreen; color: black'] * len(linha)
-        else:
-            return [''] * len(linha)
-
-    # Aplica o estilo e exibe
-    st.dataframe(
-        df_display.style.apply(pintar_linha, axis=1), 
-        hide_index=True, 
-        use_container_width=True
-    )
-    
-    st.caption(f"Total de registros exibidos: {len(df_display)}")
\ No newline at end of file
+    # Todas as colunas, em páginas; processos prontos em verde ('PRONTO' sem diferenciar
+    # maiúsculas, ver estilos.py)
+    tabela_paginada(
+        df_filtrado, chave="acessibilidade",
+        preparar=lambda df_display: destacar_linhas(df_display, [("SITUAÇÃO", "PRONTO", VERDE_CLARO)], ignorar_caixa=True),
+    )
\ No newline at end of file
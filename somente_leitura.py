@@ -0,0 +1,83 @@
+# Arquivo: somente_leitura.py
+# DataFrames compartilhados entre as sessões (cache_resource) protegidos contra
+# alteração. Todas as sessões leem o mesmo objeto, sem cópia nem pickle a cada
+# rerun; por isso uma página que altere uma coluna estragaria os dados de todo
+# mundo. O FrameSomenteLeitura recusa qualquer escrita com um erro claro, e as
+# operações que geram tabelas novas (filtros, copy, merge...) devolvem DataFrames
+# comuns, livres para alterar.
+import functools
+import inspect
+
+import pandas as pd
+from pandas.core.indexing import _iLocIndexer, _LocIndexer
+
+
+class FrameCompartilhadoError(TypeError):
+    """Tentativa de alterar um DataFrame compartilhado entre as sessões."""
+
+
+def _recusar(*args, **kwargs):
+    raise FrameCompartilhadoError(
+        "DataFrame compartilhado entre as sessões é somente leitura. "
+        "Use .copy(deep=False) (ou utils.carregar_df) para ter uma cópia alterável."
+    )
+
+
+class _LocSomenteLeitura(_LocIndexer):
+    __setitem__ = _recusar
+
+
+class _ILocSomenteLeitura(_iLocIndexer):
+    __setitem__ = _recusar
+
+
+class FrameSomenteLeitura(pd.DataFrame):
+    """DataFrame que recusa escrita: atribuição de colunas, loc/iloc/at, inplace=True..."""
+
+    @property
+    def _constructor(self):
+        # Resultados de operações (filtros, cópias, merges) são DataFrames comuns
+        return pd.DataFrame
+
+    @property
+    def loc(self):
+        return _LocSomenteLeitura("loc", self)
+
+    @property
+    def iloc(self):
+        return _ILocSomenteLeitura("iloc", self)
+
+    __setitem__ = _recusar
+    __delitem__ = _recusar
+    insert = _recusar
+    isetitem = _recusar
+    update = _recusar
+    _set_value = _recusar  # at / iat
+    _set_axis = _recusar  # df.columns = ..., df.index = ...
+    _update_inplace = _recusar  # reserva: métodos com inplace=True não listados abaixo
+
+
+def _sem_inplace(metodo):
+    # Recusa antes de chamar o método: fillna, replace, clip, where... com inplace=True
+    # alteram os blocos compartilhados antes de chegar ao _update_inplace
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        if kwargs.get("inplace"):
+            _recusar()
+        return metodo(self, *args, **kwargs)
+    return envolvido
+
+
+# Todo método público do DataFrame que aceita inplace (na versão instalada do pandas)
+for _nome, _metodo in inspect.getmembers(pd.DataFrame, inspect.isfunction):
+    if not _nome.startswith("_") and "inplace" in inspect.signature(_metodo).parameters:
+        setattr(FrameSomenteLeitura, _nome, _sem_inplace(_metodo))
+
+
+def somente_leitura(data):
+    """Envolve 'data' (sem copiar os dados) num FrameSomenteLeitura com os mesmos attrs."""
+    if isinstance(data, FrameSomenteLeitura):
+        return data
+    protegido = FrameSomenteLeitura(data)
+    protegido.attrs.update(data.attrs)
+    return protegido
@@ -0,0 +1,68 @@
+# Arquivo: tabela.py
+# Tabela paginada no servidor: ordenação, tamanho e número da página são
+# controles do Streamlit, e só as linhas da página atual são copiadas e enviadas
+# ao navegador. O tempo de exibição não cresce com o tamanho da planilha.
+# A tabela é um fragmento: trocar de página ou de ordenação roda só ela, não a
+# página inteira (filtros, KPIs e gráficos ficam como estão).
+import math
+
+import streamlit as st
+from filtros import Selecao
+from medicao import cronometro
+
+TAMANHOS_PAGINA = [50, 100, 250, 500]
+SEM_ORDENACAO = "(ordem atual)"
+
+
+def chaves_controles(chave):
+    """Chaves no session_state dos controles da tabela 'chave' (ordem, sentido, tamanho, página)."""
+    return [f"{chave}_ordem", f"{chave}_decrescente", f"{chave}_tamanho", f"{chave}_pagina"]
+
+
+@st.fragment
+def tabela_paginada(dados, colunas=None, chave="tabela", preparar=None):
+    """
+    Mostra 'dados' (Selecao ou DataFrame) em páginas.
+
+    'colunas' limita as colunas exibidas; 'chave' separa o estado dos controles
+    quando há mais de uma tabela na página; 'preparar(pagina)' recebe o DataFrame
+    da página (só as linhas visíveis) e devolve o que vai para o st.dataframe
+    (DataFrame ou Styler), para formatação e destaques.
+    """
+    with cronometro(f"Tabela ({chave})"):
+        _exibir(dados, colunas, chave, preparar)
+
+
+def _exibir(dados, colunas, chave, preparar):
+    selecao = dados if isinstance(dados, Selecao) else Selecao(dados)
+    colunas = list(selecao.columns) if colunas is None else colunas
+    total = len(selecao)
+
+    col_ordem, col_sentido, col_tamanho, col_pagina = st.columns([2, 1, 1, 1])
+    with col_ordem:
+        ordenar_por = st.selectbox("Ordenar por:", [SEM_ORDENACAO] + colunas, key=f"{chave}_ordem")
+    with col_sentido:
+        decrescente = st.toggle("Decrescente", key=f"{chave}_decrescente")
+    with col_tamanho:
+        tamanho = st.selectbox("Linhas por página:", TAMANHOS_PAGINA, key=f"{chave}_tamanho")
+
+    paginas = max(math.ceil(total / tamanho), 1)
+    # Filtros novos podem reduzir o total: a página guardada volta para o intervalo válido
+    chave_pagina = f"{chave}_pagina"
+    if st.session_state.get(chave_pagina, 1) > paginas:
+        st.session_state[chave_pagina] = paginas
+    with col_pagina:
+        pagina = st.number_input(f"Página (de {paginas}):", min_value=1, max_value=paginas, step=1, key=chave_pagina)
+
+    if ordenar_por != SEM_ORDENACAO:
+        selecao = selecao.ordenar(ordenar_por, ascending=not decrescente)
+
+    inicio = (pagina - 1) * tamanho
+    fim = min(inicio + tamanho, total)
+    df_pagina = selecao.linhas(colunas, inicio, fim)
+
+    st.dataframe(preparar(df_pagina) if preparar else df_pagina, hide_index=True, use_container_width=True)
+    if total:
+        st.caption(f"Registros {inicio + 1}–{fim} de {total}")
+    else:
+        st.caption("Nenhum registro encontrado.")
@@ -0,0 +1,6 @@
+# Arquivo: tests/conftest.py
+# Os módulos do app ficam na raiz do projeto (estrutura plana do Streamlit).
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
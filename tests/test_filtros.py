@@ -0,0 +1,36 @@
+# Arquivo: tests/test_filtros.py
+import numpy as np
+import pandas as pd
+
+from filtros import opcoes_filtro
+from preparo import ESQUEMAS_TIPOS, PREPAROS
+from tipos import otimizar_tipos
+from test_preparo import aba_obras
+
+
+def _obras_com_ano_vazio():
+    # Célula de ANO vazia chega como NaN (leitura numérica da planilha)
+    bruto = aba_obras(50)
+    bruto["ANO"] = pd.to_numeric(bruto["ANO"])
+    bruto.loc[[4, 9], "ANO"] = np.nan
+    return otimizar_tipos(PREPAROS["obras"](bruto), ESQUEMAS_TIPOS["obras"])
+
+
+def test_ano_vazio_vira_inteiro_anulavel():
+    data = _obras_com_ano_vazio()
+    assert isinstance(data["ANO"].dtype, pd.Int16Dtype)
+    assert data["ANO"].isna().sum() == 2
+
+
+def test_opcoes_sem_vazios():
+    data = _obras_com_ano_vazio()
+    anos = opcoes_filtro(data, "ANO", dropna=True)
+    assert anos == sorted(data["ANO"].dropna().unique().tolist())
+    assert opcoes_filtro(data, "ANO", dropna=True, tipo="int", reverse=True) == anos[::-1]
+
+
+def test_opcoes_com_vazio_no_fim():
+    data = _obras_com_ano_vazio()
+    anos = opcoes_filtro(data, "ANO")
+    assert anos[:-1] == opcoes_filtro(data, "ANO", dropna=True)
+    assert pd.isna(anos[-1])
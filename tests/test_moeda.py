@@ -0,0 +1,46 @@
+# Arquivo: tests/test_moeda.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from moeda import converter_moeda
+
+
+def limpar_moeda(valor):
+    # Versão original (Series.apply), referência do comportamento esperado
+    if isinstance(valor, str):
+        limpo = valor.replace('R$', '').replace(' ', '').replace('.', '').replace(',', '.')
+        try:
+            return float(limpo)
+        except ValueError:
+            return 0.0
+    return valor if isinstance(valor, (int, float)) else 0.0
+
+
+CASOS = [
+    "R$ 1.234,56", "1.234,56", "R$ -1,5e3", "R$ 1.234,56\n", "\t1.234,56 ", "R$\xa01.234,56",
+    "1\xa0234,56", "nan", "NaN", "-inf", "Infinity", "A DEFINIR", "1,2,3", "", "  ", 12, 3.5, np.nan,
+]
+
+
+@pytest.mark.parametrize("tipo", [object, "str"])
+def test_igual_ao_limpar_moeda(tipo):
+    valores = CASOS if tipo is object else [v for v in CASOS if isinstance(v, str)]
+    serie = pd.Series(valores, dtype=tipo)
+    esperado = serie.apply(limpar_moeda).astype("float64")
+    convertido, _ = converter_moeda(serie, invalido=0.0)
+    pd.testing.assert_series_equal(convertido, esperado)
+
+
+def test_espacos_nas_pontas_e_nan():
+    convertido, invalidos = converter_moeda(pd.Series(["R$ 1.234,56\n", "nan", "R$ x"], dtype=object), invalido=0.0)
+    assert convertido[0] == 1234.56
+    assert np.isnan(convertido[1])
+    assert convertido[2] == 0.0
+    assert invalidos == 1
+
+
+def test_vazios_continuam_vazios_e_nao_contam():
+    convertido, invalidos = converter_moeda(pd.Series([None, np.nan, "", "R$ 2,00"], dtype=object), invalido=0.0)
+    assert convertido.isna().tolist() == [True, True, False, False]
+    assert invalidos == 0
@@ -0,0 +1,65 @@
+# Arquivo: tests/test_preparo.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from preparo import ESQUEMAS_TIPOS, PREPAROS, repreparar
+from sincronizacao import blocos_alterados, impressoes_blocos
+from tipos import otimizar_tipos
+
+
+def _reais(valores):
+    return [f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") for v in valores]
+
+
+def aba_obras(n, seed=0):
+    rng = np.random.default_rng(seed)
+    valores = _reais(rng.random(n) * 1e6)
+    valores[3] = "A DEFINIR"
+    return pd.DataFrame({
+        "PROGRAMA": rng.choice(["REFORMA", "AMPLIAÇÃO", "MANUTENÇÃO - PAGUE PREDIAL"], n),
+        "MUNICÍPIO": [f" MUNICÍPIO {i % 40} " for i in range(n)],
+        "DIREC": rng.integers(1, 17, n).astype(str),
+        "ANO": rng.integers(2019, 2027, n).astype(str),
+        "STATUS": rng.choice(["EM EXECUÇÃO", "CONCLUÍDO", "CANCELADO", "PARALISADA"], n),
+        "VALOR": valores,
+        "VALOR FATURADO": _reais(rng.random(n) * 1e6),
+        "SALDO CONTRATUAL": _reais(rng.random(n) * 1e5),
+    })
+
+
+def _preparado(preparo, bruto):
+    return otimizar_tipos(PREPAROS[preparo](bruto), ESQUEMAS_TIPOS.get(preparo))
+
+
+def _alterar(bruto):
+    novo = bruto.copy()
+    novo.loc[10, "VALOR"] = "valor inválido"
+    novo.loc[11, "MUNICÍPIO"] = "MUNICÍPIO NOVO"
+    novo.loc[1700, "STATUS"] = "CONCLUÍDO"
+    novo.loc[1701, "ANO"] = None
+    # Linhas acrescentadas no fim, com valores que ainda não existiam
+    extra = bruto.iloc[:30].copy()
+    extra["DIREC"] = "99"
+    return pd.concat([novo, extra], ignore_index=True)
+
+
+@pytest.mark.parametrize("preparo", ["obras", "obras_analise", "empenhos", "ano_inteiro"])
+@pytest.mark.parametrize("mudanca", ["alteracao", "remocao_no_fim"])
+def test_repreparar_igual_ao_preparo_completo(preparo, mudanca):
+    anterior = aba_obras(2000)
+    atual = _alterar(anterior) if mudanca == "alteracao" else anterior.iloc[:1234].copy()
+    faixas = blocos_alterados(impressoes_blocos(anterior), impressoes_blocos(atual))
+    assert faixas and len(faixas) < 4
+
+    completo = _preparado(preparo, atual)
+    parcial = repreparar(preparo, anterior, _preparado(preparo, anterior), atual, faixas)
+    parcial = otimizar_tipos(parcial, ESQUEMAS_TIPOS.get(preparo))
+
+    pd.testing.assert_frame_equal(parcial, completo)
+    assert parcial.attrs.get("valores_invalidos", {}) == completo.attrs.get("valores_invalidos", {})
+
+
+def test_repreparar_recusa_preparo_com_datas():
+    anterior = aba_obras(10)
+    assert repreparar("medicoes", anterior, anterior, anterior, [(0, 500)]) is None
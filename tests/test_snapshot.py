@@ -0,0 +1,35 @@
+# Arquivo: tests/test_snapshot.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import snapshot
+
+
+@pytest.fixture(autouse=True)
+def pasta_temporaria(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "PASTA_SNAPSHOTS", str(tmp_path))
+
+
+def _tipos(serie):
+    return [type(v) for v in serie]
+
+
+def test_colunas_mistas_voltam_iguais():
+    data = pd.DataFrame({
+        "MISTA": pd.Series([5, 2.5, "R$ 1,00", True, None, np.nan, -3], dtype=object),
+        "TEXTO": pd.Series(["a", None, np.nan, "b", "c", "d", "e"], dtype=object),
+        "VAZIA": pd.Series([None] * 7, dtype=object),
+        "STR": pd.Series(["a", None, "b", "c", "d", "e", "f"], dtype="str"),
+        "VALOR": [1.0, np.nan, 2.0, 3.0, 4.0, 5.0, 6.0],
+        "ANO": range(2019, 2026),
+    })
+    snapshot.gravar_snapshot("planilha", "aba", data, versao="v1")
+    lido, _ = snapshot.ler_snapshot("planilha", "aba")
+
+    pd.testing.assert_frame_equal(lido, data)
+    for col in ["MISTA", "TEXTO", "VAZIA"]:
+        # assert_frame_equal considera None e NaN iguais; os tipos de cada valor também devem voltar
+        assert _tipos(lido[col]) == _tipos(data[col]), col
+    assert lido["MISTA"][0] == 5 and lido["MISTA"][3] is True
+    assert lido.attrs["versao"] == "v1"
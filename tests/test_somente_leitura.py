@@ -0,0 +1,58 @@
+# Arquivo: tests/test_somente_leitura.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from somente_leitura import FrameCompartilhadoError, somente_leitura
+
+
+def _base():
+    return pd.DataFrame({
+        "VALOR": [1.0, np.nan, 30.0, np.nan],
+        "DIAS": [5, 50, 500, 5000],
+    })
+
+
+ESCRITAS_INPLACE = {
+    "fillna": lambda df: df.fillna(0, inplace=True),
+    "replace": lambda df: df.replace(5, 0, inplace=True),
+    "clip": lambda df: df.clip(lower=0, upper=10, inplace=True),
+    "where": lambda df: df.where(df.notna(), 0, inplace=True),
+    "mask": lambda df: df.mask(df.isna(), 0, inplace=True),
+    "interpolate": lambda df: df.interpolate(inplace=True),
+    "ffill": lambda df: df.ffill(inplace=True),
+    "bfill": lambda df: df.bfill(inplace=True),
+    "dropna": lambda df: df.dropna(inplace=True),
+    "sort_values": lambda df: df.sort_values("DIAS", ascending=False, inplace=True),
+    "rename": lambda df: df.rename(columns={"VALOR": "X"}, inplace=True),
+    "reset_index": lambda df: df.reset_index(drop=True, inplace=True),
+}
+
+
+@pytest.mark.parametrize("nome", list(ESCRITAS_INPLACE))
+def test_inplace_recusado_sem_alterar(nome):
+    # Como no cache: só o frame protegido referencia os blocos (nada força cópia)
+    compartilhado = somente_leitura(_base())
+    with pytest.raises(FrameCompartilhadoError):
+        ESCRITAS_INPLACE[nome](compartilhado)
+    pd.testing.assert_frame_equal(pd.DataFrame(compartilhado), _base())
+
+
+def test_escritas_diretas_recusadas():
+    compartilhado = somente_leitura(_base())
+    for escrita in (
+        lambda df: df.__setitem__("VALOR", 0),
+        lambda df: df.loc.__setitem__((0, "VALOR"), 0),
+        lambda df: df.iloc.__setitem__((0, 0), 0),
+    ):
+        with pytest.raises(FrameCompartilhadoError):
+            escrita(compartilhado)
+    pd.testing.assert_frame_equal(pd.DataFrame(compartilhado), _base())
+
+
+def test_operacoes_devolvem_frames_comuns():
+    compartilhado = somente_leitura(_base())
+    preenchido = compartilhado.fillna(0)
+    preenchido["VALOR"] = 1.0
+    assert type(preenchido) is pd.DataFrame
+    pd.testing.assert_frame_equal(pd.DataFrame(compartilhado), _base())
@@ -0,0 +1,120 @@
+# Arquivo: tipos.py
+# Otimização dos tipos das tabelas compartilhadas: colunas de poucos valores viram
+# categóricas, números inteiros usam o menor tipo que comporta os valores (Int
+# anulável quando há vazios) e colunas tolerantes (coordenadas) ficam em float32.
+# Cada base registra a memória antes e depois, consultável na página inicial.
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# Só vira categórica a coluna em que os valores distintos são no máximo esta fração das linhas
+FRACAO_MAX_CATEGORIAS = 0.5
+
+# Tipos inteiros em ordem de tamanho: (sem vazios, com vazios)
+_INTEIROS = [(np.int8, "Int8"), (np.int16, "Int16"), (np.int32, "Int32"), (np.int64, "Int64")]
+
+
+def _categoria(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return None
+    if serie.nunique(dropna=False) > max(len(serie) * FRACAO_MAX_CATEGORIAS, 1):
+        return None
+    return serie.astype("category")
+
+
+def _inteiro(serie):
+    # Só converte se todo valor preenchido for um número inteiro; textos ficam como estão
+    numeros = pd.to_numeric(serie, errors="coerce")
+    vazios = numeros.isna()
+    if (vazios & serie.notna()).any():
+        return None
+    validos = numeros[~vazios].to_numpy(dtype=np.float64)
+    if not np.array_equal(validos, np.round(validos)):
+        return None
+    minimo, maximo = (validos.min(), validos.max()) if len(validos) else (0, 0)
+    for tipo, tipo_anulavel in _INTEIROS:
+        limites = np.iinfo(tipo)
+        if limites.min <= minimo and maximo <= limites.max:
+            return numeros.astype(tipo_anulavel if vazios.any() else tipo)
+    return None
+
+
+def _float32(serie):
+    numeros = pd.to_numeric(serie, errors="coerce")
+    return None if numeros.dtype == np.float32 else numeros.astype(np.float32)
+
+
+_CONVERSORES = {"categorias": _categoria, "inteiros": _inteiro, "float32": _float32}
+
+
+def otimizar_tipos(data, esquema, nome=None):
+    """
+    Converte as colunas de 'data' segundo o 'esquema' da aba:
+    {"categorias": [...], "inteiros": [...], "float32": [...]}. Cada conversão só
+    acontece quando é segura (sem perder valores); colunas ausentes são ignoradas.
+    Com 'nome', a memória antes/depois fica no relatório (ver relatorios_memoria).
+    """
+    if not esquema:
+        return data
+    antes = data.memory_usage(deep=True, index=False)
+    for papel, colunas in esquema.items():
+        converter = _CONVERSORES[papel]
+        for col in colunas:
+            if col not in data.columns:
+                continue
+            convertida = converter(data[col])
+            if convertida is not None:
+                data[col] = convertida
+    if nome is not None:
+        registrar_memoria(nome, antes, data.memory_usage(deep=True, index=False))
+    return data
+
+
+# --- RELATÓRIO DE MEMÓRIA ---
+class _Relatorios:
+    """Memória de cada base antes e depois da otimização (compartilhado entre as sessões)."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.por_base = {}
+
+    def registrar(self, nome, antes, depois):
+        alteradas = {
+            col: (int(antes[col]), int(depois[col]))
+            for col in depois.index if col in antes.index and antes[col] != depois[col]
+        }
+        with self._trava:
+            self.por_base[nome] = {
+                "mb_antes": antes.sum() / 1024 ** 2,
+                "mb_depois": depois.sum() / 1024 ** 2,
+                "colunas": alteradas,
+            }
+
+
+@st.cache_resource
+def _relatorios():
+    return _Relatorios()
+
+
+def registrar_memoria(nome, antes, depois):
+    """Guarda (e registra no log) a memória por coluna da base 'nome' antes e depois."""
+    _relatorios().registrar(nome, antes, depois)
+    logger.info("Base %s: %.1f MB -> %.1f MB", nome, antes.sum() / 1024 ** 2, depois.sum() / 1024 ** 2)
+
+
+def relatorios_memoria():
+    """{base: {"mb_antes", "mb_depois", "colunas": {coluna: (bytes antes, bytes depois)}}}."""
+    relatorios = _relatorios()
+    with relatorios._trava:
+        return {nome: dict(info) for nome, info in relatorios.por_base.items()}
+
+
+def contar_valores(serie):
+    """value_counts sem as categorias que não aparecem na seleção (contagem zero)."""
+    contagem = serie.value_counts()
+    return contagem[contagem > 0]
@@ -1,17 +1,284 @@
 # Arquivo: utils.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 from streamlit_gsheets import GSheetsConnection
+from preparo import ESQUEMAS_TIPOS, PREPAROS, repreparar
+from sincronizacao import blocos_alterados, impressoes_blocos, ler_abas, modificado_em, suporta_verificacao, versao_df, versao_impressoes
+from snapshot import existe_snapshot, gravar_metadados, gravar_snapshot, ler_metadados, ler_snapshot, renovar_snapshot
+from somente_leitura import somente_leitura
+from tipos import otimizar_tipos
 
 PASSWORD = st.secrets["pass"]
 
-@st.cache_data(ttl=600)
-def carregar_df(planilha, aba):
+# Idade máxima (em segundos) do snapshot local antes de buscar nova versão no Google Sheets
+TTL_PLANILHA = 600
+# Com a conta de serviço a conferência é só uma consulta de metadados, então pode ser mais frequente
+TTL_PLANILHA_INCREMENTAL = 120
+
+logger = logging.getLogger(__name__)
+
+# Abas com atualização em andamento (evita duas buscas simultâneas da mesma aba)
+_atualizando = set()
+_trava_atualizando = threading.Lock()
+
+
+def _ler_planilha(conn, planilha, aba):
+    # ttl=0: a conexão não mantém cache próprio, quem controla a validade são os snapshots
+    return conn.read(spreadsheet=planilha, worksheet=aba, ttl=0)
+
+
+class _LeiturasSemSnapshot:
+    """
+    Leituras diretas do Sheets cujo snapshot não pôde ser gravado (ex.: pasta sem
+    permissão de escrita). Valem por TTL_PLANILHA segundos, como o snapshot valeria,
+    para que os reruns não voltem a ler a aba inteira.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._por_aba = {}
+
+    def guardar(self, planilha, aba, data):
+        with self._trava:
+            self._por_aba[(planilha, aba)] = (data, time.monotonic())
+
+    def recente(self, planilha, aba):
+        """DataFrame lido há no máximo TTL_PLANILHA segundos, ou None."""
+        with self._trava:
+            data, momento = self._por_aba.get((planilha, aba), (None, 0.0))
+        if data is None or time.monotonic() - momento > TTL_PLANILHA:
+            return None
+        return data
+
+
+@st.cache_resource
+def _leituras_sem_snapshot():
+    return _LeiturasSemSnapshot()
+
+
+def _guardar_leitura(planilha, aba, data, modificado):
+    """
+    Registra uma leitura direta do Sheets: marca a versão em attrs["versao"] e grava
+    o snapshot; se a gravação falhar, a leitura fica em memória (_LeiturasSemSnapshot).
+    """
+    blocos = impressoes_blocos(data)
+    data.attrs["versao"] = versao_impressoes(blocos)
+    try:
+        gravar_snapshot(planilha, aba, data, {"modificado_em": modificado, "blocos": blocos},
+                        versao=data.attrs["versao"])
+    except Exception:
+        logger.exception("Não foi possível gravar o snapshot da aba %s; mantendo a leitura em memória", aba)
+        _leituras_sem_snapshot().guardar(planilha, aba, data)
+
+
+def _atualizar_snapshot(conn, planilha, aba):
+    try:
+        metadados = ler_metadados(planilha, aba)
+        # Lida antes das células: se a planilha mudar durante a leitura, a próxima conferência percebe
+        modificado = modificado_em(conn, planilha)
+        if modificado is not None and modificado == metadados.get("modificado_em"):
+            # Planilha intocada desde a última leitura: nenhuma célula é transferida
+            renovar_snapshot(planilha, aba)
+            return
+
+        data = _ler_planilha(conn, planilha, aba)
+        blocos = impressoes_blocos(data)
+        alterados = blocos_alterados(metadados.get("blocos"), blocos)
+        novos_metadados = {"modificado_em": modificado, "blocos": blocos}
+        if alterados == []:
+            # Mudou outra aba da mesma planilha: esta segue igual e a versão em cache é mantida
+            gravar_metadados(planilha, aba, novos_metadados)
+            renovar_snapshot(planilha, aba)
+            return
+
+        # Com as faixas alteradas, o preparo refaz só essas linhas (ver _preparar)
+        alteracao = None
+        if alterados is not None:
+            alteracao = {"versao_anterior": versao_impressoes(metadados["blocos"]), "faixas": alterados}
+        gravar_snapshot(planilha, aba, data, novos_metadados, versao=versao_impressoes(blocos), alteracao=alteracao)
+        logger.info(
+            "Aba %s atualizada (%s)", aba,
+            "leitura completa" if alterados is None else f"linhas alteradas: {alterados}"
+        )
+        # A próxima chamada de carregar_compartilhado já lê o snapshot novo
+        carregar_compartilhado.clear(planilha, aba)
+    except Exception:
+        # Mantém a última versão boa; nova tentativa na próxima expiração
+        logger.exception("Falha ao atualizar a aba %s; mantendo o snapshot anterior", aba)
+    finally:
+        with _trava_atualizando:
+            _atualizando.discard((planilha, aba))
+
+
+def atualizar_em_segundo_plano(planilha, aba):
+    """Dispara a busca da versão nova da aba numa thread, sem bloquear a página."""
+    with _trava_atualizando:
+        if (planilha, aba) in _atualizando:
+            return
+        _atualizando.add((planilha, aba))
+    conn = st.connection("gsheets", type=GSheetsConnection)
+    threading.Thread(target=_atualizar_snapshot, args=(conn, planilha, aba), daemon=True).start()
+
+
+@st.cache_resource(ttl=60, show_spinner=False)
+def carregar_compartilhado(planilha, aba):
+    """
+    Lê a aba da planilha (stale-while-revalidate).
+    Serve o snapshot local na hora; se ele tiver mais de TTL_PLANILHA segundos,
+    a versão nova é conferida em segundo plano (sincronização incremental, ver
+    sincronizacao.py). Sem snapshot, busca direto no Sheets.
+
+    O DataFrame é o mesmo objeto para todas as sessões e reruns (não é copiado a
+    cada chamada, como no cache_data) e é somente leitura: qualquer escrita levanta
+    somente_leitura.FrameCompartilhadoError. Páginas que alteram colunas usam carregar_df.
+    """
     conn = st.connection("gsheets", type=GSheetsConnection)
-    # Ajuste o worksheet conforme necessário se mudar
-    data = conn.read(spreadsheet=planilha, worksheet=aba)
+    snapshot = ler_snapshot(planilha, aba)
+    if snapshot is None:
+        # Sem snapshot: leitura recente em memória (ex.: a do lote de carregar_varios) ou o Sheets
+        data = _leituras_sem_snapshot().recente(planilha, aba)
+        if data is None:
+            modificado = modificado_em(conn, planilha)
+            data = _ler_planilha(conn, planilha, aba)
+            _guardar_leitura(planilha, aba, data, modificado)
+        return somente_leitura(data)
+
+    data, idade = snapshot
+    ttl = TTL_PLANILHA_INCREMENTAL if suporta_verificacao(conn) else TTL_PLANILHA
+    if idade > ttl:
+        atualizar_em_segundo_plano(planilha, aba)
+    # A versão vem do próprio Parquet (gravada junto com os dados); snapshots antigos,
+    # sem ela, têm a versão calculada do conteúdo lido
+    if "versao" not in data.attrs:
+        data.attrs["versao"] = versao_impressoes(impressoes_blocos(data))
+    return somente_leitura(data)
+
+
+def carregar_df(planilha, aba):
+    """
+    Aba para páginas que alteram colunas. A cópia é um DataFrame comum e rasa: com
+    o copy-on-write do pandas só as colunas reatribuídas são duplicadas.
+    """
+    return carregar_compartilhado(planilha, aba).copy(deep=False)
+
+
+def carregar_varios(planilha, abas):
+    """
+    Carrega várias abas da mesma planilha e devolve a lista de DataFrames na ordem de 'abas'.
+    As abas que ainda não têm snapshot nem leitura recente em memória são buscadas
+    juntas numa única leitura em lote (sincronizacao.ler_abas) e entregues ao
+    cache de cada aba (snapshot ou, se não der para gravar, memória); depois
+    todas são servidas normalmente por carregar_compartilhado.
+    """
+    leituras = _leituras_sem_snapshot()
+    pendentes = [
+        aba for aba in abas
+        if not existe_snapshot(planilha, aba) and leituras.recente(planilha, aba) is None
+    ]
+    if len(pendentes) > 1:
+        conn = st.connection("gsheets", type=GSheetsConnection)
+        modificado = modificado_em(conn, planilha)
+        for aba, data in ler_abas(conn, planilha, pendentes).items():
+            _guardar_leitura(planilha, aba, data, modificado)
+    return [carregar_compartilhado(planilha, aba) for aba in abas]
+
+
+def carregar_em_paralelo(pares):
+    """
+    Carrega abas de planilhas diferentes ao mesmo tempo: pares = [(planilha, aba), ...].
+    Abas da mesma planilha seguem juntas em carregar_varios. Devolve a lista na ordem de 'pares'.
+    """
+    grupos = {}
+    for planilha, aba in pares:
+        grupos.setdefault(planilha, []).append(aba)
+
+    with ThreadPoolExecutor(max_workers=len(grupos) or 1) as executor:
+        leituras = {planilha: executor.submit(carregar_varios, planilha, abas) for planilha, abas in grupos.items()}
+        resultados = {
+            (planilha, aba): data
+            for planilha, leitura in leituras.items()
+            for aba, data in zip(grupos[planilha], leitura.result())
+        }
+    return [resultados[(planilha, aba)] for planilha, aba in pares]
+
+
+class _UltimosPreparos:
+    """Último preparo de cada aba: (versão, DataFrame bruto, DataFrame preparado)."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._por_chave = {}
+
+    def obter(self, chave):
+        with self._trava:
+            return self._por_chave.get(chave)
+
+    def guardar(self, chave, versao, bruto, preparado):
+        with self._trava:
+            self._por_chave[chave] = (versao, bruto, preparado)
+
+
+@st.cache_resource
+def _ultimos_preparos():
+    return _UltimosPreparos()
+
+
+def _preparar_incremental(chave, data):
+    # Só quando a versão anterior desta aba foi preparada aqui e o snapshot traz as
+    # faixas alteradas desde ela (ver _atualizar_snapshot)
+    alteracao = data.attrs.get("alteracao")
+    anterior = _ultimos_preparos().obter(chave)
+    if not alteracao or anterior is None or anterior[0] != alteracao["versao_anterior"]:
+        return None
+    _, bruto_anterior, preparado_anterior = anterior
+    preparado = repreparar(chave[2], bruto_anterior, preparado_anterior, data, alteracao["faixas"])
+    if preparado is not None:
+        logger.info("Aba %s: preparo %s refeito só nas linhas %s", chave[1], chave[2], alteracao["faixas"])
+    return preparado
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _preparar(_data, preparo, versao, planilha=None, aba=None):
+    # O cache é indexado pela versão da aba (o DataFrame em si não é hasheado):
+    # a limpeza só roda de novo quando a planilha trouxer conteúdo diferente, e
+    # numa alteração parcial só os blocos de linhas alterados são preparados de novo.
+    # cache_resource: todas as sessões leem o mesmo DataFrame, sem cópia por rerun.
+    chave = (planilha, aba, preparo)
+    data = _preparar_incremental(chave, _data)
+    if data is None:
+        data = PREPAROS[preparo](_data)
+    # Depois da limpeza, aplica os tipos compactos da aba (categóricas, inteiros menores; ver tipos.py)
+    data = otimizar_tipos(data, ESQUEMAS_TIPOS.get(preparo), nome=preparo)
+    data.attrs.pop("alteracao", None)
+    data.attrs["versao"] = f"{versao}:{preparo}"
+    data = somente_leitura(data)
+    _ultimos_preparos().guardar(chave, versao, _data, data)
     return data
 
 
+def carregar_preparado(planilha, aba, preparo):
+    """
+    Carrega a aba já limpa e tipada pelo preparo indicado (ver preparo.PREPAROS).
+    A limpeza roda uma vez por versão da planilha; nos reruns só há filtragem.
+    O DataFrame é compartilhado (FrameSomenteLeitura): as páginas filtram com
+    filtros.selecionar e copiam só as linhas e colunas que exibem.
+    """
+    data = carregar_compartilhado(planilha, aba)
+    return _preparar(data, preparo, versao_df(data), planilha, aba)
+
+
+def aviso_valores_invalidos(data):
+    """Mostra um aviso discreto quando o preparo encontrou valores em reais que não puderam ser convertidos."""
+    invalidos = data.attrs.get("valores_invalidos", {})
+    if invalidos:
+        detalhes = ", ".join(f"{col}: {qtd}" for col, qtd in invalidos.items())
+        st.caption(f"⚠️ Valores não reconhecidos (considerados R$ 0,00) — {detalhes}")
+
+
 # --- NOVA FUNÇÃO DE LOGIN ---
 def fazer_login():
     """